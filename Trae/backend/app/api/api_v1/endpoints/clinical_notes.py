@@ -1,27 +1,39 @@
+import asyncio
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_current_active_clinician, get_current_active_user
+from app.core.conditional import conditional_response, make_etag
+from app.core.security import (
+    get_current_active_clinician,
+    get_current_active_superuser,
+    get_current_active_user,
+)
 from app.db.init_db import get_db
 from app.db.models.user import User
 from app.schemas.clinical_note import (
     Attachment as AttachmentSchema,
     AttachmentCreate,
+    AttachmentStorageStats,
+    AttachmentURL,
     ClinicalNote as ClinicalNoteSchema,
     ClinicalNoteCreate,
     ClinicalNoteUpdate,
 )
 from app.services.clinical_note import (
     add_attachment,
+    count_attachment_references,
     create_clinical_note,
     delete_attachment,
     delete_clinical_note,
     get_attachment,
+    get_attachment_by_hash,
+    get_attachment_storage_stats,
     get_clinical_note,
     get_clinical_notes,
     get_patient_clinical_notes,
+    lock_attachment_blob,
     update_clinical_note,
 )
 from app.services.fhir import fhir_service
@@ -74,16 +86,24 @@ async def create_new_clinical_note(
 @router.get("/{note_id}", response_model=ClinicalNoteSchema)
 async def read_clinical_note(
     note_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
-    """Get clinical note by ID."""
+    """Get clinical note by ID. Supports conditional GETs."""
     note = await get_clinical_note(db, note_id)
     if not note:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Clinical note not found",
         )
+
+    # Attachments are added and removed without touching the note's updated_at
+    etag = make_etag("clinical_note", note.id, note.updated_at, *sorted(a.id for a in note.attachments))
+    not_modified = conditional_response(request, response, etag, note.updated_at)
+    if not_modified is not None:
+        return not_modified
     return note
 
 
@@ -145,6 +165,15 @@ async def read_patient_clinical_notes(
     return notes
 
 
+@router.get("/attachments/storage-stats", response_model=AttachmentStorageStats)
+async def read_attachment_storage_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """Get attachment storage usage and bytes saved by deduplication."""
+    return await get_attachment_storage_stats(db)
+
+
 @router.post("/{note_id}/attachments", response_model=AttachmentSchema)
 async def upload_attachment(
     note_id: int,
@@ -162,16 +191,26 @@ async def upload_attachment(
             detail="Clinical note not found",
         )
     
-    # Upload file to S3
-    file_path, filename = await storage_service.upload_file(
-        file, folder=f"attachments/{note_id}"
-    )
+    # Store each distinct content once, keyed by its hash, which is computed
+    # while the upload streams to a staging key
+    staging_key, content_hash, file_size = await storage_service.stage_blob(file)
+    
+    # Held until add_attachment commits, so a concurrent delete of the last
+    # reference cannot remove the blob this attachment points to
+    file_path = storage_service.blob_key(content_hash)
+    await lock_attachment_blob(db, file_path)
+    if await get_attachment_by_hash(db, content_hash):
+        await storage_service.delete_file(staging_key)
+    else:
+        await storage_service.store_blob(staging_key, content_hash)
     
     # Create attachment record
     attachment_in = AttachmentCreate(
-        filename=filename,
+        filename=file.filename or content_hash,
         file_type=file_type,
         file_path=file_path,
+        content_hash=content_hash,
+        file_size=file_size,
     )
     
     attachment = await add_attachment(db, note_id, attachment_in)
@@ -184,6 +223,34 @@ async def upload_attachment(
     return attachment
 
 
+@router.get("/{note_id}/attachments/urls", response_model=List[AttachmentURL])
+async def read_attachment_urls(
+    note_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """Get presigned download URLs for all attachments of a clinical note."""
+    note = await get_clinical_note(db, note_id)
+    if not note:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Clinical note not found",
+        )
+    
+    urls = await asyncio.gather(
+        *(storage_service.generate_presigned_url(a.file_path) for a in note.attachments)
+    )
+    return [
+        AttachmentURL(
+            attachment_id=attachment.id,
+            filename=attachment.filename,
+            file_type=attachment.file_type,
+            url=url,
+        )
+        for attachment, url in zip(note.attachments, urls)
+    ]
+
+
 @router.get("/{note_id}/attachments/{attachment_id}", response_model=AttachmentSchema)
 async def read_attachment(
     note_id: int,
@@ -216,11 +283,17 @@ async def delete_attachment_by_id(
             detail="Attachment not found",
         )
     
-    # Delete file from S3
-    storage_service.delete_file(attachment.file_path)
-    
-    # Delete attachment record
+    # Commit the deletion first: if the blob removal then fails, the blob is
+    # only orphaned, never missing for an attachment that still points to it
     attachment = await delete_attachment(db, attachment_id)
+    
+    # Remove the blob once no attachment references it, under the blob's lock
+    # so a concurrent upload of the same content cannot attach to it meanwhile
+    await lock_attachment_blob(db, attachment.file_path)
+    if await count_attachment_references(db, attachment.file_path) == 0:
+        await storage_service.delete_file(attachment.file_path)
+    await db.commit()
+    
     return attachment
 
 
@@ -239,7 +312,7 @@ async def download_attachment(
             detail="Attachment not found",
         )
     
-    url = storage_service.generate_presigned_url(attachment.file_path)
+    url = await storage_service.generate_presigned_url(attachment.file_path)
     if not url:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -266,7 +339,7 @@ async def generate_report(
     
     try:
         file_path = await reporting_service.generate_clinical_note_report(note, format_type)
-        url = storage_service.generate_presigned_url(file_path)
+        url = await storage_service.generate_presigned_url(file_path)
         if not url:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
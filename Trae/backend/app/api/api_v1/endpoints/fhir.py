@@ -1,8 +1,9 @@
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.conditional import conditional_response, latest, make_etag
 from app.core.security import get_current_active_user
 from app.db.init_db import get_db
 from app.db.models.user import User
@@ -17,6 +18,8 @@ router = APIRouter()
 @router.get("/Patient/{fhir_id}")
 async def get_fhir_patient(
     fhir_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
@@ -27,6 +30,11 @@ async def get_fhir_patient(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient not found",
         )
+
+    etag = make_etag("fhir_patient", patient.id, patient.updated_at)
+    not_modified = conditional_response(request, response, etag, patient.updated_at)
+    if not_modified is not None:
+        return not_modified
     
     fhir_patient = fhir_service.patient_to_fhir(patient)
     return fhir_patient.dict()
@@ -34,6 +42,8 @@ async def get_fhir_patient(
 
 @router.get("/Patient")
 async def search_fhir_patients(
+    request: Request,
+    response: Response,
     name: Optional[str] = None,
     identifier: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
@@ -45,6 +55,13 @@ async def search_fhir_patients(
     # and proper FHIR search semantics
     
     patients = await fhir_service.search_patients(db, name=name, identifier=identifier)
+
+    # Validators from the matches' IDs and timestamps, skipping FHIR conversion when unchanged
+    etag = make_etag("fhir_patient_search", name, identifier, *((p.id, p.updated_at) for p in patients))
+    not_modified = conditional_response(request, response, etag, latest(p.updated_at for p in patients))
+    if not_modified is not None:
+        return not_modified
+
     return {
         "resourceType": "Bundle",
         "type": "searchset",
@@ -62,6 +79,8 @@ async def search_fhir_patients(
 @router.get("/DocumentReference/{fhir_id}")
 async def get_fhir_document_reference(
     fhir_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
@@ -72,6 +91,12 @@ async def get_fhir_document_reference(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Clinical note not found",
         )
+
+    # Attachments are listed in the resource but don't touch the note's updated_at
+    etag = make_etag("fhir_document_reference", note.id, note.updated_at, *sorted(a.id for a in note.attachments))
+    not_modified = conditional_response(request, response, etag, note.updated_at)
+    if not_modified is not None:
+        return not_modified
     
     fhir_doc = fhir_service.clinical_note_to_fhir(note)
     return fhir_doc.dict()
@@ -79,6 +104,8 @@ async def get_fhir_document_reference(
 
 @router.get("/DocumentReference")
 async def search_fhir_document_references(
+    request: Request,
+    response: Response,
     patient: Optional[str] = None,
     date: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
@@ -90,6 +117,17 @@ async def search_fhir_document_references(
     # and proper FHIR search semantics
     
     notes = await fhir_service.search_clinical_notes(db, patient=patient, date=date)
+
+    etag = make_etag(
+        "fhir_document_reference_search",
+        patient,
+        date,
+        *((n.id, n.updated_at, *sorted(a.id for a in n.attachments)) for n in notes),
+    )
+    not_modified = conditional_response(request, response, etag, latest(n.updated_at for n in notes))
+    if not_modified is not None:
+        return not_modified
+
     return {
         "resourceType": "Bundle",
         "type": "searchset",
@@ -107,6 +145,8 @@ async def search_fhir_document_references(
 @router.get("/Appointment/{fhir_id}")
 async def get_fhir_appointment(
     fhir_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
@@ -117,6 +157,11 @@ async def get_fhir_appointment(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Appointment not found",
         )
+
+    etag = make_etag("fhir_appointment", appointment.id, appointment.updated_at)
+    not_modified = conditional_response(request, response, etag, appointment.updated_at)
+    if not_modified is not None:
+        return not_modified
     
     fhir_appointment = fhir_service.appointment_to_fhir(appointment)
     return fhir_appointment.dict()
@@ -124,6 +169,8 @@ async def get_fhir_appointment(
 
 @router.get("/Appointment")
 async def search_fhir_appointments(
+    request: Request,
+    response: Response,
     patient: Optional[str] = None,
     date: Optional[str] = None,
     status: Optional[str] = None,
@@ -136,6 +183,12 @@ async def search_fhir_appointments(
     # and proper FHIR search semantics
     
     appointments = await fhir_service.search_appointments(db, patient=patient, date=date, status=status)
+
+    etag = make_etag("fhir_appointment_search", patient, date, status, *((a.id, a.updated_at) for a in appointments))
+    not_modified = conditional_response(request, response, etag, latest(a.updated_at for a in appointments))
+    if not_modified is not None:
+        return not_modified
+
     return {
         "resourceType": "Bundle",
         "type": "searchset",
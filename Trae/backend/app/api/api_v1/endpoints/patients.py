@@ -1,8 +1,9 @@
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.conditional import conditional_response, make_etag
 from app.core.security import get_current_active_user
 from app.db.init_db import get_db
 from app.db.models.user import User
@@ -14,6 +15,7 @@ from app.services.patient import (
     get_patient,
     get_patient_by_mrn,
     get_patients,
+    get_patients_version,
     update_patient,
 )
 
@@ -22,13 +24,26 @@ router = APIRouter()
 
 @router.get("/", response_model=List[PatientSchema])
 async def read_patients(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
-    """Retrieve patients."""
+    """Retrieve patients.
+
+    Supports conditional GETs: the validators come from one aggregate
+    query, so an unchanged list is answered with 304 before any patient
+    rows are loaded.
+    """
+    count, updated_at = await get_patients_version(db, search=search)
+    etag = make_etag("patients", skip, limit, search, count, updated_at)
+    not_modified = conditional_response(request, response, etag, updated_at)
+    if not_modified is not None:
+        return not_modified
+
     patients = await get_patients(db, skip=skip, limit=limit, search=search)
     return patients
 
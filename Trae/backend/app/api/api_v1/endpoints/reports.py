@@ -3,11 +3,13 @@ from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.security import get_current_active_user
 from app.db.init_db import get_db
 from app.db.models.user import User
-from app.services.clinical_note import get_clinical_note
-from app.services.patient import get_patient
+from app.schemas.report import BatchReportRequest, BatchReportResponse
+from app.services.clinical_note import get_clinical_note, get_clinical_notes_by_ids
+from app.services.patient import get_patient, get_patients_by_filter, get_patients_by_ids
 from app.services.reporting import reporting_service
 from app.services.storage import storage_service
 
@@ -31,7 +33,7 @@ async def generate_clinical_note_report(
     
     try:
         file_path = await reporting_service.generate_clinical_note_report(note, format_type)
-        url = storage_service.generate_presigned_url(file_path)
+        url = await storage_service.generate_presigned_url(file_path)
         if not url:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -65,12 +67,13 @@ async def generate_patient_summary_report(
     
     try:
         file_path = await reporting_service.generate_patient_summary_report(
-            patient, 
+            db,
+            patient,
             format_type,
             include_notes=include_notes,
             include_appointments=include_appointments
         )
-        url = storage_service.generate_presigned_url(file_path)
+        url = await storage_service.generate_presigned_url(file_path)
         if not url:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -85,6 +88,100 @@ async def generate_patient_summary_report(
         )
 
 
+@router.post("/batch", response_model=BatchReportResponse)
+async def generate_batch_report(
+    request: BatchReportRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """Generate a ZIP bundle of patient summary and clinical note reports.
+
+    Items that cannot be found or fail to render are reported individually
+    and do not fail the whole batch.
+    """
+    patients = await get_patients_by_ids(db, request.patient_ids)
+    if request.created_by_id is not None or request.insurance_provider:
+        seen = {patient.id for patient in patients}
+        for patient in await get_patients_by_filter(
+            db,
+            created_by_id=request.created_by_id,
+            insurance_provider=request.insurance_provider,
+        ):
+            if patient.id not in seen:
+                seen.add(patient.id)
+                patients.append(patient)
+    notes = await get_clinical_notes_by_ids(db, request.note_ids)
+    
+    if not patients and not notes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No patients or clinical notes matched the request",
+        )
+    if len(patients) + len(notes) > settings.MAX_BATCH_REPORT_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds the limit of {settings.MAX_BATCH_REPORT_ITEMS} reports",
+        )
+    
+    # Report requested IDs that don't exist
+    missing = []
+    found_patient_ids = {patient.id for patient in patients}
+    found_note_ids = {note.id for note in notes}
+    for item_type, requested_ids, found_ids, template_name in (
+        ("patient", request.patient_ids, found_patient_ids, "patient_summary"),
+        ("clinical_note", request.note_ids, found_note_ids, "clinical_note"),
+    ):
+        for item_id in dict.fromkeys(requested_ids):
+            if item_id not in found_ids:
+                missing.append({
+                    "item_type": item_type,
+                    "item_id": item_id,
+                    "filename": f"{template_name}_{item_id}.{request.format_type}",
+                    "status": "error",
+                    "error_message": "Not found",
+                })
+    
+    try:
+        file_path, results = await reporting_service.generate_batch_report(
+            db,
+            patients,
+            notes,
+            request.format_type,
+            include_notes=request.include_notes,
+            include_appointments=request.include_appointments,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate batch report: {str(e)}",
+        )
+    
+    results = results + missing
+    url = None
+    if file_path:
+        url = await storage_service.generate_presigned_url(file_path)
+        if not url:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate download URL",
+            )
+    
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    return {
+        "url": url,
+        "filename": file_path.rsplit("/", 1)[-1] if file_path else None,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+
+
 @router.get("/templates")
 async def list_report_templates(
     db: AsyncSession = Depends(get_db),
@@ -136,7 +233,7 @@ async def generate_custom_report(
             format_type,
             note=note
         )
-        url = storage_service.generate_presigned_url(file_path)
+        url = await storage_service.generate_presigned_url(file_path)
         if not url:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
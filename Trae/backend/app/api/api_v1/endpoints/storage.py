@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.services.storage import storage_service
+
+router = APIRouter()
+
+
+@router.get("/{key:path}", include_in_schema=False)
+async def read_stored_file(
+    key: str,
+    expires: int = Query(...),
+    signature: str = Query(...),
+) -> FileResponse:
+    """Serve a file from local storage for a signed, unexpired URL.
+
+    The URLs come from ``generate_presigned_url``; the signature stands in
+    for authentication, as with S3 presigned URLs.
+    """
+    path = storage_service.backend.resolve_signed(key, expires, signature)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired download link",
+        )
+    return FileResponse(path)
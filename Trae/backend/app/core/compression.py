@@ -0,0 +1,93 @@
+import json
+import zlib
+from typing import List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class GZipRequestMiddleware:
+    """Decompress request bodies sent with ``Content-Encoding: gzip``.
+
+    The counterpart of Starlette's ``GZipMiddleware``, which only compresses
+    responses. The compressed body is read in full, inflated with a cap of
+    ``max_size`` bytes and replayed to the app with the encoding header
+    removed, so endpoints see a plain JSON body. Requests without the header
+    pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int = settings.MAX_DECOMPRESSED_REQUEST_SIZE):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers: List[Tuple[bytes, bytes]] = scope["headers"]
+        encoding = next(
+            (value.decode("latin-1").strip().lower() for name, value in headers if name == b"content-encoding"),
+            None,
+        )
+        if encoding != "gzip":
+            await self.app(scope, receive, send)
+            return
+
+        compressed = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            compressed.extend(message.get("body", b""))
+            more_body = message.get("more_body", False)
+            if len(compressed) > self.max_size:
+                await self._error(send, 413, "Request body too large")
+                return
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(bytes(compressed), self.max_size)
+            if decompressor.unconsumed_tail:
+                await self._error(send, 413, "Decompressed request body too large")
+                return
+            body += decompressor.flush()
+        except zlib.error:
+            await self._error(send, 400, "Invalid gzip request body")
+            return
+
+        scope = dict(scope)
+        scope["headers"] = [
+            (name, value)
+            for name, value in headers
+            if name not in (b"content-encoding", b"content-length")
+        ] + [(b"content-length", str(len(body)).encode("latin-1"))]
+
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, replay, send)
+
+    @staticmethod
+    async def _error(send: Send, status_code: int, detail: str) -> None:
+        """Send a JSON error response in the same shape as ``HTTPException``."""
+        content = json.dumps({"detail": detail}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(content)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
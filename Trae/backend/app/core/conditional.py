@@ -0,0 +1,83 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values that identify a representation.
+
+    Callers pass cheap version data, such as a row's ID and ``updated_at``
+    or a list's row count and ``max(updated_at)``, along with the query
+    parameters, rather than the serialized body.
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    # Weak, since gzip and JSON serialization may change the bytes
+    return f'W/"{digest[:24]}"'
+
+
+def latest(timestamps: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    """The most recent of some ``updated_at`` values, ignoring missing ones."""
+    return max((t for t in timestamps if t is not None), default=None)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Model timestamps are naive UTC (datetime.utcnow)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """ETag, Last-Modified and Cache-Control headers for a conditional response."""
+    headers = {
+        "ETag": etag,
+        # Clients may store the response but must revalidate before reuse
+        "Cache-Control": "private, no-cache",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Check a request's If-None-Match / If-Modified-Since against current validators.
+
+    If-None-Match takes precedence, as in RFC 9110; If-Modified-Since alone
+    cannot see rows deleted from a list, so clients should send both.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        # Weak comparison: W/"x" matches "x"
+        opaque = etag[2:] if etag.startswith("W/") else etag
+        return "*" in tags or etag in tags or opaque in tags or f"W/{opaque}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _as_utc(last_modified) <= since
+    return False
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Answer a conditional GET.
+
+    Returns a ``304 Not Modified`` response if the client's copy is
+    current; otherwise sets the validators on ``response`` and returns
+    None, and the endpoint builds the body as usual.
+    """
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -11,6 +11,11 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Eira Clinical Notes"
     VERSION: str = "0.1.0"
     
+    # Compression configuration
+    GZIP_MINIMUM_SIZE: int = 1024  # bytes; smaller responses are sent uncompressed
+    GZIP_COMPRESS_LEVEL: int = 6
+    MAX_DECOMPRESSED_REQUEST_SIZE: int = 64 * 1024 * 1024  # bytes; guards against gzip bombs
+
     # CORS configuration
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
@@ -51,12 +56,25 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
     
+    # Storage configuration
+    STORAGE_BACKEND: str = "s3"  # "s3" or "local"
+    STORAGE_CHUNK_SIZE: int = 8 * 1024 * 1024  # upload read/part size in bytes
+    LOCAL_STORAGE_DIR: str = "storage"
+    LOCAL_STORAGE_BASE_URL: str = "/storage"
+    PRESIGNED_URL_CACHE_FRACTION: float = 0.5  # reuse signed URLs for this share of their lifetime
+    PRESIGNED_URL_CACHE_SIZE: int = 10000
+
     # S3 configuration
-    S3_BUCKET_NAME: str
-    AWS_ACCESS_KEY_ID: str
-    AWS_SECRET_ACCESS_KEY: str
+    S3_BUCKET_NAME: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None
+    AWS_ACCESS_KEY_ID: Optional[str] = None
+    AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_REGION: str = "us-east-1"
     
+    # Reporting configuration
+    REPORT_WORKERS: int = 2  # worker processes for batch report rendering
+    MAX_BATCH_REPORT_ITEMS: int = 200
+    
     # Email configuration
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
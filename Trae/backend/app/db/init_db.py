@@ -1,17 +1,17 @@
 import asyncio
 from typing import AsyncGenerator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
-from app.core.security import get_password_hash
 from app.db.base_class import Base
 from app.db.models.user import User
 
 # Create async engine
 engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
+    str(settings.SQLALCHEMY_DATABASE_URI),
     echo=False,
     future=True,
     poolclass=NullPool,
@@ -34,14 +34,29 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+# Columns added to existing tables, which create_all does not alter
+SCHEMA_UPGRADES = [
+    "ALTER TABLE attachment ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "ALTER TABLE attachment ADD COLUMN IF NOT EXISTS file_size INTEGER",
+    "CREATE INDEX IF NOT EXISTS ix_attachment_content_hash ON attachment (content_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_attachment_file_path ON attachment (file_path)",
+]
+
+
 async def create_tables() -> None:
-    """Create database tables."""
+    """Create database tables and add columns missing from existing ones."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        if conn.dialect.name == "postgresql":
+            for statement in SCHEMA_UPGRADES:
+                await conn.execute(text(statement))
 
 
 async def init_db() -> None:
     """Initialize the database with initial data."""
+    # Imported here: app.core.security imports get_db from this module
+    from app.core.security import get_password_hash
+
     async with async_session_factory() as session:
         # Create first superuser if it doesn't exist
         superuser = await session.get(User, 1)
@@ -40,7 +40,9 @@ class Attachment(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     file_type: Mapped[str] = mapped_column(String(50), nullable=False)  # image, document, signature, etc.
-    file_path: Mapped[str] = mapped_column(String(255), nullable=False)  # S3 key
+    file_path: Mapped[str] = mapped_column(String(255), nullable=False, index=True)  # storage key, shared by duplicates
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)  # SHA-256 of the content
+    file_size: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     clinical_note_id: Mapped[int] = mapped_column(Integer, ForeignKey("clinicalnote.id"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
@@ -1,15 +1,18 @@
 import logging
 from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import JSONResponse
 from pathlib import Path
 
 from app.api.api_v1.api import api_router
+from app.core.compression import GZipRequestMiddleware
 from app.core.config import settings
 from app.core.security import get_current_active_user
 from app.db.init_db import create_tables, init_db
+from app.services.reporting import reporting_service
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,6 +35,15 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Compress responses for clients that accept gzip and inflate gzip request
+# bodies; sync payloads of full entity snapshots shrink several times over
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL,
+)
+app.add_middleware(GZipRequestMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -41,6 +53,11 @@ if static_dir.exists():
     from fastapi.staticfiles import StaticFiles
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
+# Serve uploaded files through signed URLs when using the local storage backend
+if settings.STORAGE_BACKEND == "local":
+    from app.api.api_v1.endpoints import storage
+    app.include_router(storage.router, prefix=settings.LOCAL_STORAGE_BASE_URL.rstrip("/"))
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -94,6 +111,12 @@ async def startup_event():
     logger.info("Database initialization complete.")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background resources on shutdown."""
+    reporting_service.shutdown()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -18,6 +18,8 @@ class AttachmentCreate(AttachmentBase):
     filename: str
     file_type: str = Field(..., pattern="^(image|document|signature|other)$")
     file_path: str
+    content_hash: Optional[str] = None
+    file_size: Optional[int] = None
 
 
 class Attachment(AttachmentBase):
@@ -26,10 +28,29 @@ class Attachment(AttachmentBase):
     filename: str
     file_type: str
     file_path: str
+    content_hash: Optional[str] = None
+    file_size: Optional[int] = None
     clinical_note_id: int
     created_at: datetime
 
 
+class AttachmentURL(BaseSchema):
+    """Download URL for an attachment."""
+    attachment_id: int
+    filename: str
+    file_type: str
+    url: Optional[str] = None
+
+
+class AttachmentStorageStats(BaseSchema):
+    """Attachment storage deduplication statistics."""
+    attachments: int
+    unique_blobs: int
+    logical_bytes: int
+    stored_bytes: int
+    bytes_saved: int
+
+
 # Clinical Note schemas
 class ClinicalNoteBase(BaseSchema):
     """Base clinical note schema with shared properties."""
@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BatchReportRequest(BaseModel):
+    """Batch report request schema.
+
+    Patients can be selected explicitly, by filter, or both; the bundle
+    contains the union of the selections.
+    """
+    patient_ids: List[int] = []
+    note_ids: List[int] = []
+    created_by_id: Optional[int] = Field(
+        None, description="Include all active patients created by this user"
+    )
+    insurance_provider: Optional[str] = Field(
+        None, description="Include all active patients with this insurance provider"
+    )
+    format_type: str = Field("pdf", pattern="^(pdf|docx)$")
+    include_notes: bool = True
+    include_appointments: bool = True
+
+
+class BatchReportItemResult(BaseModel):
+    """Result of rendering a single item in a batch."""
+    item_type: str
+    item_id: int
+    filename: str
+    status: str
+    error_message: Optional[str] = None
+
+
+class BatchReportResponse(BaseModel):
+    """Batch report response schema."""
+    url: Optional[str] = None
+    filename: Optional[str] = None
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchReportItemResult]
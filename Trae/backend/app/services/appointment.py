@@ -52,6 +52,21 @@ async def get_patient_appointments(
     return result.scalars().all()
 
 
+async def get_patient_appointment_history(
+    db: AsyncSession, patient_id: int
+) -> List[Appointment]:
+    """Get every appointment for a specific patient, oldest first."""
+    result = await db.execute(
+        select(Appointment)
+        .filter(
+            Appointment.patient_id == patient_id,
+            Appointment.is_deleted == False,
+        )
+        .order_by(Appointment.start_time)
+    )
+    return result.scalars().all()
+
+
 async def get_appointments_by_date_range(
     db: AsyncSession, start_date: datetime, end_date: datetime
 ) -> List[Appointment]:
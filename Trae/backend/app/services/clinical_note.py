@@ -1,6 +1,7 @@
-from typing import List, Optional, Union
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Union
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
@@ -52,6 +53,66 @@ async def get_patient_clinical_notes(
     return result.scalars().all()
 
 
+async def get_clinical_notes_by_ids(
+    db: AsyncSession, note_ids: List[int]
+) -> List[ClinicalNote]:
+    """Get the clinical notes with the given IDs, with patient and author loaded."""
+    if not note_ids:
+        return []
+    result = await db.execute(
+        select(ClinicalNote)
+        .filter(ClinicalNote.id.in_(note_ids), ClinicalNote.is_deleted == False)
+        .options(
+            joinedload(ClinicalNote.patient),
+            joinedload(ClinicalNote.created_by),
+        )
+    )
+    return result.scalars().all()
+
+
+async def stream_patient_clinical_notes(
+    db: AsyncSession, patient_id: int, chunk_size: int = 50
+) -> AsyncIterator[List[ClinicalNote]]:
+    """Stream all clinical notes for a patient in chunks, oldest first.
+
+    Uses a single server-side cursor so only ``chunk_size`` notes are held in
+    memory at a time. The authoring clinician is joined in the same query;
+    attachments are not loaded, use ``get_patient_attachments_by_note`` to
+    fetch them in one query.
+    """
+    result = await db.stream(
+        select(ClinicalNote)
+        .filter(
+            ClinicalNote.patient_id == patient_id,
+            ClinicalNote.is_deleted == False,
+        )
+        .options(joinedload(ClinicalNote.created_by))
+        .order_by(ClinicalNote.created_at)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for partition in result.scalars().partitions(chunk_size):
+        yield partition
+
+
+async def get_patient_attachments_by_note(
+    db: AsyncSession, patient_id: int
+) -> Dict[int, List[Attachment]]:
+    """Get all attachments for a patient's notes, grouped by note ID."""
+    result = await db.execute(
+        select(Attachment)
+        .join(ClinicalNote, Attachment.clinical_note_id == ClinicalNote.id)
+        .filter(
+            ClinicalNote.patient_id == patient_id,
+            ClinicalNote.is_deleted == False,
+        )
+        .order_by(Attachment.created_at)
+    )
+    attachments_by_note: Dict[int, List[Attachment]] = defaultdict(list)
+    for attachment in result.scalars().all():
+        attachments_by_note[attachment.clinical_note_id].append(attachment)
+    return attachments_by_note
+
+
 async def create_clinical_note(
     db: AsyncSession, note_in: ClinicalNoteCreate, current_user: User
 ) -> ClinicalNote:
@@ -135,13 +196,85 @@ async def get_attachment(db: AsyncSession, attachment_id: int) -> Optional[Attac
     return result.scalars().first()
 
 
-async def delete_attachment(db: AsyncSession, attachment_id: int) -> Optional[Attachment]:
-    """Delete an attachment."""
+async def get_attachment_by_hash(db: AsyncSession, content_hash: str) -> Optional[Attachment]:
+    """Get any attachment whose content has the given hash.
+
+    Attachments stored before content addressing have no hash and are never
+    matched, so new uploads do not share their (per-upload) storage keys.
+    """
+    result = await db.execute(
+        select(Attachment).filter(Attachment.content_hash == content_hash).limit(1)
+    )
+    return result.scalars().first()
+
+
+async def lock_attachment_blob(db: AsyncSession, file_path: str) -> None:
+    """Serialize work on a stored blob until the current transaction ends.
+
+    Uploads take the lock before reusing or storing a blob, and deletes
+    before counting its references and removing it, so a blob is never
+    removed while an upload is attaching to it. A no-op on databases other
+    than PostgreSQL.
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(file_path))))
+
+
+async def count_attachment_references(db: AsyncSession, file_path: str) -> int:
+    """Count attachments referencing a stored blob."""
+    result = await db.execute(
+        select(func.count(Attachment.id)).filter(Attachment.file_path == file_path)
+    )
+    return result.scalar_one()
+
+
+async def get_attachment_storage_stats(db: AsyncSession) -> Dict[str, int]:
+    """Get how many bytes content-addressed storage saves over one blob per attachment."""
+    blobs = (
+        select(func.max(Attachment.file_size).label("file_size"))
+        .filter(Attachment.content_hash.is_not(None))
+        .group_by(Attachment.content_hash)
+        .subquery()
+    )
+    attachments, logical_bytes = (
+        await db.execute(
+            select(
+                func.count(Attachment.id),
+                func.coalesce(func.sum(Attachment.file_size), 0),
+            ).filter(Attachment.content_hash.is_not(None))
+        )
+    ).one()
+    unique_blobs, stored_bytes = (
+        await db.execute(
+            select(func.count(), func.coalesce(func.sum(blobs.c.file_size), 0))
+        )
+    ).one()
+    
+    return {
+        "attachments": attachments,
+        "unique_blobs": unique_blobs,
+        "logical_bytes": logical_bytes,
+        "stored_bytes": stored_bytes,
+        "bytes_saved": logical_bytes - stored_bytes,
+    }
+
+
+async def delete_attachment(
+    db: AsyncSession, attachment_id: int, commit: bool = True
+) -> Optional[Attachment]:
+    """Delete an attachment.
+
+    With ``commit=False`` the deletion is only flushed, so the caller can do
+    more work in the same transaction.
+    """
     attachment = await get_attachment(db, attachment_id)
     if attachment:
         # Track the deletion in the sync outbox before actually deleting
         await entity_tracker.track_entity_deletion(db, attachment)
         
         await db.delete(attachment)
-        await db.commit()
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
     return attachment
\ No newline at end of file
@@ -16,6 +16,9 @@ async def track_entity_creation(db: AsyncSession, entity: Any) -> None:
     if not entity_type:
         return  # Unsupported entity type
     
+    # Assign the entity's ID before recording it
+    await db.flush()
+    
     # Create a new sync outbox entry
     sync_outbox = SyncOutbox(
         entity_type=entity_type,
@@ -87,20 +90,14 @@ def _entity_to_dict(entity: Any) -> Dict[str, Any]:
     """Convert an entity to a dictionary for JSON serialization."""
     result = {}
     
-    # Get all attributes that don't start with _ and aren't callables
-    for key in dir(entity):
-        if not key.startswith('_') and not callable(getattr(entity, key)):
-            try:
-                value = getattr(entity, key)
-                # Skip relationship attributes
-                if not hasattr(value, '__table__'):
-                    # Handle datetime objects
-                    if hasattr(value, 'isoformat'):
-                        result[key] = value.isoformat()
-                    else:
-                        result[key] = value
-            except Exception:
-                # Skip attributes that can't be serialized
-                pass
+    # Column values only: relationships would load related rows, and class
+    # attributes such as the model's metadata are not serializable
+    for column in entity.__table__.columns:
+        value = getattr(entity, column.key)
+        # Handle datetime objects
+        if hasattr(value, 'isoformat'):
+            result[column.key] = value.isoformat()
+        else:
+            result[column.key] = value
     
     return result
\ No newline at end of file
@@ -1,6 +1,7 @@
-from typing import List, Optional, Union
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.patient import Patient
@@ -27,8 +28,28 @@ async def get_patients(
     db: AsyncSession, skip: int = 0, limit: int = 100, search: Optional[str] = None
 ) -> List[Patient]:
     """Get a list of patients with optional search."""
-    query = select(Patient)
-    
+    query = _filter_patient_search(select(Patient), search)
+    query = query.offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+async def get_patients_version(
+    db: AsyncSession, search: Optional[str] = None
+) -> Tuple[int, Optional[datetime]]:
+    """Get the row count and latest ``updated_at`` of the patients ``get_patients`` searches.
+
+    Together they change whenever a matching patient is added, updated or
+    deleted, which makes them a cheap validator for patient lists.
+    """
+    query = _filter_patient_search(select(func.count(Patient.id), func.max(Patient.updated_at)), search)
+    result = await db.execute(query)
+    count, updated_at = result.one()
+    return count, updated_at
+
+
+def _filter_patient_search(query, search: Optional[str]):
+    """Restrict a patients query to a name or MRN search."""
     if search:
         search_term = f"%{search}%"
         query = query.filter(
@@ -36,9 +57,32 @@ async def get_patients(
             | (Patient.last_name.ilike(search_term))
             | (Patient.medical_record_number.ilike(search_term))
         )
+    return query
+
+
+async def get_patients_by_ids(db: AsyncSession, patient_ids: List[int]) -> List[Patient]:
+    """Get the patients with the given IDs."""
+    if not patient_ids:
+        return []
+    result = await db.execute(select(Patient).filter(Patient.id.in_(patient_ids)))
+    return result.scalars().all()
+
+
+async def get_patients_by_filter(
+    db: AsyncSession,
+    created_by_id: Optional[int] = None,
+    insurance_provider: Optional[str] = None,
+) -> List[Patient]:
+    """Get active patients matching all of the given filters."""
+    query = select(Patient).filter(Patient.is_active == True)
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
+    if created_by_id is not None:
+        query = query.filter(Patient.created_by_id == created_by_id)
+    if insurance_provider:
+        # Case-insensitive equality; ilike would treat % and _ in the input as wildcards
+        query = query.filter(func.lower(Patient.insurance_provider) == insurance_provider.lower())
+    
+    result = await db.execute(query.order_by(Patient.last_name, Patient.first_name))
     return result.scalars().all()
 
 
@@ -1,18 +1,189 @@
+import asyncio
+import io
 import os
 import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from docx import Document
-from jinja2 import Template
+from fastapi import UploadFile
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
 from weasyprint import HTML
 
-from app.db.models.clinical_note import ClinicalNote
+from app.core.config import settings
+from app.db.models.clinical_note import Attachment, ClinicalNote
 from app.db.models.patient import Patient
 from app.db.models.user import User
+from app.services.appointment import get_patient_appointment_history
+from app.services.clinical_note import (
+    get_patient_attachments_by_note,
+    stream_patient_clinical_notes,
+)
 from app.services.storage import storage_service
 
+# Number of notes fetched from the database and rendered per chunk
+NOTE_CHUNK_SIZE = 50
+
+TEMPLATE_FORMATS = {".html": "pdf", ".docx": "docx"}
+
+
+class TemplateRegistry:
+    """Cached index of the report templates available on disk.
+
+    The directory listing is only rescanned when the directory's mtime
+    changes, and compiled Jinja templates are cached by the environment.
+    """
+
+    def __init__(self, templates_dir: Path):
+        """Initialize the registry for a templates directory."""
+        self.templates_dir = templates_dir
+        self.environment = Environment(
+            loader=FileSystemLoader(str(templates_dir)),
+            autoescape=select_autoescape(["html"]),
+            enable_async=True,
+        )
+        self._mtime: Optional[float] = None
+        self._templates: Dict[str, List[str]] = {}
+
+    def _refresh(self) -> None:
+        """Rescan the templates directory if it has changed."""
+        mtime = self.templates_dir.stat().st_mtime
+        if mtime == self._mtime:
+            return
+
+        templates: Dict[str, List[str]] = {}
+        for path in sorted(self.templates_dir.iterdir()):
+            format_type = TEMPLATE_FORMATS.get(path.suffix.lower())
+            if format_type and path.is_file():
+                templates.setdefault(path.stem, []).append(format_type)
+
+        self._templates = templates
+        self._mtime = mtime
+
+    def list(self) -> List[Dict[str, Any]]:
+        """List available templates with the formats each supports."""
+        self._refresh()
+        return [
+            {"name": name, "formats": sorted(formats)}
+            for name, formats in self._templates.items()
+        ]
+
+    def has(self, template_name: str, format_type: str) -> bool:
+        """Check whether a template exists for the given format."""
+        self._refresh()
+        return format_type in self._templates.get(template_name, [])
+
+    def get_html_template(self, template_name: str) -> Template:
+        """Get a compiled HTML template."""
+        if not self.has(template_name, "pdf"):
+            raise FileNotFoundError(f"Template {template_name}.html not found")
+        return self.environment.get_template(f"{template_name}.html")
+
+
+def _fill_docx_placeholders(doc: Any, context: Dict[str, Any]) -> None:
+    """Replace ``{{ key }}`` placeholders in a document's paragraphs and tables."""
+    paragraphs = list(doc.paragraphs)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                paragraphs.extend(cell.paragraphs)
+    
+    for paragraph in paragraphs:
+        for key, value in context.items():
+            if f"{{{{ {key} }}}}" in paragraph.text:
+                paragraph.text = paragraph.text.replace(
+                    f"{{{{ {key} }}}}", str(value)
+                )
+
+
+def _start_patient_summary_docx(templates_dir: Path, context: Dict[str, Any]) -> Any:
+    """Create a patient summary DOCX with everything except the notes."""
+    template_path = Path(templates_dir) / "patient_summary.docx"
+    if template_path.exists():
+        doc = Document(template_path)
+        _fill_docx_placeholders(doc, context)
+    else:
+        doc = Document()
+        doc.add_heading(f"Patient Summary: {context['patient_name']}", level=0)
+        doc.add_paragraph(
+            f"MRN: {context['patient_mrn']}    "
+            f"DOB: {context['patient_dob']} (age {context['patient_age']})    "
+            f"Gender: {context['patient_gender']}"
+        )
+        doc.add_paragraph(f"Generated: {context['generated_date']}")
+    
+    if context["include_appointments"]:
+        doc.add_heading("Appointments", level=1)
+        if context["appointments"]:
+            table = doc.add_table(rows=1, cols=4)
+            header = table.rows[0].cells
+            for cell, text in zip(header, ("Date", "Title", "Type", "Status")):
+                cell.text = text
+            for appointment in context["appointments"]:
+                cells = table.add_row().cells
+                cells[0].text = appointment["start_time"]
+                cells[1].text = appointment["title"]
+                cells[2].text = appointment["appointment_type"]
+                cells[3].text = appointment["status"]
+        else:
+            doc.add_paragraph("No appointments recorded.")
+    
+    if context["include_notes"]:
+        doc.add_heading("Clinical Notes", level=1)
+    
+    return doc
+
+
+def _add_docx_notes(doc: Any, notes: List[Dict[str, Any]]) -> None:
+    """Append note sections to a patient summary DOCX."""
+    for note in notes:
+        doc.add_heading(f"{note['date']} - {note['title']}", level=2)
+        doc.add_paragraph(
+            f"Type: {note['note_type']}    Clinician: {note['clinician_name']}"
+        )
+        doc.add_paragraph(note["content"])
+        if note["attachments"]:
+            doc.add_paragraph("Attachments: " + ", ".join(note["attachments"]))
+
+
+@lru_cache(maxsize=None)
+def _worker_environment(templates_dir: str) -> Environment:
+    """Get the Jinja environment for a worker process, created once per process."""
+    return Environment(
+        loader=FileSystemLoader(templates_dir),
+        autoescape=select_autoescape(["html"]),
+    )
+
+
+def render_report_document(
+    templates_dir: str, template_name: str, format_type: str, context: Dict[str, Any]
+) -> bytes:
+    """Render a report to bytes.
+
+    This is a plain module-level function so it can run in a worker process
+    during batch generation; the context must be fully materialised.
+    """
+    if format_type == "pdf":
+        template = _worker_environment(templates_dir).get_template(f"{template_name}.html")
+        return HTML(string=template.render(**context)).write_pdf()
+    
+    if template_name == "patient_summary":
+        doc = _start_patient_summary_docx(Path(templates_dir), context)
+        _add_docx_notes(doc, context.get("notes", []))
+    else:
+        doc = Document(Path(templates_dir) / f"{template_name}.docx")
+        _fill_docx_placeholders(doc, context)
+    
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
 
 class ReportingService:
     """Service for generating clinical reports."""
@@ -21,6 +192,43 @@ class ReportingService:
         """Initialize the reporting service."""
         self.templates_dir = Path("app/templates/reports")
         os.makedirs(self.templates_dir, exist_ok=True)
+        self.template_registry = TemplateRegistry(self.templates_dir)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Get the worker pool used for batch rendering, creating it on first use."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=settings.REPORT_WORKERS)
+        return self._process_pool
+    
+    def shutdown(self) -> None:
+        """Shut down the batch rendering worker pool."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+    
+    def list_templates(self) -> List[Dict[str, Any]]:
+        """List the available report templates."""
+        return self.template_registry.list()
+    
+    async def _upload_report(
+        self, tmp_path: str, output_filename: str, content_type: str, folder: str
+    ) -> str:
+        """Upload a generated report file and remove the temporary copy."""
+        try:
+            with open(tmp_path, "rb") as f:
+                upload_file = UploadFile(
+                    filename=output_filename,
+                    file=f,
+                    headers=Headers({"content-type": content_type}),
+                )
+                file_path, _ = await storage_service.upload_file(
+                    upload_file, folder=folder
+                )
+        finally:
+            os.unlink(tmp_path)
+        
+        return file_path
     
     async def generate_docx_report(
         self,
@@ -35,25 +243,7 @@ class ReportingService:
             raise FileNotFoundError(f"Template {template_name}.docx not found")
         
         doc = Document(template_path)
-        
-        # Replace placeholders in paragraphs
-        for paragraph in doc.paragraphs:
-            for key, value in context.items():
-                if f"{{{{ {key} }}}}" in paragraph.text:
-                    paragraph.text = paragraph.text.replace(
-                        f"{{{{ {key} }}}}", str(value)
-                    )
-        
-        # Replace placeholders in tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        for key, value in context.items():
-                            if f"{{{{ {key} }}}}" in paragraph.text:
-                                paragraph.text = paragraph.text.replace(
-                                    f"{{{{ {key} }}}}", str(value)
-                                )
+        _fill_docx_placeholders(doc, context)
         
         # Save the document to a temporary file
         with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as tmp:
@@ -66,20 +256,12 @@ class ReportingService:
             timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
             output_filename = f"{template_name}_{timestamp}.docx"
         
-        with open(tmp_path, "rb") as f:
-            upload_file = UploadFile(
-                filename=output_filename,
-                file=f,
-                content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-            file_path, _ = await storage_service.upload_file(
-                upload_file, folder="reports/docx"
-            )
-        
-        # Clean up the temporary file
-        os.unlink(tmp_path)
-        
-        return file_path
+        return await self._upload_report(
+            tmp_path,
+            output_filename,
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            "reports/docx",
+        )
     
     async def generate_pdf_report(
         self,
@@ -111,30 +293,34 @@ class ReportingService:
             timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
             output_filename = f"{template_name}_{timestamp}.pdf"
         
-        with open(tmp_path, "rb") as f:
-            upload_file = UploadFile(
-                filename=output_filename,
-                file=f,
-                content_type="application/pdf",
-            )
-            file_path, _ = await storage_service.upload_file(
-                upload_file, folder="reports/pdf"
-            )
-        
-        # Clean up the temporary file
-        os.unlink(tmp_path)
-        
-        return file_path
+        return await self._upload_report(
+            tmp_path, output_filename, "application/pdf", "reports/pdf"
+        )
     
     async def generate_clinical_note_report(
         self, clinical_note: ClinicalNote, format_type: str = "pdf"
     ) -> str:
         """Generate a report for a clinical note."""
-        # Prepare context
+        context = self._clinical_note_context(clinical_note)
+        
+        # Generate report based on format
+        if format_type.lower() == "pdf":
+            return await self.generate_pdf_report(
+                "clinical_note", context, f"clinical_note_{clinical_note.id}.pdf"
+            )
+        elif format_type.lower() == "docx":
+            return await self.generate_docx_report(
+                "clinical_note", context, f"clinical_note_{clinical_note.id}.docx"
+            )
+        else:
+            raise ValueError(f"Unsupported format type: {format_type}")
+    
+    def _clinical_note_context(self, clinical_note: ClinicalNote) -> Dict[str, Any]:
+        """Build the template context for a clinical note report."""
         patient = clinical_note.patient
         clinician = clinical_note.created_by
         
-        context = {
+        return {
             "note_title": clinical_note.title,
             "note_content": clinical_note.content,
             "note_type": clinical_note.note_type,
@@ -147,23 +333,331 @@ class ReportingService:
             "clinician_name": clinician.full_name,
             "generated_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
         }
+    
+    def _patient_summary_context(
+        self,
+        patient: Patient,
+        appointments: List[Any],
+        include_notes: bool,
+        include_appointments: bool,
+    ) -> Dict[str, Any]:
+        """Build the template context for a patient summary, excluding notes."""
+        return {
+            "patient_name": patient.full_name,
+            "patient_dob": patient.date_of_birth.strftime("%Y-%m-%d"),
+            "patient_age": patient.age,
+            "patient_gender": patient.gender,
+            "patient_mrn": patient.medical_record_number,
+            "include_notes": include_notes,
+            "include_appointments": include_appointments,
+            "appointments": [
+                self._appointment_context(appointment) for appointment in appointments
+            ],
+            "generated_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        }
+    
+    async def generate_patient_summary_report(
+        self,
+        db: AsyncSession,
+        patient: Patient,
+        format_type: str = "pdf",
+        include_notes: bool = True,
+        include_appointments: bool = True,
+    ) -> str:
+        """Generate a summary report for a patient.
+
+        The data is loaded in a constant number of queries: one for all
+        attachments, one for all appointments and a single streamed query for
+        the notes, which are written into the document in chunks. Streaming
+        keeps the ORM rows to one chunk at a time, but the finished document
+        (python-docx object or WeasyPrint layout) is still held in memory, so
+        peak memory grows with the number of notes.
+        """
+        format_type = format_type.lower()
+        if format_type not in ("pdf", "docx"):
+            raise ValueError(f"Unsupported format type: {format_type}")
         
-        # Generate report based on format
-        if format_type.lower() == "pdf":
-            return await self.generate_pdf_report(
-                "clinical_note", context, f"clinical_note_{clinical_note.id}.pdf"
-            )
-        elif format_type.lower() == "docx":
-            return await self.generate_docx_report(
-                "clinical_note", context, f"clinical_note_{clinical_note.id}.docx"
+        attachments_by_note = (
+            await get_patient_attachments_by_note(db, patient.id) if include_notes else {}
+        )
+        appointments = (
+            await get_patient_appointment_history(db, patient.id)
+            if include_appointments
+            else []
+        )
+        
+        context = self._patient_summary_context(
+            patient, appointments, include_notes, include_appointments
+        )
+        
+        note_chunks = self._note_context_chunks(
+            db, patient.id, attachments_by_note, include_notes
+        )
+        output_filename = f"patient_summary_{patient.id}.{format_type}"
+        
+        if format_type == "pdf":
+            return await self._render_patient_summary_pdf(
+                context, note_chunks, output_filename
             )
-        else:
+        return await self._render_patient_summary_docx(
+            context, note_chunks, output_filename
+        )
+    
+    async def generate_batch_report(
+        self,
+        db: AsyncSession,
+        patients: List[Patient],
+        notes: List[ClinicalNote],
+        format_type: str = "pdf",
+        include_notes: bool = True,
+        include_appointments: bool = True,
+    ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """Generate patient summaries and note reports into a single ZIP bundle.
+
+        Data for each item is loaded in the event loop while earlier items are
+        rendered in the worker pool; at most ``REPORT_WORKERS`` renders are in
+        flight at once. Each rendered document is written into the bundle as
+        it completes and the bundle is uploaded to storage at the end.
+
+        Contexts are built in this process and pickled to the workers, so
+        peak memory here is about ``REPORT_WORKERS`` full patient contexts
+        (every note of each patient) plus the one being loaded.
+
+        Returns the storage path of the bundle (None if every item failed) and
+        a result entry per item.
+        """
+        format_type = format_type.lower()
+        if format_type not in ("pdf", "docx"):
             raise ValueError(f"Unsupported format type: {format_type}")
+        
+        jobs = [
+            ("patient", patient.id, "patient_summary", patient) for patient in patients
+        ] + [
+            ("clinical_note", note.id, "clinical_note", note) for note in notes
+        ]
+        
+        loop = asyncio.get_running_loop()
+        executor = self._get_process_pool()
+        max_in_flight = settings.REPORT_WORKERS
+        in_flight: Dict[asyncio.Future, Dict[str, Any]] = {}
+        results: List[Dict[str, Any]] = []
+        
+        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
+            zip_path = tmp.name
+        
+        try:
+            with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+                async def collect(return_when: str) -> None:
+                    done, _ = await asyncio.wait(in_flight, return_when=return_when)
+                    for future in done:
+                        result = in_flight.pop(future)
+                        try:
+                            bundle.writestr(result["filename"], future.result())
+                        except Exception as e:
+                            result["status"] = "error"
+                            result["error_message"] = str(e)
+                        results.append(result)
+                
+                for index, (item_type, item_id, template_name, entity) in enumerate(jobs):
+                    result = {
+                        "index": index,
+                        "item_type": item_type,
+                        "item_id": item_id,
+                        "filename": f"{template_name}_{item_id}.{format_type}",
+                        "status": "success",
+                        "error_message": None,
+                    }
+                    
+                    try:
+                        if not self._can_render(template_name, format_type):
+                            raise FileNotFoundError(
+                                f"Template {template_name} not available as {format_type}"
+                            )
+                        if item_type == "patient":
+                            context = await self._batch_patient_summary_context(
+                                db, entity, include_notes, include_appointments
+                            )
+                        else:
+                            context = self._clinical_note_context(entity)
+                    except Exception as e:
+                        result["status"] = "error"
+                        result["error_message"] = str(e)
+                        results.append(result)
+                        continue
+                    
+                    future = loop.run_in_executor(
+                        executor,
+                        render_report_document,
+                        str(self.templates_dir),
+                        template_name,
+                        format_type,
+                        context,
+                    )
+                    in_flight[future] = result
+                    
+                    if len(in_flight) >= max_in_flight:
+                        await collect(asyncio.FIRST_COMPLETED)
+                
+                while in_flight:
+                    await collect(asyncio.ALL_COMPLETED)
+        except BaseException:
+            os.unlink(zip_path)
+            raise
+        
+        results.sort(key=lambda result: result.pop("index"))
+        
+        if not any(result["status"] == "success" for result in results):
+            os.unlink(zip_path)
+            return None, results
+        
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        file_path = await self._upload_report(
+            zip_path, f"report_bundle_{timestamp}.zip", "application/zip", "reports/batch"
+        )
+        return file_path, results
+    
+    def _can_render(self, template_name: str, format_type: str) -> bool:
+        """Check whether a report can be rendered in the given format."""
+        if template_name == "patient_summary" and format_type == "docx":
+            # Falls back to a generated document when no DOCX template exists
+            return True
+        return self.template_registry.has(template_name, format_type)
+    
+    async def _batch_patient_summary_context(
+        self,
+        db: AsyncSession,
+        patient: Patient,
+        include_notes: bool,
+        include_appointments: bool,
+    ) -> Dict[str, Any]:
+        """Load the full patient summary context, notes included, for a worker.
 
+        Every note is materialised because the context is pickled to a worker
+        process; the batch bounds how many of these are alive at once.
+        """
+        attachments_by_note = (
+            await get_patient_attachments_by_note(db, patient.id) if include_notes else {}
+        )
+        appointments = (
+            await get_patient_appointment_history(db, patient.id)
+            if include_appointments
+            else []
+        )
+        
+        context = self._patient_summary_context(
+            patient, appointments, include_notes, include_appointments
+        )
+        context["notes"] = [
+            note
+            async for chunk in self._note_context_chunks(
+                db, patient.id, attachments_by_note, include_notes
+            )
+            for note in chunk
+        ]
+        return context
+    
+    async def _note_context_chunks(
+        self,
+        db: AsyncSession,
+        patient_id: int,
+        attachments_by_note: Dict[int, List[Attachment]],
+        include_notes: bool,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield template contexts for a patient's notes, one chunk at a time."""
+        if not include_notes:
+            return
+        
+        async for notes in stream_patient_clinical_notes(
+            db, patient_id, chunk_size=NOTE_CHUNK_SIZE
+        ):
+            yield [
+                {
+                    "title": note.title,
+                    "note_type": note.note_type,
+                    "date": note.created_at.strftime("%Y-%m-%d %H:%M"),
+                    "content": note.content,
+                    "clinician_name": note.created_by.full_name if note.created_by else "",
+                    "attachments": [
+                        attachment.filename
+                        for attachment in attachments_by_note.get(note.id, [])
+                    ],
+                }
+                for note in notes
+            ]
+    
+    def _appointment_context(self, appointment: Any) -> Dict[str, Any]:
+        """Build the template context for an appointment."""
+        return {
+            "title": appointment.title,
+            "appointment_type": appointment.appointment_type,
+            "status": appointment.status,
+            "start_time": appointment.start_time.strftime("%Y-%m-%d %H:%M"),
+            "end_time": appointment.end_time.strftime("%Y-%m-%d %H:%M"),
+            "location": appointment.location or "",
+        }
+    
+    async def _render_patient_summary_pdf(
+        self,
+        context: Dict[str, Any],
+        note_chunks: AsyncIterator[List[Dict[str, Any]]],
+        output_filename: str,
+    ) -> str:
+        """Render the patient summary HTML template to PDF.
 
-# Create a singleton instance
-reporting_service = ReportingService()
+        The template is rendered incrementally to a temporary file so the full
+        HTML document is never built as a single string. WeasyPrint then
+        parses and lays out the whole file at once, so memory during
+        ``write_pdf`` is proportional to the document, not to a chunk.
+        """
+        template = self.template_registry.get_html_template("patient_summary")
+        
+        async def notes():
+            async for chunk in note_chunks:
+                for note in chunk:
+                    yield note
+        
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".html", delete=False, encoding="utf-8"
+        ) as html_file:
+            html_path = html_file.name
+            async for fragment in template.generate_async(notes=notes(), **context):
+                html_file.write(fragment)
+        
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp_path = tmp.name
+        
+        try:
+            HTML(filename=html_path).write_pdf(tmp_path)
+        finally:
+            os.unlink(html_path)
+        
+        return await self._upload_report(
+            tmp_path, output_filename, "application/pdf", "reports/pdf"
+        )
+    
+    async def _render_patient_summary_docx(
+        self,
+        context: Dict[str, Any],
+        note_chunks: AsyncIterator[List[Dict[str, Any]]],
+        output_filename: str,
+    ) -> str:
+        """Build the patient summary DOCX, appending notes chunk by chunk."""
+        doc = _start_patient_summary_docx(self.templates_dir, context)
+        async for chunk in note_chunks:
+            _add_docx_notes(doc, chunk)
+        
+        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as tmp:
+            tmp_path = tmp.name
+        
+        doc.save(tmp_path)
+        
+        return await self._upload_report(
+            tmp_path,
+            output_filename,
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            "reports/docx",
+        )
 
 
-# Import here to avoid circular imports
-from fastapi import UploadFile
\ No newline at end of file
+# Create a singleton instance
+reporting_service = ReportingService()
@@ -1,84 +1,382 @@
-import io
+import hashlib
+import hmac
+import logging
+import os
+import time
 import uuid
-from datetime import datetime, timedelta
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
 from typing import Optional, Tuple
+from urllib.parse import quote, urlencode
 
 import boto3
 from botocore.exceptions import ClientError
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# S3 requires every part except the last to be at least 5 MiB
+MIN_MULTIPART_CHUNK_SIZE = 5 * 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """Interface for blob storage backends.
+
+    All methods are async; implementations must not block the event loop.
+    """
+
+    @abstractmethod
+    async def upload(self, file: UploadFile, key: str, content_type: Optional[str]) -> int:
+        """Stream an upload to ``key`` and return the number of bytes stored."""
+
+    @abstractmethod
+    async def move(self, source_key: str, key: str) -> None:
+        """Move the object at ``source_key`` to ``key``, replacing any object there."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete the object at ``key``."""
+
+    @abstractmethod
+    async def generate_presigned_url(self, key: str, expires_in: int = 3600) -> Optional[str]:
+        """Generate a time-limited URL for downloading the object at ``key``."""
+
+
+class S3StorageBackend(StorageBackend):
+    """Storage backend for AWS S3 and S3-compatible services such as MinIO.
+
+    boto3 is blocking, so every call runs in the thread pool. Uploads are read
+    from the ``UploadFile`` in chunks; anything larger than one chunk is sent
+    as a multipart upload. At most two chunks are held in memory: the part
+    being sent, and the next one, read ahead to tell when a part is the last.
+    """
+
+    def __init__(self, chunk_size: int = settings.STORAGE_CHUNK_SIZE):
+        """Initialize the S3 client."""
+        if not settings.S3_BUCKET_NAME:
+            raise ValueError("S3_BUCKET_NAME must be set to use the S3 storage backend")
 
-class StorageService:
-    """Service for handling file storage operations using AWS S3."""
-    
-    def __init__(self):
-        """Initialize the storage service with AWS S3 client."""
         self.s3_client = boto3.client(
             "s3",
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
             region_name=settings.AWS_REGION,
+            endpoint_url=settings.S3_ENDPOINT_URL,
         )
         self.bucket_name = settings.S3_BUCKET_NAME
-    
-    async def upload_file(
-        self, file: UploadFile, folder: str = "uploads"
-    ) -> Tuple[str, str]:
-        """Upload a file to S3 and return the file path and filename."""
-        # Generate a unique filename
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        file_extension = file.filename.split(".")[-1] if "." in file.filename else ""
-        new_filename = f"{timestamp}_{unique_id}.{file_extension}"
-        
-        # Create the S3 key (path)
-        s3_key = f"{folder}/{new_filename}"
-        
-        # Read the file content
-        content = await file.read()
-        
-        # Upload to S3
-        self.s3_client.upload_fileobj(
-            io.BytesIO(content),
+        self.chunk_size = max(chunk_size, MIN_MULTIPART_CHUNK_SIZE)
+
+    async def upload(self, file: UploadFile, key: str, content_type: Optional[str]) -> int:
+        """Stream an upload to S3, switching to multipart for large files."""
+        extra_args = {"ContentType": content_type} if content_type else {}
+
+        chunk = await file.read(self.chunk_size)
+        next_chunk = await file.read(self.chunk_size) if chunk else b""
+
+        if not next_chunk:
+            # Fits in a single request
+            await run_in_threadpool(
+                self.s3_client.put_object,
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=chunk,
+                **extra_args,
+            )
+            return len(chunk)
+
+        multipart = await run_in_threadpool(
+            self.s3_client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=key,
+            **extra_args,
+        )
+        upload_id = multipart["UploadId"]
+        parts = []
+        size = 0
+
+        try:
+            part_number = 1
+            while chunk:
+                part = await run_in_threadpool(
+                    self.s3_client.upload_part,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                )
+                parts.append({"ETag": part["ETag"], "PartNumber": part_number})
+                size += len(chunk)
+                part_number += 1
+                chunk, next_chunk = next_chunk, (
+                    await file.read(self.chunk_size) if next_chunk else b""
+                )
+
+            await run_in_threadpool(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            await run_in_threadpool(
+                self.s3_client.abort_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+            )
+            raise
+
+        return size
+
+    async def move(self, source_key: str, key: str) -> None:
+        """Copy an object server-side, multipart for large objects, then delete the source."""
+        await run_in_threadpool(
+            self.s3_client.copy,
+            {"Bucket": self.bucket_name, "Key": source_key},
             self.bucket_name,
-            s3_key,
-            ExtraArgs={
-                "ContentType": file.content_type,
-            },
+            key,
+        )
+        await run_in_threadpool(
+            self.s3_client.delete_object,
+            Bucket=self.bucket_name,
+            Key=source_key,
         )
-        
-        return s3_key, new_filename
-    
-    def generate_presigned_url(self, file_path: str, expires_in: int = 3600) -> Optional[str]:
-        """Generate a presigned URL for accessing a file."""
+
+    async def delete(self, key: str) -> bool:
+        """Delete an object from S3."""
         try:
-            url = self.s3_client.generate_presigned_url(
+            await run_in_threadpool(
+                self.s3_client.delete_object,
+                Bucket=self.bucket_name,
+                Key=key,
+            )
+            return True
+        except ClientError as e:
+            logger.error(f"Error deleting file: {e}")
+            return False
+
+    async def generate_presigned_url(self, key: str, expires_in: int = 3600) -> Optional[str]:
+        """Generate a presigned S3 GET URL."""
+        try:
+            return await run_in_threadpool(
+                self.s3_client.generate_presigned_url,
                 "get_object",
                 Params={
                     "Bucket": self.bucket_name,
-                    "Key": file_path,
+                    "Key": key,
                 },
                 ExpiresIn=expires_in,
             )
-            return url
         except ClientError as e:
-            print(f"Error generating presigned URL: {e}")
+            logger.error(f"Error generating presigned URL: {e}")
             return None
-    
-    def delete_file(self, file_path: str) -> bool:
-        """Delete a file from S3."""
+
+
+class LocalStorageBackend(StorageBackend):
+    """Storage backend that writes to the local filesystem, for development and tests.
+
+    Files are served under ``LOCAL_STORAGE_BASE_URL`` only with a valid
+    signature, so like S3 presigned URLs, download URLs cannot be guessed
+    from a key and stop working when they expire.
+    """
+
+    def __init__(self, root: str = settings.LOCAL_STORAGE_DIR, chunk_size: int = settings.STORAGE_CHUNK_SIZE):
+        """Initialize the storage root directory."""
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+
+    def _path_for(self, key: str) -> Path:
+        """Resolve a key to a path, refusing keys that escape the root."""
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    async def upload(self, file: UploadFile, key: str, content_type: Optional[str]) -> int:
+        """Stream an upload to a file, writing via a temporary path."""
+        path = self._path_for(key)
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+
+        size = 0
+        out = await run_in_threadpool(open, tmp_path, "wb")
         try:
-            self.s3_client.delete_object(
-                Bucket=self.bucket_name,
-                Key=file_path,
-            )
+            while chunk := await file.read(self.chunk_size):
+                await run_in_threadpool(out.write, chunk)
+                size += len(chunk)
+            await run_in_threadpool(out.close)
+            await run_in_threadpool(os.replace, tmp_path, path)
+        except BaseException:
+            out.close()
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+        return size
+
+    async def move(self, source_key: str, key: str) -> None:
+        """Rename a file within the storage root."""
+        path = self._path_for(key)
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        await run_in_threadpool(os.replace, self._path_for(source_key), path)
+
+    async def delete(self, key: str) -> bool:
+        """Delete a file from the storage root."""
+        try:
+            await run_in_threadpool(self._path_for(key).unlink)
             return True
-        except ClientError as e:
-            print(f"Error deleting file: {e}")
+        except (OSError, ValueError) as e:
+            logger.error(f"Error deleting file: {e}")
             return False
 
+    @staticmethod
+    def _signature(key: str, expires: int) -> str:
+        """HMAC of a key and its expiry time, keyed by the application secret."""
+        message = f"{key}:{expires}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    async def generate_presigned_url(self, key: str, expires_in: int = 3600) -> Optional[str]:
+        """Return a signed URL for a stored file, valid for ``expires_in`` seconds."""
+        if not self._path_for(key).exists():
+            return None
+        expires = int(time.time()) + expires_in
+        query = urlencode({"expires": expires, "signature": self._signature(key, expires)})
+        return f"{settings.LOCAL_STORAGE_BASE_URL.rstrip('/')}/{quote(key)}?{query}"
+
+    def resolve_signed(self, key: str, expires: int, signature: str) -> Optional[Path]:
+        """Return the path of a stored file if the URL's signature is valid and unexpired."""
+        if expires < time.time():
+            return None
+        if not hmac.compare_digest(signature, self._signature(key, expires)):
+            return None
+        try:
+            path = self._path_for(key)
+        except ValueError:
+            return None
+        return path if path.is_file() else None
+
+
+class _HashingReader:
+    """Wraps an upload, hashing and counting its bytes as a backend streams it."""
+
+    def __init__(self, file: UploadFile):
+        self.file = file
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = await self.file.read(size)
+        # hashlib releases the GIL for large buffers
+        await run_in_threadpool(self.digest.update, chunk)
+        self.size += len(chunk)
+        return chunk
+
+
+def get_storage_backend() -> StorageBackend:
+    """Create the storage backend selected by ``STORAGE_BACKEND``."""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend()
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageBackend()
+    raise ValueError(f"Unsupported storage backend: {settings.STORAGE_BACKEND}")
+
+
+class StorageService:
+    """Service for handling file storage operations on the configured backend.
+
+    Presigned URLs are cached per (key, expires_in, expiry bucket). Time is cut
+    into buckets of ``PRESIGNED_URL_CACHE_FRACTION * expires_in`` seconds and a
+    URL signed during a bucket is reused until the bucket ends, so every URL
+    handed out still has at least the remaining fraction of its lifetime left.
+    At most ``PRESIGNED_URL_CACHE_SIZE`` URLs are kept, least recently used
+    first out; URLs from ended buckets are never hit again and age out.
+    """
+
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        """Initialize the storage service with a storage backend."""
+        self.backend = backend or get_storage_backend()
+        self._url_cache: OrderedDict[Tuple[str, int, int], str] = OrderedDict()
+
+    async def upload_file(
+        self, file: UploadFile, folder: str = "uploads"
+    ) -> Tuple[str, str]:
+        """Upload a file and return the file path and filename."""
+        # Generate a unique filename
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        unique_id = str(uuid.uuid4())[:8]
+        file_extension = file.filename.split(".")[-1] if "." in file.filename else ""
+        new_filename = f"{timestamp}_{unique_id}.{file_extension}"
+
+        # Create the storage key (path)
+        key = f"{folder}/{new_filename}"
+
+        # Stream the upload to the backend
+        await self.backend.upload(file, key, file.content_type)
+
+        return key, new_filename
+
+    @staticmethod
+    def blob_key(content_hash: str) -> str:
+        """The content-addressed storage key for content with the given SHA-256."""
+        return f"blobs/{content_hash[:2]}/{content_hash}"
+
+    async def stage_blob(self, file: UploadFile) -> Tuple[str, str, int]:
+        """Upload a file to a staging key, hashing it in the same pass.
+
+        Returns the staging key, the content's SHA-256 and its size. The
+        staged upload is then either stored under its content-addressed key
+        with ``store_blob`` or dropped with ``delete_file`` if that content
+        is already stored.
+        """
+        staging_key = f"blobs/staging/{uuid.uuid4().hex}"
+        reader = _HashingReader(file)
+        await self.backend.upload(reader, staging_key, file.content_type)
+        return staging_key, reader.digest.hexdigest(), reader.size
+
+    async def store_blob(self, staging_key: str, content_hash: str) -> str:
+        """Move a staged upload to its content-addressed key and return the key."""
+        key = self.blob_key(content_hash)
+        await self.backend.move(staging_key, key)
+        return key
+
+    def _expiry_bucket(self, expires_in: int) -> int:
+        """Return the current cache bucket for URLs valid for ``expires_in`` seconds."""
+        window = max(1, int(expires_in * settings.PRESIGNED_URL_CACHE_FRACTION))
+        return int(time.time() // window)
+
+    async def generate_presigned_url(self, file_path: str, expires_in: int = 3600) -> Optional[str]:
+        """Generate a presigned URL for accessing a file, reusing a cached one when still fresh."""
+        cache_key = (file_path, expires_in, self._expiry_bucket(expires_in))
+        url = self._url_cache.get(cache_key)
+        if url:
+            self._url_cache.move_to_end(cache_key)
+            return url
+
+        url = await self.backend.generate_presigned_url(file_path, expires_in)
+        if url:
+            self._url_cache[cache_key] = url
+            if len(self._url_cache) > settings.PRESIGNED_URL_CACHE_SIZE:
+                self._url_cache.popitem(last=False)
+        return url
+
+    def invalidate_presigned_urls(self, file_path: str) -> None:
+        """Forget cached URLs for a file."""
+        for cache_key in [k for k in self._url_cache if k[0] == file_path]:
+            del self._url_cache[cache_key]
+
+    async def delete_file(self, file_path: str) -> bool:
+        """Delete a file from storage."""
+        self.invalidate_presigned_urls(file_path)
+        return await self.backend.delete(file_path)
+
 
 # Create a singleton instance
-storage_service = StorageService()
\ No newline at end of file
+storage_service = StorageService()
@@ -0,0 +1,106 @@
+"""Shared fixtures: an SQLite database, local storage and an API client.
+
+Run from the backend directory:
+
+    python -m pytest tests
+"""
+import os
+import tempfile
+
+# Settings are read at import time, so configure them before importing app
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("POSTGRES_SERVER", "localhost")
+os.environ.setdefault("POSTGRES_USER", "eira")
+os.environ.setdefault("POSTGRES_PASSWORD", "eira")
+os.environ.setdefault("POSTGRES_DB", "eira")
+os.environ.setdefault("REDIS_HOST", "localhost")
+os.environ.setdefault("FIRST_SUPERUSER_EMAIL", "admin@example.com")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "admin")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["LOCAL_STORAGE_DIR"] = tempfile.mkdtemp(prefix="eira-storage-")
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.compression import GZipRequestMiddleware
+from app.core.config import settings
+from app.core.security import (
+    get_current_active_clinician,
+    get_current_active_superuser,
+    get_current_active_user,
+    get_current_user,
+)
+from app.db import base  # noqa: F401  (registers every model)
+from app.db.base_class import Base
+from app.db.init_db import get_db
+from app.db.models.user import User
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'eira.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def user(db):
+    user = User(
+        email="clinician@example.com",
+        hashed_password="-",
+        full_name="Test Clinician",
+        role="clinician",
+    )
+    db.add(user)
+    await db.commit()
+    return user
+
+
+@pytest.fixture
+def make_client(session_factory, user):
+    """Build a client for an app serving the given ``(router, prefix)`` pairs.
+
+    Prefixes are full paths, e.g. ``settings.API_V1_STR + "/patients"``.
+
+    Requests are authenticated as ``user`` and each gets its own session,
+    as with ``get_db`` in production.
+    """
+    async def override_get_db():
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    def make(*routers) -> httpx.AsyncClient:
+        # The same middleware as app.main
+        app = FastAPI()
+        app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+        app.add_middleware(GZipRequestMiddleware)
+        for router, prefix in routers:
+            app.include_router(router, prefix=prefix)
+        app.dependency_overrides[get_db] = override_get_db
+        for dependency in (
+            get_current_user,
+            get_current_active_user,
+            get_current_active_clinician,
+            get_current_active_superuser,
+        ):
+            app.dependency_overrides[dependency] = lambda: user
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    return make
@@ -0,0 +1,112 @@
+"""Content-addressed attachment storage: deduplication and deletion."""
+import hashlib
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.api.api_v1.endpoints import clinical_notes
+from app.core.config import settings
+from app.db.models.clinical_note import Attachment, ClinicalNote
+from app.db.models.patient import Patient
+from app.services.storage import storage_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def note(db, user):
+    patient = Patient(
+        first_name="Ann",
+        last_name="Lee",
+        date_of_birth=date(1980, 1, 1),
+        gender="Female",
+        medical_record_number="MRN-1",
+        created_by_id=user.id,
+    )
+    db.add(patient)
+    await db.flush()
+    note = ClinicalNote(
+        title="Visit", content="Notes", note_type="progress", patient_id=patient.id, created_by_id=user.id
+    )
+    db.add(note)
+    await db.commit()
+    return note
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client((clinical_notes.router, settings.API_V1_STR + "/clinical-notes"))
+
+
+def blob_path(content: bytes):
+    key = storage_service.blob_key(hashlib.sha256(content).hexdigest())
+    return storage_service.backend._path_for(key)
+
+
+async def upload(client, note, content: bytes, filename="scan.pdf"):
+    response = await client.post(
+        f"/api/v1/clinical-notes/{note.id}/attachments",
+        params={"file_type": "document"},
+        files={"file": (filename, content, "application/pdf")},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_identical_uploads_share_one_blob(client, note):
+    content = b"%PDF-1.4 identical scan"
+    first = await upload(client, note, content, "a.pdf")
+    second = await upload(client, note, content, "b.pdf")
+
+    assert first["file_path"] == second["file_path"] == storage_service.blob_key(first["content_hash"])
+    assert first["content_hash"] == hashlib.sha256(content).hexdigest()
+    assert blob_path(content).read_bytes() == content
+    # The staged copy of the duplicate was discarded
+    assert not list(blob_path(content).parent.parent.glob("staging/*"))
+
+    stats = (await client.get("/api/v1/clinical-notes/attachments/storage-stats")).json()
+    assert stats["attachments"] == 2
+    assert stats["unique_blobs"] == 1
+    assert stats["bytes_saved"] == len(content)
+
+
+async def test_blob_is_removed_with_its_last_reference(client, note, db):
+    content = b"%PDF-1.4 shared scan"
+    first = await upload(client, note, content)
+    second = await upload(client, note, content)
+
+    response = await client.delete(f"/api/v1/clinical-notes/{note.id}/attachments/{first['id']}")
+    assert response.status_code == 200
+    assert blob_path(content).exists()
+
+    response = await client.delete(f"/api/v1/clinical-notes/{note.id}/attachments/{second['id']}")
+    assert response.status_code == 200
+    assert not blob_path(content).exists()
+    assert (await db.execute(select(Attachment))).scalars().all() == []
+
+
+async def test_deletion_is_committed_before_the_blob_is_removed(client, note, session_factory, monkeypatch):
+    content = b"%PDF-1.4 scan"
+    attachment = await upload(client, note, content)
+
+    async def fail_delete(file_path):
+        raise OSError("storage unavailable")
+
+    monkeypatch.setattr(storage_service, "delete_file", fail_delete)
+    with pytest.raises(OSError):
+        await client.delete(f"/api/v1/clinical-notes/{note.id}/attachments/{attachment['id']}")
+
+    # The record is gone and the blob is orphaned, rather than the reverse
+    async with session_factory() as session:
+        assert await session.get(Attachment, attachment["id"]) is None
+    assert blob_path(content).exists()
+
+
+async def test_attachments_without_a_hash_are_never_matched(client, note, db):
+    db.add(Attachment(filename="old.pdf", file_type="document", file_path="attachments/old.pdf", clinical_note_id=note.id))
+    await db.commit()
+
+    attachment = await upload(client, note, b"%PDF-1.4 new")
+    assert attachment["file_path"] == storage_service.blob_key(attachment["content_hash"])
@@ -0,0 +1,85 @@
+"""Gzip request and response bodies on the sync API."""
+import gzip
+import json
+
+import httpx
+import pytest
+
+from app.api.api_v1.endpoints import sync
+from app.core.compression import GZipRequestMiddleware
+from app.core.config import settings
+from app.db.models.sync_outbox import SyncOutbox
+
+pytestmark = pytest.mark.asyncio
+
+PUSH = f"{settings.API_V1_STR}/sync/push"
+PULL = f"{settings.API_V1_STR}/sync/pull"
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client((sync.router, settings.API_V1_STR + "/sync"))
+
+
+def gzipped(payload) -> bytes:
+    return gzip.compress(json.dumps(payload).encode())
+
+
+async def post_gzip(client, content: bytes):
+    return await client.post(
+        PUSH, content=content, headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    )
+
+
+async def test_gzipped_push_is_inflated_for_the_endpoint(client):
+    change = {"entity_type": "patient", "entity_id": "404", "operation": "delete", "payload": {}}
+    response = await post_gzip(client, gzipped({"changes": [change] * 50}))
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 50
+    assert results[0]["error_message"] == "Entity patient with ID 404 not found"
+
+
+async def test_invalid_gzip_body_is_rejected(client):
+    response = await post_gzip(client, b"not gzip at all")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid gzip request body"}
+
+
+async def test_oversized_bodies_are_rejected():
+    async def echo(scope, receive, send):
+        body = (await receive())["body"]
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+    app = GZipRequestMiddleware(echo, max_size=1024)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    response = await post_gzip(client, gzip.compress(b" " * 1024))
+    assert response.content == b" " * 1024
+
+    # A small body that inflates past the cap, as in a gzip bomb
+    response = await post_gzip(client, gzip.compress(b" " * 4096))
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Decompressed request body too large"}
+
+    # A compressed body that is itself over the cap
+    response = await post_gzip(client, gzip.compress(bytes(range(256)) * 16, compresslevel=0))
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large"}
+
+
+async def test_pull_response_is_gzipped_and_round_trips(client, db):
+    db.add_all(
+        SyncOutbox(entity_type="patient", entity_id=str(i), operation="create", payload=json.dumps({"id": i}))
+        for i in range(50)
+    )
+    await db.commit()
+
+    response = await client.get(PULL, params={"since": "2000-01-01T00:00:00Z"}, headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert [change["entity_id"] for change in response.json()["changes"]] == [str(i) for i in range(50)]
@@ -0,0 +1,91 @@
+"""Conditional GETs: ETag / Last-Modified validators and 304 responses."""
+from datetime import date
+
+import pytest
+import pytest_asyncio
+
+from app.api.api_v1.endpoints import clinical_notes, patients
+from app.core.config import settings
+from app.db.models.clinical_note import Attachment, ClinicalNote
+from app.db.models.patient import Patient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def add_patient(db, user, mrn, first_name="Ann"):
+    patient = Patient(
+        first_name=first_name,
+        last_name="Lee",
+        date_of_birth=date(1980, 1, 1),
+        gender="Female",
+        medical_record_number=mrn,
+        created_by_id=user.id,
+    )
+    db.add(patient)
+    await db.commit()
+    return patient
+
+
+@pytest_asyncio.fixture
+async def patient(db, user):
+    return await add_patient(db, user, "MRN-1")
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(
+        (patients.router, settings.API_V1_STR + "/patients"),
+        (clinical_notes.router, settings.API_V1_STR + "/clinical-notes"),
+    )
+
+
+async def test_unchanged_patient_list_is_not_modified(client, patient):
+    first = await client.get("/api/v1/patients/")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    etag = first.headers["ETag"]
+
+    again = await client.get("/api/v1/patients/", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+    # Weak comparison ignores the W/ prefix
+    strong = await client.get("/api/v1/patients/", headers={"If-None-Match": etag[2:]})
+    assert strong.status_code == 304
+
+    since = await client.get("/api/v1/patients/", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+
+async def test_patient_list_validators_change_with_the_rows_and_query(client, db, user, patient):
+    etag = (await client.get("/api/v1/patients/")).headers["ETag"]
+
+    other_page = await client.get("/api/v1/patients/", params={"skip": 10}, headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+
+    await add_patient(db, user, "MRN-2", first_name="Bob")
+    changed = await client.get("/api/v1/patients/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 2
+
+
+async def test_note_validator_changes_when_an_attachment_is_added(client, db, user, patient):
+    note = ClinicalNote(
+        title="Visit", content="Notes", note_type="progress", patient_id=patient.id, created_by_id=user.id
+    )
+    db.add(note)
+    await db.commit()
+    url = f"/api/v1/clinical-notes/{note.id}"
+    etag = (await client.get(url)).headers["ETag"]
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+    db.add(Attachment(
+        clinical_note_id=note.id, filename="scan.pdf", file_type="document", file_path="blobs/x"
+    ))
+    await db.commit()
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,73 @@
+"""Batch reports: the ZIP bundle and per-item results."""
+import io
+import zipfile
+from datetime import date
+
+import pytest
+import pytest_asyncio
+
+from app.api.api_v1.endpoints import reports, storage
+from app.core.config import settings
+from app.db.models.clinical_note import ClinicalNote
+from app.db.models.patient import Patient
+from app.services.reporting import reporting_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def note(db, user):
+    patient = Patient(
+        first_name="Ann",
+        last_name="Lee",
+        date_of_birth=date(1980, 1, 1),
+        gender="Female",
+        medical_record_number="MRN-1",
+        created_by_id=user.id,
+    )
+    db.add(patient)
+    await db.flush()
+    note = ClinicalNote(
+        title="Visit", content="Notes", note_type="progress", patient_id=patient.id, created_by_id=user.id
+    )
+    db.add(note)
+    await db.commit()
+    return note
+
+
+@pytest.fixture
+def client(make_client):
+    yield make_client(
+        (reports.router, settings.API_V1_STR + "/reports"),
+        (storage.router, settings.LOCAL_STORAGE_BASE_URL),
+    )
+    reporting_service.shutdown()
+
+
+async def test_batch_bundles_reports_and_lists_every_item(client, note):
+    response = await client.post(
+        "/api/v1/reports/batch",
+        json={"patient_ids": [note.patient_id, 999], "note_ids": [note.id], "format_type": "docx"},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    results = {(r["item_type"], r["item_id"]): r for r in body["results"]}
+    assert (body["total"], body["succeeded"], body["failed"]) == (3, 1, 2)
+    assert results[("patient", note.patient_id)]["status"] == "success"
+    assert results[("patient", 999)]["error_message"] == "Not found"
+    # Only the patient summary has a DOCX fallback
+    assert results[("clinical_note", note.id)]["error_message"] == (
+        "Template clinical_note not available as docx"
+    )
+
+    download = await client.get(body["url"])
+    assert download.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(download.content)) as bundle:
+        assert bundle.namelist() == [f"patient_summary_{note.patient_id}.docx"]
+
+
+async def test_batch_of_only_missing_ids_is_rejected(client, note):
+    response = await client.post("/api/v1/reports/batch", json={"patient_ids": [999], "format_type": "docx"})
+
+    assert response.status_code == 400
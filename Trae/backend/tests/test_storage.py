@@ -0,0 +1,132 @@
+"""Storage: signed download URLs, the presigned URL cache and streamed uploads."""
+import hashlib
+import io
+from urllib.parse import urlsplit
+
+import pytest
+from fastapi import UploadFile
+
+from app.api.api_v1.endpoints import storage
+from app.core.config import settings
+from app.services import storage as storage_module
+from app.services.storage import MIN_MULTIPART_CHUNK_SIZE, S3StorageBackend, StorageService, storage_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client((storage.router, settings.LOCAL_STORAGE_BASE_URL))
+
+
+async def store(key: str, content: bytes) -> None:
+    await storage_service.backend.upload(UploadFile(io.BytesIO(content)), key, "text/plain")
+
+
+async def test_signed_url_serves_the_file(client):
+    await store("attachments/report.txt", b"clinical report")
+
+    url = await storage_service.backend.generate_presigned_url("attachments/report.txt")
+    response = await client.get(url)
+
+    assert response.status_code == 200
+    assert response.content == b"clinical report"
+
+
+async def test_unsigned_tampered_and_expired_urls_are_refused(client):
+    await store("attachments/a.txt", b"a")
+    await store("attachments/b.txt", b"b")
+
+    assert (await client.get(f"{settings.LOCAL_STORAGE_BASE_URL}/attachments/a.txt")).status_code == 422
+
+    url = urlsplit(await storage_service.backend.generate_presigned_url("attachments/a.txt"))
+    other_key = url.path.replace("a.txt", "b.txt")
+    assert (await client.get(f"{other_key}?{url.query}")).status_code == 403
+
+    expired = await storage_service.backend.generate_presigned_url("attachments/a.txt", expires_in=-1)
+    assert (await client.get(expired)).status_code == 403
+
+
+
+class CountingBackend:
+    """Signs URLs without touching the disk, recording each signature."""
+
+    def __init__(self):
+        self.signed = []
+
+    async def generate_presigned_url(self, key: str, expires_in: int = 3600):
+        self.signed.append(key)
+        return f"https://files.example/{key}?n={len(self.signed)}"
+
+
+async def test_presigned_url_cache_evicts_the_least_recently_used(monkeypatch):
+    monkeypatch.setattr(settings, "PRESIGNED_URL_CACHE_SIZE", 2)
+    backend = CountingBackend()
+    service = StorageService(backend)
+
+    first = await service.generate_presigned_url("a")
+    await service.generate_presigned_url("b")
+    assert await service.generate_presigned_url("a") == first
+    # "b" is now the least recently used, so "c" pushes it out
+    await service.generate_presigned_url("c")
+    await service.generate_presigned_url("a")
+    await service.generate_presigned_url("b")
+
+    assert backend.signed == ["a", "b", "c", "b"]
+    assert len(service._url_cache) == 2
+
+    service.invalidate_presigned_urls("b")
+    await service.generate_presigned_url("b")
+    assert backend.signed[-1] == "b" and len(backend.signed) == 5
+
+
+class FakeS3Client:
+    """Records the parts of uploads the way S3 would assemble them."""
+
+    def __init__(self):
+        self.objects = {}
+        self.parts = {}
+        self.part_sizes = []
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.parts[Key] = []
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts[Key].append(Body)
+        self.part_sizes.append(len(Body))
+        return {"ETag": str(PartNumber)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.objects[Key] = b"".join(self.parts.pop(Key))
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    client = FakeS3Client()
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", "eira")
+    monkeypatch.setattr(storage_module.boto3, "client", lambda *args, **kwargs: client)
+    return client
+
+
+async def test_large_upload_is_streamed_in_parts_and_hashed(s3):
+    service = StorageService(S3StorageBackend(chunk_size=MIN_MULTIPART_CHUNK_SIZE))
+    content = bytes(range(256)) * (MIN_MULTIPART_CHUNK_SIZE * 2 // 256) + b"tail"
+
+    key, content_hash, size = await service.stage_blob(UploadFile(io.BytesIO(content)))
+
+    assert s3.part_sizes == [MIN_MULTIPART_CHUNK_SIZE, MIN_MULTIPART_CHUNK_SIZE, 4]
+    assert s3.objects[key] == content
+    assert (content_hash, size) == (hashlib.sha256(content).hexdigest(), len(content))
+
+
+async def test_small_upload_is_sent_in_one_request(s3):
+    service = StorageService(S3StorageBackend())
+
+    key, content_hash, size = await service.stage_blob(UploadFile(io.BytesIO(b"small scan")))
+
+    assert s3.objects[key] == b"small scan"
+    assert (content_hash, size) == (hashlib.sha256(b"small scan").hexdigest(), 10)
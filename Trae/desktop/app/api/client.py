@@ -1,21 +1,56 @@
+import asyncio
+import hashlib
 import json
 import logging
+import mimetypes
+import os
 from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlencode
 
 import httpx
 
+from app.api.response_cache import ResponseCache
 from app.core.config import settings
+from app.network.http_transport import HTTPTransport
 
 logger = logging.getLogger(__name__)
 
 
 class APIClient:
-    """Client for interacting with the Eira backend API."""
-
-    def __init__(self, base_url: str = None, token: str = None):
+    """Client for interacting with the Eira backend API.
+
+    With a ``ResponseCache``, GET responses are kept on disk with their
+    ``ETag``/``Last-Modified`` validators. Each GET sends the stored
+    validators as ``If-None-Match``/``If-Modified-Since`` and reuses the
+    stored body on ``304 Not Modified``; any stored body is served when the
+    server cannot be reached. Data that rarely changes, such as report
+    templates, is served without a request while younger than CACHE_EXPIRY.
+
+    Cached responses include patient data, so they are kept only for the
+    signed-in user: ``set_token`` drops every response fetched with another
+    token, which clears the cache on logout and when the user changes.
+    Otherwise entries live until evicted by the CACHE_MAX_BYTES cap. The
+    user profile is never cached, so an offline start cannot pass off a
+    revoked token as valid.
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        token: str = None,
+        http: Optional[HTTPTransport] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
         self.base_url = base_url or settings.API_URL
         self.token = token
-        self.client = httpx.AsyncClient()
+        # Only close the transport on close() if it is not shared
+        self._owns_http = http is None
+        self.http = http or HTTPTransport()
+        self.cache = cache
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.http.async_client
 
     async def __aenter__(self):
         return self
@@ -24,10 +59,15 @@ class APIClient:
         await self.close()
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_http:
+            await self.http.aclose()
+        if self.cache is not None:
+            self.cache.close()
 
     def set_token(self, token: str):
-        """Set the authentication token."""
+        """Set the authentication token, dropping cached responses of any other token."""
+        if self.cache is not None:
+            self.cache.retain(self._cache_scope(token))
         self.token = token
 
     def _get_headers(self, additional_headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
@@ -39,6 +79,27 @@ class APIClient:
             headers.update(additional_headers)
         return headers
 
+    @property
+    def _cache_expiry(self) -> Optional[float]:
+        """The cache's default TTL, for responses that may be served without asking."""
+        return self.cache.ttl if self.cache is not None else None
+
+    @staticmethod
+    def _cache_scope(token: Optional[str]) -> str:
+        """Prefix of the cache keys for responses fetched with ``token``."""
+        # Scoped by token so one user's responses are never served to another
+        return (hashlib.sha256(token.encode()).hexdigest()[:16] if token else "anonymous") + " "
+
+    def _cache_key(self, url: str, params: Optional[Dict[str, Any]]) -> str:
+        """Key a cached GET by URL, parameters and the user it was fetched for."""
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return f"{self._cache_scope(self.token)}{url}?{query}"
+
+    async def _in_thread(self, func, *args, **kwargs):
+        """Run a blocking call, such as cache file I/O, off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
     async def _request(
         self,
         method: str,
@@ -46,14 +107,40 @@ class APIClient:
         data: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
+        files: Optional[Dict[str, Any]] = None,
+        cache_ttl: Optional[float] = 0,
     ) -> Dict[str, Any]:
-        """Make an API request."""
+        """Make an API request. ``files`` sends a multipart body instead of JSON.
+
+        GET responses are cached: served without a request for ``cache_ttl``
+        seconds, then revalidated (the default, 0, revalidates every time).
+        ``cache_ttl=None`` leaves a response out of the cache.
+        """
         url = f"{self.base_url}/{endpoint}"
         request_headers = self._get_headers(headers)
 
+        cache_key = None
+        cached = None
+        if cache_ttl is not None and self.cache is not None and method.lower() == "get":
+            cache_key = self._cache_key(url, params)
+            cached = await self._in_thread(self.cache.get, cache_key)
+            if cached is not None:
+                if cached["age"] < cache_ttl:
+                    return json.loads(cached["body"])
+                if cached["etag"]:
+                    request_headers["If-None-Match"] = cached["etag"]
+                if cached["last_modified"]:
+                    request_headers["If-Modified-Since"] = cached["last_modified"]
+
         try:
             if method.lower() == "get":
                 response = await self.client.get(url, params=params, headers=request_headers)
+            elif method.lower() == "post" and files:
+                # Let httpx set the multipart content type and boundary
+                request_headers.pop("Content-Type", None)
+                response = await self.client.post(
+                    url, files=files, params=params, headers=request_headers
+                )
             elif method.lower() == "post":
                 response = await self.client.post(
                     url, json=data, params=params, headers=request_headers
@@ -69,12 +156,26 @@ class APIClient:
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
 
+            if response.status_code == 304 and cached is not None:
+                # Unchanged since it was cached
+                await self._in_thread(self.cache.touch, cache_key)
+                return json.loads(cached["body"])
+
             response.raise_for_status()
 
             if response.status_code == 204 or not response.content:
                 return {"status": "success"}
 
-            return response.json()
+            result = response.json()
+            if cache_key is not None and "no-store" not in response.headers.get("Cache-Control", ""):
+                await self._in_thread(
+                    self.cache.put,
+                    cache_key,
+                    response.content,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            return result
 
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error: {e.response.status_code} - {e.response.text}")
@@ -84,6 +185,10 @@ class APIClient:
                 error_data = {"detail": e.response.text}
             raise APIError(e.response.status_code, error_data)
         except httpx.RequestError as e:
+            if cached is not None:
+                # Offline: a stale copy beats no data
+                logger.warning(f"Request error, serving cached {endpoint}: {str(e)}")
+                return json.loads(cached["body"])
             logger.error(f"Request error: {str(e)}")
             raise APIError(0, {"detail": str(e)})
 
@@ -95,7 +200,7 @@ class APIClient:
             "post", "api/v1/auth/login", data=data
         )
         if "access_token" in response:
-            self.token = response["access_token"]
+            self.set_token(response["access_token"])
         return response
 
     async def refresh_token(self) -> Dict[str, Any]:
@@ -114,7 +219,8 @@ class APIClient:
 
     async def get_current_user(self) -> Dict[str, Any]:
         """Get current user profile."""
-        return await self._request("get", "api/v1/users/me")
+        # Never cached: a copy served offline would make a revoked token look valid
+        return await self._request("get", "api/v1/users/me", cache_ttl=None)
 
     async def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new user."""
@@ -184,6 +290,13 @@ class APIClient:
         """Delete a clinical note."""
         return await self._request("delete", f"api/v1/clinical-notes/{note_id}")
 
+    async def get_attachment_urls(self, note_id: int) -> List[Dict[str, Any]]:
+        """Get download URLs for all attachments of a clinical note."""
+        # Pre-signed URLs expire, so a stored copy is no use
+        return await self._request(
+            "get", f"api/v1/clinical-notes/{note_id}/attachments/urls", cache_ttl=None
+        )
+
     # Appointment endpoints
     async def get_appointments(
         self,
@@ -230,7 +343,7 @@ class APIClient:
         """Generate a report for a clinical note."""
         params = {"format": format}
         return await self._request(
-            "get", f"api/v1/reports/clinical-notes/{note_id}", params=params
+            "get", f"api/v1/reports/clinical-notes/{note_id}", params=params, cache_ttl=None
         )
 
     async def generate_patient_summary(
@@ -239,12 +352,12 @@ class APIClient:
         """Generate a summary report for a patient."""
         params = {"format": format}
         return await self._request(
-            "get", f"api/v1/reports/patients/{patient_id}/summary", params=params
+            "get", f"api/v1/reports/patients/{patient_id}/summary", params=params, cache_ttl=None
         )
 
     async def get_report_templates(self) -> List[Dict[str, Any]]:
         """Get list of available report templates."""
-        return await self._request("get", "api/v1/reports/templates")
+        return await self._request("get", "api/v1/reports/templates", cache_ttl=self._cache_expiry)
 
     async def generate_custom_report(
         self, template_id: str, data: Dict[str, Any], format: str = "pdf"
@@ -256,17 +369,21 @@ class APIClient:
         )
 
     # Storage endpoints
-    async def upload_file(
-        self, file_path: str, file_type: str, metadata: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """Upload a file to storage."""
-        # This would typically use multipart/form-data, but for simplicity
-        # we're just showing the API structure
-        data = {"file_type": file_type}
-        if metadata:
-            data["metadata"] = metadata
-        # In a real implementation, you would use httpx's files parameter
-        return await self._request("post", "api/v1/storage/upload", data=data)
+    async def upload_file(self, note_id: int, file_path: str, file_type: str) -> Dict[str, Any]:
+        """Upload a file as an attachment to a clinical note.
+
+        The file is streamed from disk as a multipart body rather than read
+        into memory.
+        """
+        filename = os.path.basename(file_path)
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        with open(file_path, "rb") as f:
+            return await self._request(
+                "post",
+                f"api/v1/clinical-notes/{note_id}/attachments",
+                params={"file_type": file_type},
+                files={"file": (filename, f, content_type)},
+            )
 
     async def get_file(self, file_id: str) -> Dict[str, Any]:
         """Get file metadata by ID."""
@@ -276,7 +393,7 @@ class APIClient:
         """Get a pre-signed download URL for a file."""
         params = {"expires_in": expires_in}
         return await self._request(
-            "get", f"api/v1/storage/files/{file_id}/download-url", params=params
+            "get", f"api/v1/storage/files/{file_id}/download-url", params=params, cache_ttl=None
         )
 
     # FHIR endpoints
@@ -314,8 +431,9 @@ class APIClient:
     
     async def sync_pull(self, since: str) -> Dict[str, Any]:
         """Pull changes from the server since the given timestamp."""
+        # Already incremental, and applied to the local database
         params = {"since": since}
-        return await self._request("get", "api/v1/sync/pull", params=params)
+        return await self._request("get", "api/v1/sync/pull", params=params, cache_ttl=None)
 
 
 class APIError(Exception):
@@ -0,0 +1,125 @@
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.db.connection import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Disk-backed cache of API GET responses, in a SQLite file under CACHE_DIR.
+
+    Entries keep the raw response body with its ``ETag`` and
+    ``Last-Modified`` validators, so an expired entry can be revalidated
+    with a conditional request, and any entry can stand in for the server
+    while offline. Entries are evicted least recently used first once the
+    bodies add up to more than ``max_bytes``. Keys start with a per-user
+    scope, and ``retain`` drops every other user's entries.
+
+    The file is opened on first use, not at construction.
+    """
+
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._connections: Optional[ConnectionManager] = None
+
+    @property
+    def connections(self) -> ConnectionManager:
+        if self._connections is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connections = ConnectionManager(self.path, cache_size_kb=2048, mmap_size=0)
+            connections.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            connections.execute(
+                "CREATE INDEX IF NOT EXISTS ix_responses_accessed ON responses (accessed_at)"
+            )
+            self._connections = connections
+        return self._connections
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get an entry and mark it as recently used.
+
+        The entry has ``body``, ``etag``, ``last_modified`` and ``age`` in
+        seconds since it was stored or last revalidated.
+        """
+        now = time.time()
+        row = self.connections.execute(
+            "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.connections.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return {
+            "body": row["body"],
+            "etag": row["etag"],
+            "last_modified": row["last_modified"],
+            "age": now - row["stored_at"],
+        }
+
+    def put(
+        self, key: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> None:
+        """Store a response body, evicting the least recently used entries over the size cap."""
+        if len(body) > self.max_bytes:
+            return
+
+        now = time.time()
+        with self.connections.transaction() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, body, etag, last_modified, stored_at, accessed_at, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, body, etag, last_modified, now, now, len(body)),
+            )
+            # Keep the most recently used entries that fit in max_bytes
+            conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS total
+                        FROM responses
+                    )
+                    WHERE total > ?
+                )
+                """,
+                (self.max_bytes,),
+            )
+
+    def touch(self, key: str) -> None:
+        """Restart an entry's TTL after the server confirmed it is unchanged (304)."""
+        now = time.time()
+        self.connections.execute(
+            "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+        )
+
+    def retain(self, prefix: str) -> None:
+        """Remove every entry whose key does not start with ``prefix``."""
+        self.connections.execute(
+            "DELETE FROM responses WHERE substr(key, 1, ?) != ?", (len(prefix), prefix)
+        )
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self.connections.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        if self._connections is not None:
+            self._connections.close()
@@ -2,26 +2,16 @@ import asyncio
 import logging
 import os
 import sys
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Optional
 
 from app.api.client import APIClient
+from app.api.response_cache import ResponseCache
 from app.core.config import settings
 from app.db.database import Database
+from app.network.http_transport import HTTPTransport
 from app.network.network_manager import NetworkManager
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler(
-            os.path.join(settings.LOG_DIR, "eira.log"),
-            encoding="utf-8",
-        ),
-    ],
-)
+from app.sync.file_uploader import FileUploadWorker
 
 logger = logging.getLogger(__name__)
 
@@ -30,23 +20,55 @@ class EiraApp:
     """Main application class for Eira desktop client."""
 
     def __init__(self):
+        # One connection pool for sync, API calls and connectivity checks
+        self.http = HTTPTransport()
         self.db = Database(
             db_path=settings.DB_PATH,
             api_url=settings.API_URL,
+            http=self.http,
+        )
+        self.api_client = APIClient(
+            base_url=settings.API_URL,
+            http=self.http,
+            cache=ResponseCache(
+                os.path.join(settings.CACHE_DIR, "responses.db"),
+                ttl=settings.CACHE_EXPIRY,
+                max_bytes=settings.CACHE_MAX_BYTES,
+            ),
+        )
+        self.file_uploader = FileUploadWorker(
+            self.db,
+            self.api_client,
+            concurrency=settings.FILE_UPLOAD_CONCURRENCY,
+            max_attempts=settings.RETRY_ATTEMPTS,
+            poll_interval=settings.AUTO_SYNC_INTERVAL,
         )
-        self.api_client = APIClient(base_url=settings.API_URL)
         self.network_manager = NetworkManager(
             api_url=settings.API_URL,
             check_interval=30,  # Check every 30 seconds
             connection_timeout=settings.CONNECTION_TIMEOUT,
             on_status_change=self._on_network_status_change,
+            http=self.http,
         )
+        # Worker threads for view queries, so they never block the Tk main loop
+        self.ui_executor = ThreadPoolExecutor(
+            max_workers=settings.UI_LOADER_WORKERS, thread_name_prefix="ui-loader"
+        )
+        # The event loop, which runs on the Tk thread; set by initialize()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.auth_token = None
         self.current_user = None
 
     async def initialize(self):
-        """Initialize the application."""
+        """Initialize the application.
+
+        Syncing is left to ``start_background_sync``, so the first window
+        is not held up by the network.
+        """
         logger.info("Initializing Eira desktop application")
+        self.loop = asyncio.get_running_loop()
+        # UI writes happen in Tk callbacks, outside the running loop
+        self.db.set_event_loop(self.loop)
 
         # Start network monitoring
         self.network_manager.start_monitoring()
@@ -54,13 +76,20 @@ class EiraApp:
         # Load auth token if available
         await self._load_auth_token()
 
-        # Start sync if we're online and have a token
         if self.network_manager.get_status() and self.auth_token:
             self.db.set_auth_token(self.auth_token)
             self.db.set_online_status(True)
-            if settings.SYNC_ON_STARTUP:
-                await self.db.sync()
-            self.db.start_auto_sync()
+
+    def start_background_sync(self):
+        """Start syncing and uploading attachments in the background.
+
+        Must be called on the event loop. The first sync pass runs at once
+        when SYNC_ON_STARTUP is set, otherwise after AUTO_SYNC_INTERVAL.
+        """
+        if self.network_manager.get_status() and self.auth_token:
+            initial_delay = 0 if settings.SYNC_ON_STARTUP else settings.AUTO_SYNC_INTERVAL
+            self.db.start_auto_sync(initial_delay=initial_delay)
+            self.file_uploader.start()
 
     async def shutdown(self):
         """Clean up resources when shutting down."""
@@ -71,11 +100,17 @@ class EiraApp:
             await self.db.sync()
 
         # Stop background processes
+        self.file_uploader.stop()
         self.db.stop_auto_sync()
         self.network_manager.stop_monitoring()
+        self.ui_executor.shutdown(wait=False, cancel_futures=True)
 
-        # Close API client
+        # Close API client and the shared connection pool
         await self.api_client.close()
+        await self.http.aclose()
+
+        # Close database connections
+        self.db.close()
 
     async def login(self, username: str, password: str) -> Dict[str, Any]:
         """Log in to the API and store the token."""
@@ -92,11 +127,11 @@ class EiraApp:
                 # Save token securely
                 await self._save_auth_token()
 
-                # Start sync if online
+                # Sync in the background, so the main window opens at once
                 if self.network_manager.get_status():
                     self.db.set_online_status(True)
-                    await self.db.sync()
                     self.db.start_auto_sync()
+                    self.file_uploader.start()
 
             return response
         except Exception as e:
@@ -110,23 +145,33 @@ class EiraApp:
         self.api_client.set_token(None)
         self.db.set_auth_token(None)
         self.db.stop_auto_sync()
+        self.file_uploader.stop()
 
         # Clear saved token
         await self._clear_auth_token()
 
     def _on_network_status_change(self, is_online: bool):
-        """Handle network status changes."""
+        """Handle network status changes.
+
+        Called on the network monitor's thread, so the work is handed to the
+        event loop, which owns the sync and upload tasks and the Tk thread.
+        """
         logger.info(f"Network status changed: {'online' if is_online else 'offline'}")
+        self.loop.call_soon_threadsafe(self._apply_network_status, is_online)
 
-        # Update database online status
+    def _apply_network_status(self, is_online: bool):
+        """Update sync, uploads and listeners for a network status change, on the event loop."""
+        # Coming online requests a sync pass (debounced, so the auto-sync
+        # loop's first pass absorbs it)
         self.db.set_online_status(is_online)
+        self.db.events.publish("network", [], "online" if is_online else "offline")
 
-        # If coming online and we have a token, start sync
         if is_online and self.auth_token:
-            asyncio.create_task(self.db.sync())
             self.db.start_auto_sync()
+            self.file_uploader.start()
         elif not is_online:
             self.db.stop_auto_sync()
+            self.file_uploader.stop()
 
     async def _save_auth_token(self):
         """Save authentication token securely."""
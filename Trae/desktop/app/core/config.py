@@ -1,5 +1,4 @@
 import os
-from pathlib import Path
 from typing import Dict, List, Optional, Union
 
 from pydantic import BaseSettings, Field
@@ -21,16 +20,26 @@ class Settings(BaseSettings):
         os.path.join(os.path.expanduser("~"), ".eira", "eira.db"),
         env="DB_PATH"
     )
+    DB_CACHE_SIZE_KB: int = Field(16384, env="DB_CACHE_SIZE_KB")  # page cache per connection
+    DB_MMAP_SIZE: int = Field(256 * 1024 * 1024, env="DB_MMAP_SIZE")  # bytes
     
     # Sync Configuration
     AUTO_SYNC_INTERVAL: int = Field(60, env="AUTO_SYNC_INTERVAL")  # seconds
     SYNC_ON_STARTUP: bool = Field(True, env="SYNC_ON_STARTUP")
     SYNC_ON_SHUTDOWN: bool = Field(True, env="SYNC_ON_SHUTDOWN")
+    SYNC_DEBOUNCE: float = Field(0.5, env="SYNC_DEBOUNCE")  # seconds to merge sync triggers over
+    SYNC_COMPRESS_MIN_BYTES: int = Field(1024, env="SYNC_COMPRESS_MIN_BYTES")  # gzip sync bodies at least this large
+    FILE_UPLOAD_CONCURRENCY: int = Field(3, env="FILE_UPLOAD_CONCURRENCY")  # parallel attachment uploads
+    SYNC_PUSH_BATCH_SIZE: int = Field(100, env="SYNC_PUSH_BATCH_SIZE")  # changes per push request
+    SYNC_PUSH_BATCH_BYTES: int = Field(512 * 1024, env="SYNC_PUSH_BATCH_BYTES")  # payload bytes per push request
+    SYNC_PULL_PAGE_SIZE: int = Field(1000, env="SYNC_PULL_PAGE_SIZE")  # pulled rows applied per transaction
     
     # UI Configuration
     THEME: str = Field("system", env="THEME")  # system, light, dark
     ACCENT_COLOR: str = Field("#1a73e8", env="ACCENT_COLOR")
     FONT_SIZE: int = Field(12, env="FONT_SIZE")
+    UI_LOADER_WORKERS: int = Field(2, env="UI_LOADER_WORKERS")  # threads running view queries
+    SEARCH_DEBOUNCE_MS: int = Field(250, env="SEARCH_DEBOUNCE_MS")  # typing pause before search runs
     
     # Logging Configuration
     LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
@@ -45,11 +54,17 @@ class Settings(BaseSettings):
         env="CACHE_DIR"
     )
     CACHE_EXPIRY: int = Field(86400, env="CACHE_EXPIRY")  # 24 hours in seconds
+    CACHE_MAX_BYTES: int = Field(50 * 1024 * 1024, env="CACHE_MAX_BYTES")  # cached API responses, LRU evicted; cleared on logout
     
     # Network Configuration
     CONNECTION_TIMEOUT: int = Field(10, env="CONNECTION_TIMEOUT")  # seconds
+    HTTP2: bool = Field(True, env="HTTP2")  # used when the h2 package is installed
+    HTTP_MAX_CONNECTIONS: int = Field(10, env="HTTP_MAX_CONNECTIONS")
+    HTTP_KEEPALIVE_EXPIRY: float = Field(120, env="HTTP_KEEPALIVE_EXPIRY")  # seconds an idle connection is kept
     RETRY_ATTEMPTS: int = Field(3, env="RETRY_ATTEMPTS")
     RETRY_BACKOFF: float = Field(1.5, env="RETRY_BACKOFF")
+    SYNC_RETRY_BASE_DELAY: float = Field(30, env="SYNC_RETRY_BASE_DELAY")  # seconds before the first retry
+    SYNC_RETRY_MAX_DELAY: float = Field(3600, env="SYNC_RETRY_MAX_DELAY")  # seconds
     
     # Security Configuration
     TOKEN_STORAGE: str = Field("keyring", env="TOKEN_STORAGE")  # keyring, file, memory
@@ -60,10 +75,7 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-# Create settings instance
+# Create settings instance. Directories are created by whatever first writes
+# to them (the database, the response cache, logging setup in main.py), so
+# importing settings touches no files.
 settings = Settings()
-
-# Ensure directories exist
-Path(os.path.dirname(settings.DB_PATH)).mkdir(parents=True, exist_ok=True)
-Path(settings.LOG_DIR).mkdir(parents=True, exist_ok=True)
-Path(settings.CACHE_DIR).mkdir(parents=True, exist_ok=True)
\ No newline at end of file
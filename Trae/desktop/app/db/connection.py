@@ -0,0 +1,136 @@
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """Manages long-lived SQLite connections, one per thread.
+
+    Opening a connection per call costs a file open, schema parse and PRAGMA
+    setup every time and throws away sqlite3's per-connection statement
+    cache. Connections here stay open for the life of the manager, run in
+    WAL mode and reuse prepared statements across calls.
+
+    Connections run in autocommit mode; group writes with ``transaction()``.
+    In-memory state derived from a write can be updated with ``on_commit()``
+    so it never reflects a transaction that rolled back.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        cache_size_kb: int = settings.DB_CACHE_SIZE_KB,
+        mmap_size: int = settings.DB_MMAP_SIZE,
+        cached_statements: int = 256,
+    ):
+        self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection."""
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        # Negative cache_size is in KiB rather than pages
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.on_commit = []
+        return conn
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Execute a single statement on the calling thread's connection."""
+        return self.connection().execute(sql, params)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block in a transaction, committing on success.
+
+        Nested calls join the outermost transaction.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            self._local.on_commit.clear()
+            raise
+        else:
+            conn.commit()
+            callbacks, self._local.on_commit = self._local.on_commit, []
+            for callback in callbacks:
+                callback()
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` once the calling thread's transaction commits.
+
+        Outside a transaction the write has already committed, so it runs
+        at once. Callbacks of a transaction that rolls back are dropped.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    @contextmanager
+    def cancellable(self, cancelled: threading.Event) -> Iterator[None]:
+        """Abort the calling thread's queries once ``cancelled`` is set.
+
+        An aborted query raises ``sqlite3.OperationalError``. Only queries run
+        inside the block are affected, unlike ``Connection.interrupt()``, which
+        could hit whatever query the thread moved on to.
+        """
+        conn = self.connection()
+        # SQLite calls the handler every n VM instructions; a true result aborts
+        conn.set_progress_handler(cancelled.is_set, 1000)
+        try:
+            yield
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    def close(self) -> None:
+        """Close every connection opened by this manager."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Connections can only be closed from their own thread
+                logger.debug("Skipping close of connection owned by another thread")
+        self._local = threading.local()
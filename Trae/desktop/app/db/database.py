@@ -2,160 +2,227 @@ import asyncio
 import json
 import logging
 import os
-import sqlite3
-from datetime import datetime
+import re
+from datetime import date, datetime, timedelta
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from app.core.config import settings
-from app.sync.sync_manager import OperationType, SyncManager
+from app.db.connection import ConnectionManager
+from app.db.migrations import migrate
+from app.network.http_transport import HTTPTransport
+from app.sync.sync_manager import OperationType, SyncManager, SyncStatus
 
 logger = logging.getLogger(__name__)
 
+# Columns rendered by the clinical note lists, with patient and author joined in
+CLINICAL_NOTE_SUMMARY_COLUMNS = """
+    n.id, n.patient_id, n.user_id, n.visit_date, n.chief_complaint,
+    n.created_at, n.updated_at,
+    p.first_name || ' ' || p.last_name AS patient_name,
+    u.full_name AS author_name
+"""
+
+# Columns rendered by the appointment lists. The date, time, type and duration
+# fields the list and form widgets use are derived from the stored columns.
+APPOINTMENT_SUMMARY_COLUMNS = """
+    a.id, a.patient_id, a.user_id, a.start_time, a.end_time, a.status, a.notes,
+    substr(a.start_time, 1, 10) AS date,
+    substr(a.start_time, 12, 5) AS time,
+    a.appointment_type AS type,
+    CAST(ROUND((julianday(a.end_time) - julianday(a.start_time)) * 1440) AS INTEGER) AS duration,
+    p.first_name || ' ' || p.last_name AS patient_name,
+    u.full_name AS provider_name
+"""
+
 
 class Database:
     """Database wrapper that handles local SQLite operations with sync capabilities."""
 
-    def __init__(self, db_path: str = None, api_url: str = None, auth_token: str = None):
+    def __init__(
+        self,
+        db_path: str = None,
+        api_url: str = None,
+        auth_token: str = None,
+        http: Optional[HTTPTransport] = None,
+    ):
         self.db_path = db_path or settings.DB_PATH
         self.api_url = api_url or settings.API_URL
-        
+
         # Ensure the database directory exists
         Path(os.path.dirname(self.db_path)).mkdir(parents=True, exist_ok=True)
-        
+
+        # Long-lived connections shared with the sync manager
+        self.connections = ConnectionManager(self.db_path)
+
+        # ((sync data version, day, recent_days), dashboard stats)
+        self._dashboard_stats_cache: Optional[Tuple[Tuple[int, date, int], Dict[str, int]]] = None
+
         # Initialize the database
         self._init_db()
-        
+
         # Initialize the sync manager
         self.sync_manager = SyncManager(
             db_path=self.db_path,
             api_url=self.api_url,
             auth_token=auth_token,
             auto_sync_interval=settings.AUTO_SYNC_INTERVAL,
+            connections=self.connections,
+            push_batch_size=settings.SYNC_PUSH_BATCH_SIZE,
+            push_batch_bytes=settings.SYNC_PUSH_BATCH_BYTES,
+            retry_attempts=settings.RETRY_ATTEMPTS,
+            retry_backoff=settings.RETRY_BACKOFF,
+            retry_base_delay=settings.SYNC_RETRY_BASE_DELAY,
+            retry_max_delay=settings.SYNC_RETRY_MAX_DELAY,
+            pull_page_size=settings.SYNC_PULL_PAGE_SIZE,
+            sync_debounce=settings.SYNC_DEBOUNCE,
+            compress_min_bytes=settings.SYNC_COMPRESS_MIN_BYTES,
+            http=http,
         )
+        # Change events published by local writes and sync pulls
+        self.events = self.sync_manager.events
+
+        # Bring the schema up to date once all base tables exist
+        migrate(self.connections)
+        # The search index is skipped when SQLite lacks FTS5
+        self._patient_search_indexed = self.connections.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'patients_fts'"
+        ).fetchone() is not None
 
     def _init_db(self) -> None:
         """Initialize the database schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Create users table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY,
-                username TEXT NOT NULL UNIQUE,
-                email TEXT NOT NULL UNIQUE,
-                full_name TEXT,
-                role TEXT NOT NULL,
-                is_active BOOLEAN NOT NULL DEFAULT 1,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                last_synced_at TEXT
+        with self.connections.transaction() as conn:
+            # Create users table
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL UNIQUE,
+                    email TEXT NOT NULL UNIQUE,
+                    full_name TEXT,
+                    role TEXT NOT NULL,
+                    is_active BOOLEAN NOT NULL DEFAULT 1,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    last_synced_at TEXT
+                )
+                """
             )
-            """
-        )
 
-        # Create patients table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS patients (
-                id INTEGER PRIMARY KEY,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                date_of_birth TEXT NOT NULL,
-                gender TEXT NOT NULL,
-                address TEXT,
-                phone TEXT,
-                email TEXT,
-                insurance_provider TEXT,
-                insurance_id TEXT,
-                medical_history TEXT,
-                allergies TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                last_synced_at TEXT
+            # Create patients table
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS patients (
+                    id INTEGER PRIMARY KEY,
+                    first_name TEXT NOT NULL,
+                    last_name TEXT NOT NULL,
+                    date_of_birth TEXT NOT NULL,
+                    gender TEXT NOT NULL,
+                    address TEXT,
+                    phone TEXT,
+                    email TEXT,
+                    insurance_provider TEXT,
+                    insurance_id TEXT,
+                    medical_history TEXT,
+                    allergies TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    last_synced_at TEXT
+                )
+                """
             )
-            """
-        )
 
-        # Create clinical_notes table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS clinical_notes (
-                id INTEGER PRIMARY KEY,
-                patient_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                visit_date TEXT NOT NULL,
-                chief_complaint TEXT,
-                history_of_present_illness TEXT,
-                review_of_systems TEXT,
-                physical_examination TEXT,
-                assessment TEXT,
-                plan TEXT,
-                signature_id TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                last_synced_at TEXT,
-                FOREIGN KEY (patient_id) REFERENCES patients (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
+            # Create clinical_notes table
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS clinical_notes (
+                    id INTEGER PRIMARY KEY,
+                    patient_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    visit_date TEXT NOT NULL,
+                    chief_complaint TEXT,
+                    history_of_present_illness TEXT,
+                    review_of_systems TEXT,
+                    physical_examination TEXT,
+                    assessment TEXT,
+                    plan TEXT,
+                    signature_id TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    last_synced_at TEXT,
+                    FOREIGN KEY (patient_id) REFERENCES patients (id),
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+                """
             )
-            """
-        )
 
-        # Create appointments table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS appointments (
-                id INTEGER PRIMARY KEY,
-                patient_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                start_time TEXT NOT NULL,
-                end_time TEXT NOT NULL,
-                appointment_type TEXT NOT NULL,
-                status TEXT NOT NULL,
-                notes TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                last_synced_at TEXT,
-                FOREIGN KEY (patient_id) REFERENCES patients (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
+            # Create appointments table
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS appointments (
+                    id INTEGER PRIMARY KEY,
+                    patient_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT NOT NULL,
+                    appointment_type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    notes TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    last_synced_at TEXT,
+                    FOREIGN KEY (patient_id) REFERENCES patients (id),
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+                """
             )
-            """
-        )
 
-        # Create files table for tracking uploaded files
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS files (
-                id TEXT PRIMARY KEY,
-                file_path TEXT NOT NULL,
-                file_type TEXT NOT NULL,
-                entity_type TEXT NOT NULL,
-                entity_id INTEGER NOT NULL,
-                uploaded BOOLEAN NOT NULL DEFAULT 0,
-                remote_url TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                last_synced_at TEXT
+            # Create files table for tracking uploaded files
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    id TEXT PRIMARY KEY,
+                    file_path TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    entity_type TEXT NOT NULL,
+                    entity_id INTEGER NOT NULL,
+                    uploaded BOOLEAN NOT NULL DEFAULT 0,
+                    remote_url TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    last_synced_at TEXT
+                )
+                """
             )
-            """
-        )
 
-        conn.commit()
-        conn.close()
+    def transaction(self):
+        """Group several writes into one transaction (``with db.transaction():``)."""
+        return self.connections.transaction()
+
+    def cancellable(self, cancelled):
+        """Abort queries in the block once the ``cancelled`` event is set."""
+        return self.connections.cancellable(cancelled)
+
+    def close(self) -> None:
+        """Close the database connections."""
+        self.connections.close()
 
     def set_auth_token(self, token: str) -> None:
         """Set the authentication token for API requests."""
         self.sync_manager.set_auth_token(token)
 
+    def set_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Set the event loop that runs sync passes requested from other threads."""
+        self.sync_manager.set_event_loop(loop)
+
     def set_online_status(self, is_online: bool) -> None:
         """Set the online status and trigger sync if coming online."""
         self.sync_manager.set_online_status(is_online)
 
-    def start_auto_sync(self) -> None:
-        """Start automatic background synchronization."""
-        self.sync_manager.start_auto_sync()
+    def start_auto_sync(self, initial_delay: float = 0) -> None:
+        """Start automatic background synchronization, the first pass after ``initial_delay`` seconds."""
+        self.sync_manager.start_auto_sync(initial_delay)
 
     def stop_auto_sync(self) -> None:
         """Stop automatic background synchronization."""
@@ -165,39 +232,27 @@ class Database:
         """Perform a full sync operation."""
         return await self.sync_manager.sync()
 
+    def get_sync_metrics(self) -> Dict[str, int]:
+        """Get counters for sync triggers, passes and request body sizes."""
+        return self.sync_manager.get_sync_metrics()
+
     # User operations
     def get_users(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """Get list of users."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute(
+        cursor = self.connections.execute(
             "SELECT * FROM users ORDER BY last_name, first_name LIMIT ? OFFSET ?",
             (limit, skip),
         )
-        users = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
-        return users
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        cursor = self.connections.execute("SELECT * FROM users WHERE id = ?", (user_id,))
         user = cursor.fetchone()
-
-        conn.close()
         return dict(user) if user else None
 
     def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new user."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         now = datetime.now().isoformat()
         user_data["created_at"] = now
         user_data["updated_at"] = now
@@ -216,62 +271,51 @@ class Database:
         placeholders = ", ".join(["?" for _ in fields])
         fields_str = ", ".join(fields)
 
-        cursor.execute(
-            f"INSERT INTO users ({fields_str}) VALUES ({placeholders})", values
-        )
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-
-        # Queue for sync
-        user_data["id"] = user_id
-        self.sync_manager.queue_change(
-            "users", OperationType.CREATE, user_id, user_data
-        )
+        with self.connections.transaction() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO users ({fields_str}) VALUES ({placeholders})", values
+            )
+            user_id = cursor.lastrowid
+
+            # Queue for sync
+            user_data["id"] = user_id
+            self.sync_manager.queue_change(
+                "users", OperationType.CREATE, user_id, user_data
+            )
 
         return {**user_data, "id": user_id}
 
     def update_user(self, user_id: int, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a user."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get current user data
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-        current_user = cursor.fetchone()
-        if not current_user:
-            conn.close()
-            raise ValueError(f"User with ID {user_id} not found")
-
-        # Update user data
-        user_data["updated_at"] = datetime.now().isoformat()
-        set_clause = ", ".join([f"{key} = ?" for key in user_data.keys()])
-        values = list(user_data.values()) + [user_id]
-
-        cursor.execute(f"UPDATE users SET {set_clause} WHERE id = ?", values)
-        conn.commit()
-        conn.close()
-
-        # Queue for sync
-        self.sync_manager.queue_change(
-            "users", OperationType.UPDATE, user_id, user_data
-        )
+        with self.connections.transaction() as conn:
+            # Get current user data
+            cursor = conn.execute("SELECT id FROM users WHERE id = ?", (user_id,))
+            if not cursor.fetchone():
+                raise ValueError(f"User with ID {user_id} not found")
+
+            # Update user data
+            user_data["updated_at"] = datetime.now().isoformat()
+            set_clause = ", ".join([f"{key} = ?" for key in user_data.keys()])
+            values = list(user_data.values()) + [user_id]
+
+            conn.execute(f"UPDATE users SET {set_clause} WHERE id = ?", values)
+
+            # Queue for sync
+            self.sync_manager.queue_change(
+                "users", OperationType.UPDATE, user_id, user_data
+            )
 
         return {**user_data, "id": user_id}
 
     def delete_user(self, user_id: int) -> bool:
         """Delete a user."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.connections.transaction() as conn:
+            cursor = conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            deleted = cursor.rowcount > 0
 
-        cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
-
-        if deleted:
-            # Queue for sync
-            self.sync_manager.queue_change("users", OperationType.DELETE, user_id)
+            if deleted:
+                # Queue for sync
+                self.sync_manager.queue_change("users", OperationType.DELETE, user_id)
 
         return deleted
 
@@ -280,44 +324,73 @@ class Database:
         self, skip: int = 0, limit: int = 100, search: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Get list of patients with optional search."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM patients"
-        params = []
+        where, params = self._patient_search_filter(search)
+        query = f"SELECT * FROM patients{where} ORDER BY last_name, first_name LIMIT ? OFFSET ?"
+        params.extend([limit, skip])
 
-        if search:
-            query += " WHERE first_name LIKE ? OR last_name LIKE ? OR phone LIKE ? OR email LIKE ?"
-            search_param = f"%{search}%"
-            params.extend([search_param, search_param, search_param, search_param])
+        cursor = self.connections.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
 
-        query += " ORDER BY last_name, first_name LIMIT ? OFFSET ?"
-        params.extend([limit, skip])
+    def count_patients(self, search: Optional[str] = None) -> int:
+        """Count the patients ``get_patients`` would page through."""
+        match = self._patient_search_match(search)
+        if match:
+            # The index has one row per patient, so matches need no join
+            cursor = self.connections.execute(
+                "SELECT COUNT(*) FROM patients_fts WHERE patients_fts MATCH ?", (match,)
+            )
+            return cursor.fetchone()[0]
+
+        where, params = self._patient_search_filter(search)
+        cursor = self.connections.execute(f"SELECT COUNT(*) FROM patients{where}", params)
+        return cursor.fetchone()[0]
+
+    def _patient_search_filter(self, search: Optional[str]) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause and parameters for a patient search.
+
+        Each word of the search must prefix a word of the patient's name,
+        phone, email or insurance ID, looked up in the full-text index.
+        """
+        if not search:
+            return "", []
+
+        match = self._patient_search_match(search)
+        if match:
+            return (
+                " WHERE id IN (SELECT rowid FROM patients_fts WHERE patients_fts MATCH ?)",
+                [match],
+            )
 
-        cursor.execute(query, params)
-        patients = [dict(row) for row in cursor.fetchall()]
+        search_param = f"%{search}%"
+        return (
+            " WHERE first_name LIKE ? OR last_name LIKE ? OR phone LIKE ? OR email LIKE ?",
+            [search_param, search_param, search_param, search_param],
+        )
 
-        conn.close()
-        return patients
+    def _patient_search_match(self, search: Optional[str]) -> Optional[str]:
+        """Turn a search into an FTS5 query of quoted prefix terms, if indexed."""
+        if not search or not self._patient_search_indexed:
+            return None
+        # Quoting keeps FTS5 operators and punctuation in user input inert
+        terms = re.findall(r"\w+", search.lower())
+        return " ".join(f'"{term}"*' for term in terms) or None
+
+    def get_patients_by_ids(self, ids: List[int]) -> List[Dict[str, Any]]:
+        """Get the patients with the given IDs, in no particular order."""
+        cursor = self.connections.execute(
+            "SELECT * FROM patients WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(ids)),),
+        )
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_patient(self, patient_id: int) -> Optional[Dict[str, Any]]:
         """Get patient by ID."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM patients WHERE id = ?", (patient_id,))
+        cursor = self.connections.execute("SELECT * FROM patients WHERE id = ?", (patient_id,))
         patient = cursor.fetchone()
-
-        conn.close()
         return dict(patient) if patient else None
 
     def create_patient(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new patient."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         now = datetime.now().isoformat()
         patient_data["created_at"] = now
         patient_data["updated_at"] = now
@@ -342,107 +415,96 @@ class Database:
         placeholders = ", ".join(["?" for _ in fields])
         fields_str = ", ".join(fields)
 
-        cursor.execute(
-            f"INSERT INTO patients ({fields_str}) VALUES ({placeholders})", values
-        )
-        patient_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-
-        # Queue for sync
-        patient_data["id"] = patient_id
-        self.sync_manager.queue_change(
-            "patients", OperationType.CREATE, patient_id, patient_data
-        )
+        with self.connections.transaction() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO patients ({fields_str}) VALUES ({placeholders})", values
+            )
+            patient_id = cursor.lastrowid
+
+            # Queue for sync
+            patient_data["id"] = patient_id
+            self.sync_manager.queue_change(
+                "patients", OperationType.CREATE, patient_id, patient_data
+            )
 
         return {**patient_data, "id": patient_id}
 
     def update_patient(self, patient_id: int, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a patient."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get current patient data
-        cursor.execute("SELECT * FROM patients WHERE id = ?", (patient_id,))
-        current_patient = cursor.fetchone()
-        if not current_patient:
-            conn.close()
-            raise ValueError(f"Patient with ID {patient_id} not found")
-
-        # Update patient data
-        patient_data["updated_at"] = datetime.now().isoformat()
-        set_clause = ", ".join([f"{key} = ?" for key in patient_data.keys()])
-        values = list(patient_data.values()) + [patient_id]
-
-        cursor.execute(f"UPDATE patients SET {set_clause} WHERE id = ?", values)
-        conn.commit()
-        conn.close()
-
-        # Queue for sync
-        self.sync_manager.queue_change(
-            "patients", OperationType.UPDATE, patient_id, patient_data
-        )
+        with self.connections.transaction() as conn:
+            # Get current patient data
+            cursor = conn.execute("SELECT id FROM patients WHERE id = ?", (patient_id,))
+            if not cursor.fetchone():
+                raise ValueError(f"Patient with ID {patient_id} not found")
+
+            # Update patient data
+            patient_data["updated_at"] = datetime.now().isoformat()
+            set_clause = ", ".join([f"{key} = ?" for key in patient_data.keys()])
+            values = list(patient_data.values()) + [patient_id]
+
+            conn.execute(f"UPDATE patients SET {set_clause} WHERE id = ?", values)
+
+            # Queue for sync
+            self.sync_manager.queue_change(
+                "patients", OperationType.UPDATE, patient_id, patient_data
+            )
 
         return {**patient_data, "id": patient_id}
 
     def delete_patient(self, patient_id: int) -> bool:
         """Delete a patient."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM patients WHERE id = ?", (patient_id,))
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        with self.connections.transaction() as conn:
+            cursor = conn.execute("DELETE FROM patients WHERE id = ?", (patient_id,))
+            deleted = cursor.rowcount > 0
 
-        if deleted:
-            # Queue for sync
-            self.sync_manager.queue_change("patients", OperationType.DELETE, patient_id)
+            if deleted:
+                # Queue for sync
+                self.sync_manager.queue_change("patients", OperationType.DELETE, patient_id)
 
         return deleted
 
     # Clinical notes operations
     def get_clinical_notes(
-        self, patient_id: Optional[int] = None, skip: int = 0, limit: int = 100
+        self,
+        patient_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        summary: bool = False,
     ) -> List[Dict[str, Any]]:
-        """Get list of clinical notes, optionally filtered by patient."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM clinical_notes"
+        """Get list of clinical notes, optionally filtered by patient.
+
+        With ``summary`` only the columns list views render are returned, with
+        ``patient_name`` and ``author_name`` joined in by the same query.
+        """
+        if summary:
+            query = f"""
+                SELECT {CLINICAL_NOTE_SUMMARY_COLUMNS}
+                FROM clinical_notes n
+                LEFT JOIN patients p ON p.id = n.patient_id
+                LEFT JOIN users u ON u.id = n.user_id
+            """
+        else:
+            query = "SELECT * FROM clinical_notes n"
         params = []
 
         if patient_id:
-            query += " WHERE patient_id = ?"
+            query += " WHERE n.patient_id = ?"
             params.append(patient_id)
 
-        query += " ORDER BY visit_date DESC LIMIT ? OFFSET ?"
+        query += " ORDER BY n.visit_date DESC LIMIT ? OFFSET ?"
         params.extend([limit, skip])
 
-        cursor.execute(query, params)
-        notes = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
-        return notes
+        cursor = self.connections.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_clinical_note(self, note_id: int) -> Optional[Dict[str, Any]]:
         """Get clinical note by ID."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM clinical_notes WHERE id = ?", (note_id,))
+        cursor = self.connections.execute("SELECT * FROM clinical_notes WHERE id = ?", (note_id,))
         note = cursor.fetchone()
-
-        conn.close()
         return dict(note) if note else None
 
     def create_clinical_note(self, note_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new clinical note."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         now = datetime.now().isoformat()
         note_data["created_at"] = now
         note_data["updated_at"] = now
@@ -466,65 +528,54 @@ class Database:
         placeholders = ", ".join(["?" for _ in fields])
         fields_str = ", ".join(fields)
 
-        cursor.execute(
-            f"INSERT INTO clinical_notes ({fields_str}) VALUES ({placeholders})", values
-        )
-        note_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-
-        # Queue for sync
-        note_data["id"] = note_id
-        self.sync_manager.queue_change(
-            "clinical_notes", OperationType.CREATE, note_id, note_data
-        )
+        with self.connections.transaction() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO clinical_notes ({fields_str}) VALUES ({placeholders})", values
+            )
+            note_id = cursor.lastrowid
+
+            # Queue for sync
+            note_data["id"] = note_id
+            self.sync_manager.queue_change(
+                "clinical_notes", OperationType.CREATE, note_id, note_data
+            )
 
         return {**note_data, "id": note_id}
 
     def update_clinical_note(self, note_id: int, note_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a clinical note."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get current note data
-        cursor.execute("SELECT * FROM clinical_notes WHERE id = ?", (note_id,))
-        current_note = cursor.fetchone()
-        if not current_note:
-            conn.close()
-            raise ValueError(f"Clinical note with ID {note_id} not found")
-
-        # Update note data
-        note_data["updated_at"] = datetime.now().isoformat()
-        set_clause = ", ".join([f"{key} = ?" for key in note_data.keys()])
-        values = list(note_data.values()) + [note_id]
-
-        cursor.execute(f"UPDATE clinical_notes SET {set_clause} WHERE id = ?", values)
-        conn.commit()
-        conn.close()
-
-        # Queue for sync
-        self.sync_manager.queue_change(
-            "clinical_notes", OperationType.UPDATE, note_id, note_data
-        )
-
-        return {**note_data, "id": note_id}
+        with self.connections.transaction() as conn:
+            # Get current note data
+            cursor = conn.execute("SELECT id FROM clinical_notes WHERE id = ?", (note_id,))
+            if not cursor.fetchone():
+                raise ValueError(f"Clinical note with ID {note_id} not found")
 
-    def delete_clinical_note(self, note_id: int) -> bool:
-        """Delete a clinical note."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+            # Update note data
+            note_data["updated_at"] = datetime.now().isoformat()
+            set_clause = ", ".join([f"{key} = ?" for key in note_data.keys()])
+            values = list(note_data.values()) + [note_id]
 
-        cursor.execute("DELETE FROM clinical_notes WHERE id = ?", (note_id,))
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+            conn.execute(f"UPDATE clinical_notes SET {set_clause} WHERE id = ?", values)
 
-        if deleted:
             # Queue for sync
             self.sync_manager.queue_change(
-                "clinical_notes", OperationType.DELETE, note_id
+                "clinical_notes", OperationType.UPDATE, note_id, note_data
             )
 
+        return {**note_data, "id": note_id}
+
+    def delete_clinical_note(self, note_id: int) -> bool:
+        """Delete a clinical note."""
+        with self.connections.transaction() as conn:
+            cursor = conn.execute("DELETE FROM clinical_notes WHERE id = ?", (note_id,))
+            deleted = cursor.rowcount > 0
+
+            if deleted:
+                # Queue for sync
+                self.sync_manager.queue_change(
+                    "clinical_notes", OperationType.DELETE, note_id
+                )
+
         return deleted
 
     # Appointment operations
@@ -535,57 +586,91 @@ class Database:
         end_date: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        summary: bool = False,
     ) -> List[Dict[str, Any]]:
-        """Get list of appointments with optional filters."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        """Get list of appointments with optional filters.
+
+        With ``summary`` only the columns list views render are returned, with
+        ``patient_name`` and ``provider_name`` joined in by the same query.
+        """
+        if summary:
+            query = f"""
+                SELECT {APPOINTMENT_SUMMARY_COLUMNS}
+                FROM appointments a
+                LEFT JOIN patients p ON p.id = a.patient_id
+                LEFT JOIN users u ON u.id = a.user_id
+            """
+        else:
+            query = "SELECT * FROM appointments a"
+
+        where, params = self._appointment_filter(patient_id, start_date, end_date)
+        query += where + " ORDER BY a.start_time LIMIT ? OFFSET ?"
+        params.extend([limit, skip])
+
+        cursor = self.connections.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_appointments_by_ids(self, ids: List[int], summary: bool = False) -> List[Dict[str, Any]]:
+        """Get the appointments with the given IDs, in no particular order."""
+        if summary:
+            query = f"""
+                SELECT {APPOINTMENT_SUMMARY_COLUMNS}
+                FROM appointments a
+                LEFT JOIN patients p ON p.id = a.patient_id
+                LEFT JOIN users u ON u.id = a.user_id
+            """
+        else:
+            query = "SELECT * FROM appointments a"
+        query += " WHERE a.id IN (SELECT value FROM json_each(?))"
+
+        cursor = self.connections.execute(query, (json.dumps(list(ids)),))
+        return [dict(row) for row in cursor.fetchall()]
 
-        query = "SELECT * FROM appointments"
+    def count_appointments(
+        self,
+        patient_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> int:
+        """Count the appointments ``get_appointments`` would page through."""
+        where, params = self._appointment_filter(patient_id, start_date, end_date)
+        cursor = self.connections.execute(f"SELECT COUNT(*) FROM appointments a{where}", params)
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def _appointment_filter(
+        patient_id: Optional[int], start_date: Optional[str], end_date: Optional[str]
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause and parameters for an appointment listing."""
         params = []
         conditions = []
 
         if patient_id:
-            conditions.append("patient_id = ?")
+            conditions.append("a.patient_id = ?")
             params.append(patient_id)
 
         if start_date:
-            conditions.append("start_time >= ?")
+            conditions.append("a.start_time >= ?")
             params.append(start_date)
 
         if end_date:
-            conditions.append("end_time <= ?")
+            conditions.append("a.end_time <= ?")
             params.append(end_date)
 
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-
-        query += " ORDER BY start_time LIMIT ? OFFSET ?"
-        params.extend([limit, skip])
-
-        cursor.execute(query, params)
-        appointments = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
-        return appointments
+        if not conditions:
+            return "", params
+        return " WHERE " + " AND ".join(conditions), params
 
     def get_appointment(self, appointment_id: int) -> Optional[Dict[str, Any]]:
         """Get appointment by ID."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM appointments WHERE id = ?", (appointment_id,))
+        cursor = self.connections.execute(
+            "SELECT * FROM appointments WHERE id = ?", (appointment_id,)
+        )
         appointment = cursor.fetchone()
-
-        conn.close()
         return dict(appointment) if appointment else None
 
     def create_appointment(self, appointment_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new appointment."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         now = datetime.now().isoformat()
         appointment_data["created_at"] = now
         appointment_data["updated_at"] = now
@@ -606,18 +691,17 @@ class Database:
         placeholders = ", ".join(["?" for _ in fields])
         fields_str = ", ".join(fields)
 
-        cursor.execute(
-            f"INSERT INTO appointments ({fields_str}) VALUES ({placeholders})", values
-        )
-        appointment_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-
-        # Queue for sync
-        appointment_data["id"] = appointment_id
-        self.sync_manager.queue_change(
-            "appointments", OperationType.CREATE, appointment_id, appointment_data
-        )
+        with self.connections.transaction() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO appointments ({fields_str}) VALUES ({placeholders})", values
+            )
+            appointment_id = cursor.lastrowid
+
+            # Queue for sync
+            appointment_data["id"] = appointment_id
+            self.sync_manager.queue_change(
+                "appointments", OperationType.CREATE, appointment_id, appointment_data
+            )
 
         return {**appointment_data, "id": appointment_id}
 
@@ -625,50 +709,94 @@ class Database:
         self, appointment_id: int, appointment_data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Update an appointment."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get current appointment data
-        cursor.execute("SELECT * FROM appointments WHERE id = ?", (appointment_id,))
-        current_appointment = cursor.fetchone()
-        if not current_appointment:
-            conn.close()
-            raise ValueError(f"Appointment with ID {appointment_id} not found")
-
-        # Update appointment data
-        appointment_data["updated_at"] = datetime.now().isoformat()
-        set_clause = ", ".join([f"{key} = ?" for key in appointment_data.keys()])
-        values = list(appointment_data.values()) + [appointment_id]
-
-        cursor.execute(f"UPDATE appointments SET {set_clause} WHERE id = ?", values)
-        conn.commit()
-        conn.close()
-
-        # Queue for sync
-        self.sync_manager.queue_change(
-            "appointments", OperationType.UPDATE, appointment_id, appointment_data
-        )
-
-        return {**appointment_data, "id": appointment_id}
+        with self.connections.transaction() as conn:
+            # Get current appointment data
+            cursor = conn.execute(
+                "SELECT id FROM appointments WHERE id = ?", (appointment_id,)
+            )
+            if not cursor.fetchone():
+                raise ValueError(f"Appointment with ID {appointment_id} not found")
 
-    def delete_appointment(self, appointment_id: int) -> bool:
-        """Delete an appointment."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+            # Update appointment data
+            appointment_data["updated_at"] = datetime.now().isoformat()
+            set_clause = ", ".join([f"{key} = ?" for key in appointment_data.keys()])
+            values = list(appointment_data.values()) + [appointment_id]
 
-        cursor.execute("DELETE FROM appointments WHERE id = ?", (appointment_id,))
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+            conn.execute(f"UPDATE appointments SET {set_clause} WHERE id = ?", values)
 
-        if deleted:
             # Queue for sync
             self.sync_manager.queue_change(
-                "appointments", OperationType.DELETE, appointment_id
+                "appointments", OperationType.UPDATE, appointment_id, appointment_data
             )
 
+        return {**appointment_data, "id": appointment_id}
+
+    def delete_appointment(self, appointment_id: int) -> bool:
+        """Delete an appointment."""
+        with self.connections.transaction() as conn:
+            cursor = conn.execute("DELETE FROM appointments WHERE id = ?", (appointment_id,))
+            deleted = cursor.rowcount > 0
+
+            if deleted:
+                # Queue for sync
+                self.sync_manager.queue_change(
+                    "appointments", OperationType.DELETE, appointment_id
+                )
+
         return deleted
 
+    # Dashboard operations
+    def get_dashboard_stats(self, recent_days: int = 7) -> Dict[str, int]:
+        """Get the dashboard counts in one aggregate query.
+
+        Returns total patients, today's appointments, notes created in the
+        last ``recent_days`` days and outbox counts by state. The result is
+        cached until a committed local write, pulled batch or outbox update
+        bumps the sync manager's data version, or the day changes.
+        """
+        today = date.today()
+        cache_key = (self.sync_manager.data_version, today, recent_days)
+        if self._dashboard_stats_cache and self._dashboard_stats_cache[0] == cache_key:
+            return dict(self._dashboard_stats_cache[1])
+
+        cursor = self.connections.execute(
+            """
+            SELECT p.total_patients, a.todays_appointments, n.recent_notes,
+                   o.pending_changes, o.conflicts, o.dead_letter
+            FROM (SELECT COUNT(*) AS total_patients FROM patients) AS p,
+                 (
+                     SELECT COUNT(*) AS todays_appointments FROM appointments
+                     WHERE start_time >= ? AND start_time < ?
+                 ) AS a,
+                 (
+                     SELECT COUNT(*) AS recent_notes FROM clinical_notes
+                     WHERE created_at >= ?
+                 ) AS n,
+                 (
+                     SELECT
+                         COALESCE(SUM(CASE WHEN status IN (?, ?, ?) THEN 1 ELSE 0 END), 0) AS pending_changes,
+                         COALESCE(SUM(CASE WHEN status = ? THEN 1 ELSE 0 END), 0) AS conflicts,
+                         COALESCE(SUM(CASE WHEN status = ? THEN 1 ELSE 0 END), 0) AS dead_letter
+                     FROM sync_outbox WHERE status != ?
+                 ) AS o
+            """,
+            (
+                today.isoformat(),
+                (today + timedelta(days=1)).isoformat(),
+                (today - timedelta(days=recent_days)).isoformat(),
+                SyncStatus.PENDING.value,
+                SyncStatus.SYNCING.value,
+                SyncStatus.ERROR.value,
+                SyncStatus.CONFLICT.value,
+                SyncStatus.DEAD_LETTER.value,
+                SyncStatus.SYNCED.value,
+            ),
+        )
+        stats = dict(cursor.fetchone())
+
+        self._dashboard_stats_cache = (cache_key, stats)
+        return dict(stats)
+
     # File operations
     def register_file(
         self,
@@ -678,13 +806,10 @@ class Database:
         entity_id: int,
     ) -> Dict[str, Any]:
         """Register a file in the database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         file_id = os.path.basename(file_path)
         now = datetime.now().isoformat()
 
-        cursor.execute(
+        self.connections.execute(
             """
             INSERT INTO files (
                 id, file_path, file_type, entity_type, entity_id,
@@ -693,8 +818,8 @@ class Database:
             """,
             (file_id, file_path, file_type, entity_type, entity_id, False, now, now),
         )
-        conn.commit()
-        conn.close()
+        # Wakes the file upload worker
+        self.connections.on_commit(partial(self.events.publish, "files", [file_id], "create"))
 
         # Queue for sync - will be handled by a separate file upload process
         file_data = {
@@ -711,40 +836,84 @@ class Database:
 
     def get_files_for_entity(self, entity_type: str, entity_id: int) -> List[Dict[str, Any]]:
         """Get files associated with an entity."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute(
+        cursor = self.connections.execute(
             "SELECT * FROM files WHERE entity_type = ? AND entity_id = ?",
             (entity_type, entity_id),
         )
-        files = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
-        return files
+        return [dict(row) for row in cursor.fetchall()]
 
     def mark_file_uploaded(self, file_id: str, remote_url: str) -> bool:
         """Mark a file as uploaded and store its remote URL."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         now = datetime.now().isoformat()
-        cursor.execute(
-            "UPDATE files SET uploaded = ?, remote_url = ?, updated_at = ?, last_synced_at = ? WHERE id = ?",
+        cursor = self.connections.execute(
+            "UPDATE files SET uploaded = ?, remote_url = ?, upload_error = NULL, updated_at = ?, last_synced_at = ? WHERE id = ?",
             (True, remote_url, now, now, file_id),
         )
-        updated = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        return cursor.rowcount > 0
 
-        return updated
+    def get_pending_uploads(
+        self, limit: int = 10, max_attempts: int = 3, exclude_ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get files still to be uploaded, oldest first.
+
+        Files attached to an entity that only has a temporary ID, or whose
+        create has not reached the server yet, are skipped until it has.
+        """
+        exclude_ids = list(exclude_ids or [])
+        query = """
+            SELECT f.* FROM files f
+            WHERE f.uploaded = 0 AND f.upload_attempts < ? AND f.entity_id > 0
+            AND NOT EXISTS (
+                SELECT 1 FROM sync_outbox o
+                WHERE o.entity_type = f.entity_type AND o.entity_id = f.entity_id
+                AND o.operation_type = ? AND o.status != ?
+            )
+        """
+        params: List[Any] = [max_attempts, OperationType.CREATE.value, SyncStatus.SYNCED.value]
+        if exclude_ids:
+            query += f" AND f.id NOT IN ({', '.join(['?'] * len(exclude_ids))})"
+            params.extend(exclude_ids)
+        query += " ORDER BY f.created_at LIMIT ?"
+        params.append(limit)
+
+        cursor = self.connections.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def record_file_upload_error(
+        self, file_id: str, error_message: str, give_up_at: Optional[int] = None
+    ) -> None:
+        """Record a failed upload attempt.
+
+        ``give_up_at`` jumps the attempt count straight to that limit for
+        failures that retrying cannot fix, such as a missing local file.
+        """
+        self.connections.execute(
+            """
+            UPDATE files
+            SET upload_attempts = COALESCE(?, upload_attempts + 1),
+                upload_error = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (give_up_at, error_message, datetime.now().isoformat(), file_id),
+        )
 
     # Sync status operations
+    def get_outbox_counts(self) -> Dict[str, int]:
+        """Get the number of outbox changes in each unsynced status, without a query."""
+        return self.sync_manager.get_outbox_counts()
+
     def get_pending_changes(self) -> List[Dict[str, Any]]:
         """Get all pending changes that haven't been synced."""
         return self.sync_manager.get_pending_changes()
 
+    def get_dead_letter_changes(self) -> List[Dict[str, Any]]:
+        """Get all changes that exhausted their retry attempts."""
+        return self.sync_manager.get_dead_letter_changes()
+
+    def requeue_change(self, change_id: str) -> None:
+        """Give a dead-lettered or failed change a fresh set of retry attempts."""
+        self.sync_manager.requeue_change(change_id)
+
     def get_conflicts(self) -> List[Dict[str, Any]]:
         """Get all changes that resulted in conflicts."""
         return self.sync_manager.get_conflicts()
@@ -761,4 +930,4 @@ class Database:
 
     def reset_sync_state(self) -> None:
         """Reset the sync state (for testing or recovery)."""
-        self.sync_manager.reset_sync_state()
\ No newline at end of file
+        self.sync_manager.reset_sync_state()
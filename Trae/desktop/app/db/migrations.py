@@ -0,0 +1,223 @@
+import logging
+import sqlite3
+from typing import Callable, List, Tuple
+
+from app.db.connection import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+
+def _add_outbox_retry_schedule(conn: sqlite3.Connection) -> None:
+    """Add next_attempt_at to outboxes created before retry scheduling."""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(sync_outbox)")}
+    if "next_attempt_at" not in columns:
+        conn.execute("ALTER TABLE sync_outbox ADD COLUMN next_attempt_at TEXT")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_sync_outbox_status_next_attempt
+        ON sync_outbox (status, next_attempt_at)
+        """
+    )
+
+
+def _add_outbox_indexes(conn: sqlite3.Connection) -> None:
+    """Index the outbox for status listings and per-entity lookups."""
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_sync_outbox_status_created
+        ON sync_outbox (status, created_at)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_sync_outbox_entity
+        ON sync_outbox (entity_type, entity_id)
+        """
+    )
+
+
+def _add_temp_id_counters(conn: sqlite3.Connection) -> None:
+    """Move temporary ID allocation to a counter table, seeded from the outbox."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_temp_ids (
+            entity_type TEXT PRIMARY KEY,
+            next_id INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO sync_temp_ids (entity_type, next_id)
+        SELECT entity_type, MIN(entity_id) - 1
+        FROM sync_outbox WHERE entity_id < 0
+        GROUP BY entity_type
+        """
+    )
+
+
+def _add_file_upload_tracking(conn: sqlite3.Connection) -> None:
+    """Track upload attempts on files and index the pending-upload scan."""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(files)")}
+    if "upload_attempts" not in columns:
+        conn.execute("ALTER TABLE files ADD COLUMN upload_attempts INTEGER NOT NULL DEFAULT 0")
+    if "upload_error" not in columns:
+        conn.execute("ALTER TABLE files ADD COLUMN upload_error TEXT")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_files_uploaded_created
+        ON files (uploaded, created_at)
+        """
+    )
+
+
+def _add_dashboard_indexes(conn: sqlite3.Connection) -> None:
+    """Index the date columns the dashboard counts filter on."""
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_appointments_start_time
+        ON appointments (start_time)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_clinical_notes_created_at
+        ON clinical_notes (created_at)
+        """
+    )
+
+
+def _add_listing_indexes(conn: sqlite3.Connection) -> None:
+    """Index the per-patient note and appointment listings."""
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_clinical_notes_patient_visit
+        ON clinical_notes (patient_id, visit_date)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_appointments_patient_start
+        ON appointments (patient_id, start_time)
+        """
+    )
+
+
+# Digits of a phone number, so "555-123-4567" also matches "5551234"
+_PHONE_DIGITS = "replace(replace(replace(replace(replace(replace({}, '-', ''), ' ', ''), '(', ''), ')', ''), '+', ''), '.', '')"
+
+
+def _patient_search_values(row: str) -> str:
+    """Column values indexed for a patients row alias (``new`` or ``old``)."""
+    phone = f"{row}.phone"
+    return (
+        f"{row}.first_name, {row}.last_name, "
+        f"coalesce({phone}, '') || ' ' || coalesce({_PHONE_DIGITS.format(phone)}, ''), "
+        f"{row}.email, {row}.insurance_id"
+    )
+
+
+def _fts5_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _add_patient_search_index(conn: sqlite3.Connection) -> None:
+    """Index patient names, phone, email and insurance ID for full-text search.
+
+    The index is a contentless FTS5 table kept in step with ``patients`` by
+    triggers. Without FTS5 in the SQLite build, searches keep using LIKE.
+    """
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_patients_name
+        ON patients (last_name, first_name)
+        """
+    )
+    if not _fts5_available(conn):
+        logger.warning("SQLite was built without FTS5, patient search will not be indexed")
+        return
+
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+            first_name, last_name, phone, email, insurance_id,
+            content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS patients_fts_insert AFTER INSERT ON patients BEGIN
+            INSERT INTO patients_fts (rowid, first_name, last_name, phone, email, insurance_id)
+            VALUES (new.id, {_patient_search_values("new")});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS patients_fts_delete AFTER DELETE ON patients BEGIN
+            INSERT INTO patients_fts (patients_fts, rowid, first_name, last_name, phone, email, insurance_id)
+            VALUES ('delete', old.id, {_patient_search_values("old")});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS patients_fts_update
+        AFTER UPDATE OF first_name, last_name, phone, email, insurance_id ON patients BEGIN
+            INSERT INTO patients_fts (patients_fts, rowid, first_name, last_name, phone, email, insurance_id)
+            VALUES ('delete', old.id, {_patient_search_values("old")});
+            INSERT INTO patients_fts (rowid, first_name, last_name, phone, email, insurance_id)
+            VALUES (new.id, {_patient_search_values("new")});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO patients_fts (rowid, first_name, last_name, phone, email, insurance_id)
+        SELECT id, {_patient_search_values("patients")} FROM patients
+        """
+    )
+
+
+# Ordered (version, description, migration) entries. Append new migrations with
+# the next version number; never edit or reorder released ones.
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "outbox retry schedule", _add_outbox_retry_schedule),
+    (2, "outbox indexes", _add_outbox_indexes),
+    (3, "temporary ID counters", _add_temp_id_counters),
+    (4, "file upload tracking", _add_file_upload_tracking),
+    (5, "dashboard indexes", _add_dashboard_indexes),
+    (6, "listing indexes", _add_listing_indexes),
+    (7, "patient search index", _add_patient_search_index),
+]
+
+
+def get_schema_version(connections: ConnectionManager) -> int:
+    """Return the schema version recorded in the database."""
+    return connections.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connections: ConnectionManager) -> int:
+    """Apply pending migrations in order, one transaction each, and return the new version.
+
+    The version is tracked in ``PRAGMA user_version``. Must run after the base
+    tables have been created.
+    """
+    version = get_schema_version(connections)
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+
+        logger.info(f"Migrating local database to version {target}: {description}")
+        with connections.transaction() as conn:
+            apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(target)}")
+        version = target
+
+    return version
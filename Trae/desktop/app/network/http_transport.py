@@ -0,0 +1,122 @@
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HTTPTransport:
+    """Connection-pooled HTTP clients shared by everything that talks to the API.
+
+    Creating a client per request pays a TCP (and TLS) handshake every time.
+    One ``HTTPTransport`` is created per application and injected into the
+    sync manager, API client and network manager so they all reuse the same
+    keep-alive connections. HTTP/2 is used when the ``h2`` package is
+    installed, multiplexing concurrent requests over a single connection.
+
+    The async client serves the event loop; the sync client serves callers
+    on other threads, such as the connectivity checker. Both are created on
+    first use and share timeouts and pool limits.
+    """
+
+    def __init__(
+        self,
+        timeout: float = settings.CONNECTION_TIMEOUT,
+        http2: bool = settings.HTTP2,
+        max_connections: int = settings.HTTP_MAX_CONNECTIONS,
+        keepalive_expiry: float = settings.HTTP_KEEPALIVE_EXPIRY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if http2 and not HTTP2_AVAILABLE:
+            logger.info("h2 is not installed, using HTTP/1.1")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.timeout = httpx.Timeout(timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = transport
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        self.metrics = {"requests": 0, "connections_opened": 0}
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The shared async client, created on first use."""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self._transport,
+                event_hooks={"request": [self._trace_async_request]},
+            )
+        return self._async_client
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        """The shared blocking client for use off the event loop thread."""
+        with self._lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                self._sync_client = httpx.Client(
+                    timeout=self.timeout,
+                    limits=self.limits,
+                    http2=self.http2,
+                    event_hooks={"request": [self._trace_sync_request]},
+                )
+            return self._sync_client
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.metrics[key] += 1
+
+    async def _trace_async_request(self, request: httpx.Request) -> None:
+        self._count("requests")
+        request.extensions["trace"] = self._trace_async
+
+    def _trace_sync_request(self, request: httpx.Request) -> None:
+        self._count("requests")
+        request.extensions["trace"] = self._trace_sync
+
+    async def _trace_async(self, event_name: str, info: Dict[str, Any]) -> None:
+        self._trace_sync(event_name, info)
+
+    def _trace_sync(self, event_name: str, info: Dict[str, Any]) -> None:
+        """Count new connections from httpcore's trace events."""
+        if event_name == "connection.connect_tcp.complete":
+            self._count("connections_opened")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get request and connection counts and the share of requests that reused a connection."""
+        with self._lock:
+            metrics = dict(self.metrics)
+        metrics["connections_reused"] = max(0, metrics["requests"] - metrics["connections_opened"])
+        metrics["reuse_ratio"] = (
+            metrics["connections_reused"] / metrics["requests"] if metrics["requests"] else 0.0
+        )
+        return metrics
+
+    async def aclose(self) -> None:
+        """Close both clients and their pooled connections."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+        self.close_sync()
+
+    def close_sync(self) -> None:
+        """Close the blocking client."""
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
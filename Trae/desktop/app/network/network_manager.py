@@ -7,6 +7,8 @@ from typing import Callable, Optional
 
 import httpx
 
+from app.network.http_transport import HTTPTransport
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,8 +21,10 @@ class NetworkManager:
         check_interval: int = 30,  # seconds
         connection_timeout: int = 5,  # seconds
         on_status_change: Optional[Callable[[bool], None]] = None,
+        http: Optional[HTTPTransport] = None,
     ):
         self.api_url = api_url
+        self.http = http or HTTPTransport(timeout=connection_timeout)
         self.check_interval = check_interval
         self.connection_timeout = connection_timeout
         self.on_status_change = on_status_change
@@ -74,10 +78,11 @@ class NetworkManager:
 
         # Then check if we can connect to our API
         try:
-            with httpx.Client(timeout=self.connection_timeout) as client:
-                # Try to connect to the API health endpoint
-                response = client.get(f"{self.api_url}/health")
-                return response.status_code == 200
+            # Try to connect to the API health endpoint, reusing a pooled connection
+            response = self.http.sync_client.get(
+                f"{self.api_url}/health", timeout=self.connection_timeout
+            )
+            return response.status_code == 200
         except httpx.RequestError:
             return False
 
@@ -95,10 +100,11 @@ class NetworkManager:
 
         # Then check if we can connect to our API
         try:
-            async with httpx.AsyncClient(timeout=self.connection_timeout) as client:
-                # Try to connect to the API health endpoint
-                response = await client.get(f"{self.api_url}/health")
-                return response.status_code == 200
+            # Try to connect to the API health endpoint, reusing a pooled connection
+            response = await self.http.async_client.get(
+                f"{self.api_url}/health", timeout=self.connection_timeout
+            )
+            return response.status_code == 200
         except httpx.RequestError:
             return False
 
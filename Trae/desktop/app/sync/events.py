@@ -0,0 +1,67 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# A change event: {"entity_type": "patients", "ids": [1, 2], "operation": "update", "source": "remote"}
+ChangeEvent = Dict[str, Any]
+
+# Besides synced entity types, events are published for:
+#   "sync_outbox": outbox changes moved status; ids are change IDs (empty on reset)
+#   "network": connectivity changed; operation is "online" or "offline", no ids
+
+
+class EventBus:
+    """In-process publish/subscribe for changes to synced entities.
+
+    The sync manager publishes an event whenever local writes or pulled
+    data change rows, naming the entity type, the affected IDs and the
+    operation (create, update or delete). Subscribers are called on the
+    publishing thread, which may be a sync or worker thread; UI code should
+    subscribe through ``app.ui.change_dispatcher.ChangeDispatcher``.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, tuple] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        callback: Callable[[ChangeEvent], None],
+        entity_types: Optional[Iterable[str]] = None,
+    ) -> Callable[[], None]:
+        """Call ``callback`` for each event, optionally only for some entity types.
+
+        Returns a function that removes the subscription.
+        """
+        with self._lock:
+            subscription_id = self._next_id
+            self._next_id += 1
+            self._subscribers[subscription_id] = (
+                callback,
+                frozenset(entity_types) if entity_types is not None else None,
+            )
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers.pop(subscription_id, None)
+
+        return unsubscribe
+
+    def publish(
+        self, entity_type: str, ids: List[Any], operation: str, source: str = "local"
+    ) -> None:
+        """Publish a change to ``ids`` of ``entity_type``."""
+        event = {"entity_type": entity_type, "ids": ids, "operation": operation, "source": source}
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+
+        for callback, entity_types in subscribers:
+            if entity_types is not None and entity_type not in entity_types:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in change event subscriber: {e}")
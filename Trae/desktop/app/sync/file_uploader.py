@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.api.client import APIClient, APIError
+
+logger = logging.getLogger(__name__)
+
+# Attachment types accepted by the clinical note attachments endpoint
+ATTACHMENT_FILE_TYPES = {"image", "document", "signature", "other"}
+
+# Local entity type -> attachments endpoint owner
+UPLOADABLE_ENTITY_TYPES = {"clinical_notes"}
+
+# Responses that will fail the same way on every retry
+PERMANENT_UPLOAD_ERRORS = {400, 404, 413, 415, 422}
+
+
+class FileUploadWorker:
+    """Uploads files registered in the local ``files`` table in the background.
+
+    Runs ``concurrency`` upload coroutines that each claim the oldest pending
+    file not already in flight, so one large attachment never holds up the
+    rest. Record sync is independent of this worker. Pending state lives in
+    the database, so uploads interrupted by a shutdown or a lost connection
+    are simply retried from the start on the next run; the server stores
+    attachments by content hash, so a retried upload does not duplicate the
+    blob.
+    """
+
+    def __init__(
+        self,
+        db,
+        api_client: APIClient,
+        concurrency: int = 3,
+        max_attempts: int = 3,
+        poll_interval: int = 60,  # seconds
+    ):
+        self.db = db
+        self.api_client = api_client
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.upload_task: Optional[asyncio.Task] = None
+        self._in_flight: Set[str] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._unsubscribe: Optional[Callable[[], None]] = None
+
+    def start(self) -> None:
+        """Start uploading in the background. Call on the event loop thread.
+
+        Newly registered files are picked up at once rather than at the next
+        poll.
+        """
+        if self.upload_task is None or self.upload_task.done():
+            self._wake = asyncio.Event()
+            self.upload_task = asyncio.create_task(self._upload_loop())
+        if self._unsubscribe is None:
+            loop = asyncio.get_running_loop()
+            # Files are registered from Tk callbacks and worker threads
+            self._unsubscribe = self.db.events.subscribe(
+                lambda event: loop.call_soon_threadsafe(self.wake), ["files"]
+            )
+
+    def stop(self) -> None:
+        """Stop uploading; files in flight are retried on the next start.
+
+        Call on the event loop thread, which owns the upload task and
+        ``_in_flight``.
+        """
+        if self.upload_task and not self.upload_task.done():
+            self.upload_task.cancel()
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        self._in_flight.clear()
+
+    def wake(self) -> None:
+        """Check for pending files now instead of at the next poll. Call on the event loop thread."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _upload_loop(self) -> None:
+        """Drain pending files, then wait for a wake-up or the poll interval."""
+        while True:
+            try:
+                await self.upload_pending()
+            except Exception as e:
+                logger.error(f"File upload error: {e}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def upload_pending(self) -> Dict[str, int]:
+        """Try every pending file once, with bounded concurrency.
+
+        Files that fail are left for the next pass rather than retried
+        straight away.
+        """
+        results = {"uploaded": 0, "error": 0}
+        attempted: Set[str] = set()
+        await asyncio.gather(
+            *(self._upload_worker(attempted, results) for _ in range(self.concurrency))
+        )
+        return results
+
+    async def _upload_worker(self, attempted: Set[str], results: Dict[str, int]) -> None:
+        """Claim and upload pending files one at a time until none are left."""
+        while True:
+            file = self._claim_next(attempted)
+            if file is None:
+                return
+
+            try:
+                if await self._upload(file):
+                    results["uploaded"] += 1
+                else:
+                    results["error"] += 1
+            finally:
+                self._in_flight.discard(file["id"])
+
+    def _claim_next(self, attempted: Set[str]) -> Optional[Dict[str, Any]]:
+        """Return the oldest pending file not yet tried in this pass."""
+        pending = self.db.get_pending_uploads(
+            limit=1,
+            max_attempts=self.max_attempts,
+            exclude_ids=list(attempted | self._in_flight),
+        )
+        if not pending:
+            return None
+
+        file = pending[0]
+        attempted.add(file["id"])
+        self._in_flight.add(file["id"])
+        return file
+
+    async def _upload(self, file: Dict[str, Any]) -> bool:
+        """Upload one file and record the outcome."""
+        if file["entity_type"] not in UPLOADABLE_ENTITY_TYPES:
+            self.db.record_file_upload_error(
+                file["id"],
+                f"Uploads are not supported for {file['entity_type']}",
+                give_up_at=self.max_attempts,
+            )
+            return False
+
+        if not os.path.exists(file["file_path"]):
+            self.db.record_file_upload_error(
+                file["id"], "Local file not found", give_up_at=self.max_attempts
+            )
+            return False
+
+        file_type = file["file_type"] if file["file_type"] in ATTACHMENT_FILE_TYPES else "other"
+
+        try:
+            attachment = await self.api_client.upload_file(
+                file["entity_id"], file["file_path"], file_type
+            )
+        except APIError as e:
+            logger.error(f"Error uploading file {file['id']}: {e}")
+            give_up_at = self.max_attempts if e.status_code in PERMANENT_UPLOAD_ERRORS else None
+            self.db.record_file_upload_error(file["id"], str(e), give_up_at=give_up_at)
+            return False
+        except OSError as e:
+            logger.error(f"Error reading file {file['id']}: {e}")
+            self.db.record_file_upload_error(file["id"], str(e))
+            return False
+
+        self.db.mark_file_uploaded(file["id"], attachment.get("file_path", ""))
+        return True
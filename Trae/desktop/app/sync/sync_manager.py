@@ -1,16 +1,24 @@
 import asyncio
+import gzip
 import json
 import logging
 import os
+import random
 import sqlite3
+import threading
 import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Union
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import httpx
 
+from app.db.connection import ConnectionManager
+from app.network.http_transport import HTTPTransport
+from app.sync.events import EventBus
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,7 +27,8 @@ class SyncStatus(str, Enum):
     SYNCING = "syncing"  # Currently being synced
     SYNCED = "synced"    # Successfully synced with server
     CONFLICT = "conflict"  # Conflict detected
-    ERROR = "error"      # Error during sync
+    ERROR = "error"      # Error during sync, retried after next_attempt_at
+    DEAD_LETTER = "dead_letter"  # Gave up after too many failed attempts
 
 
 class OperationType(str, Enum):
@@ -28,6 +37,48 @@ class OperationType(str, Enum):
     DELETE = "delete"
 
 
+# Local tables that receive pulled changes, named after their entity type
+SYNCED_TABLES = ("users", "patients", "clinical_notes", "appointments")
+
+# Server entity types, as named in its sync API, and the local tables they map to
+REMOTE_ENTITY_TABLES = {
+    "user": "users",
+    "patient": "patients",
+    "clinical_note": "clinical_notes",
+    "appointment": "appointments",
+}
+
+# Cursor for the first pull, which fetches every change
+PULL_EPOCH = "1970-01-01T00:00:00"
+
+# Outbox statuses counted in memory; synced rows only wait to be cleared
+COUNTED_STATUSES = (
+    SyncStatus.PENDING.value,
+    SyncStatus.SYNCING.value,
+    SyncStatus.ERROR.value,
+    SyncStatus.CONFLICT.value,
+    SyncStatus.DEAD_LETTER.value,
+)
+
+# (change_id, old_status, new_status); None for a row inserted or deleted
+StatusChange = Tuple[str, Optional[str], Optional[str]]
+
+
+def _to_sql_value(value: Any) -> Any:
+    """Convert a JSON value to something SQLite can bind."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _remote_id(entity_id: Any) -> Any:
+    """Local rows are keyed by integer IDs; the sync API sends IDs as strings."""
+    try:
+        return int(entity_id)
+    except (TypeError, ValueError):
+        return entity_id
+
+
 class SyncManager:
     """Manages offline synchronization between local SQLite and remote API."""
 
@@ -37,18 +88,75 @@ class SyncManager:
         api_url: str,
         auth_token: Optional[str] = None,
         auto_sync_interval: int = 60,  # seconds
+        connections: Optional[ConnectionManager] = None,
+        push_batch_size: int = 100,
+        push_batch_bytes: int = 512 * 1024,
+        retry_attempts: int = 3,
+        retry_backoff: float = 1.5,
+        retry_base_delay: float = 30,  # seconds
+        retry_max_delay: float = 3600,  # seconds
+        pull_page_size: int = 1000,
+        sync_debounce: float = 0.5,  # seconds
+        compress_min_bytes: int = 1024,
+        http: Optional[HTTPTransport] = None,
+        events: Optional[EventBus] = None,
     ):
         self.db_path = db_path
+        self.connections = connections or ConnectionManager(db_path)
+        self.push_batch_size = push_batch_size
+        self.push_batch_bytes = push_batch_bytes
+        self.retry_attempts = retry_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.pull_page_size = pull_page_size
+        self.compress_min_bytes = compress_min_bytes
+        self.http = http or HTTPTransport()
+        self._table_columns: Dict[str, List[str]] = {}
+        # Bumped whenever synced tables or the outbox change, so readers can
+        # cache derived data such as dashboard counts
+        self.data_version = 0
+        # Change events for local writes and pulled data
+        self.events = events or EventBus()
+        # Outbox rows per status, kept in step with every status change so
+        # the status bar never has to query the outbox
+        self._outbox_counts = dict.fromkeys(COUNTED_STATUSES, 0)
+        self._outbox_counts_lock = threading.Lock()
         self.api_url = api_url
         self.auth_token = auth_token
         self.auto_sync_interval = auto_sync_interval
         self.is_online = False
         self.sync_task = None
+
+        # Sync scheduling: one pass at a time, triggers merged within the debounce window
+        self.sync_debounce = sync_debounce
+        # The loop that runs sync passes; requests made outside it are handed over
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sync_lock = asyncio.Lock()
+        self._scheduled_sync: Optional[asyncio.Task] = None
+        self._push_dirty = False
+        self._pull_dirty = False
+        self.sync_metrics = {
+            "triggers": 0,
+            "merged_triggers": 0,
+            "push_passes": 0,
+            "pull_passes": 0,
+            "request_bytes": 0,
+            "request_wire_bytes": 0,
+        }
+
         self._setup_db()
 
     def _setup_db(self) -> None:
         """Set up the local SQLite database with sync tables."""
-        conn = sqlite3.connect(self.db_path)
+        with self.connections.transaction() as conn:
+            self._create_sync_tables(conn)
+            for row in conn.execute("SELECT status, COUNT(*) FROM sync_outbox GROUP BY status"):
+                if row[0] in self._outbox_counts:
+                    self._outbox_counts[row[0]] = row[1]
+
+    def _create_sync_tables(self, conn: sqlite3.Connection) -> None:
+        """Create the outbox and metadata tables."""
         cursor = conn.cursor()
 
         # Create outbox table for tracking local changes
@@ -65,7 +173,8 @@ class SyncManager:
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
                 retry_count INTEGER DEFAULT 0,
-                idempotency_key TEXT NOT NULL
+                idempotency_key TEXT NOT NULL,
+                next_attempt_at TEXT
             )
             """
         )
@@ -82,38 +191,133 @@ class SyncManager:
         )
 
         # Initialize metadata for entity types
-        for entity_type in ["users", "patients", "clinical_notes", "appointments"]:
+        for entity_type in SYNCED_TABLES:
             cursor.execute(
                 "INSERT OR IGNORE INTO sync_metadata (entity_type, last_sync_time) VALUES (?, NULL)",
                 (entity_type,),
             )
 
-        conn.commit()
-        conn.close()
-
     def set_auth_token(self, token: str) -> None:
         """Set the authentication token for API requests."""
         self.auth_token = token
 
+    def get_outbox_counts(self) -> Dict[str, int]:
+        """Get the number of outbox changes in each unsynced status."""
+        with self._outbox_counts_lock:
+            return dict(self._outbox_counts)
+
+    def _record_status_changes(self, changes: Iterable[StatusChange]) -> None:
+        """Count outbox status changes once the current transaction commits.
+
+        Call inside the transaction that wrote them, so a rollback leaves
+        the counts alone. Publishes a "sync_outbox" event with the change IDs.
+        """
+        changes = [change for change in changes if change[1] != change[2]]
+        if not changes:
+            return
+
+        def apply() -> None:
+            with self._outbox_counts_lock:
+                for _, old_status, new_status in changes:
+                    if old_status in self._outbox_counts:
+                        self._outbox_counts[old_status] -= 1
+                    if new_status in self._outbox_counts:
+                        self._outbox_counts[new_status] += 1
+            self.events.publish("sync_outbox", [change_id for change_id, _, _ in changes], "status")
+
+        self.connections.on_commit(apply)
+
+    def set_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Set the event loop that runs sync passes requested outside of it."""
+        self.loop = loop
+
+    def _bump_data_version(self) -> None:
+        """Invalidate data cached against ``data_version``; register with ``on_commit``.
+
+        Bumping before the commit would let a reader on another thread cache
+        pre-commit data under the new version.
+        """
+        self.data_version += 1
+
     def set_online_status(self, is_online: bool) -> None:
         """Set the online status and trigger sync if coming online."""
-        if not self.is_online and is_online:
-            logger.info("Device came online, triggering sync")
-            asyncio.create_task(self.sync())
+        was_online = self.is_online
         self.is_online = is_online
+        if not was_online and is_online:
+            logger.info("Device came online, triggering sync")
+            self.request_sync()
+
+    def start_auto_sync(self, initial_delay: float = 0) -> None:
+        """Start automatic background synchronization.
 
-    def start_auto_sync(self) -> None:
-        """Start automatic background synchronization."""
+        The first pass runs after ``initial_delay`` seconds, then one every
+        ``auto_sync_interval``.
+        """
         if self.sync_task is None or self.sync_task.done():
-            self.sync_task = asyncio.create_task(self._auto_sync_loop())
+            self.sync_task = asyncio.create_task(self._auto_sync_loop(initial_delay))
 
     def stop_auto_sync(self) -> None:
         """Stop automatic background synchronization."""
         if self.sync_task and not self.sync_task.done():
             self.sync_task.cancel()
+        if self._scheduled_sync and not self._scheduled_sync.done():
+            self._scheduled_sync.cancel()
+
+    def request_sync(self, push: bool = True, pull: bool = True) -> None:
+        """Request a sync pass after the debounce window.
+
+        Requests made while a pass is already scheduled or running are merged
+        into it; the dirty flags decide whether the pass pushes, pulls or both.
+        Safe to call from any thread: outside a running event loop (e.g. from
+        a Tk callback) the request is handed to the loop set by
+        ``set_event_loop``. Without one the flags are left for the next sync.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
 
-    async def _auto_sync_loop(self) -> None:
+        if running is not None:
+            self._schedule_sync(push, pull)
+        elif self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._schedule_sync, push, pull)
+        else:
+            self._push_dirty = self._push_dirty or push
+            self._pull_dirty = self._pull_dirty or pull
+            logger.debug("No event loop, deferring sync to the next pass")
+
+    def _schedule_sync(self, push: bool, pull: bool) -> None:
+        """Mark work as outstanding and start a debounced pass; runs on the event loop."""
+        self._push_dirty = self._push_dirty or push
+        self._pull_dirty = self._pull_dirty or pull
+        self.sync_metrics["triggers"] += 1
+
+        if self._scheduled_sync and not self._scheduled_sync.done():
+            self.sync_metrics["merged_triggers"] += 1
+            return
+
+        self._scheduled_sync = asyncio.get_running_loop().create_task(self._run_scheduled_sync())
+
+    async def _run_scheduled_sync(self) -> None:
+        """Run debounced sync passes until no push or pull is outstanding."""
+        while self._push_dirty or self._pull_dirty:
+            await asyncio.sleep(self.sync_debounce)
+            if not self.is_online:
+                # Flags stay set; coming online triggers a new pass
+                return
+
+            async with self._sync_lock:
+                push, pull = self._push_dirty, self._pull_dirty
+                self._push_dirty = self._pull_dirty = False
+                await self._sync_pass(push=push, pull=pull)
+
+    def get_sync_metrics(self) -> Dict[str, int]:
+        """Get counters for sync triggers, passes and request body sizes."""
+        return dict(self.sync_metrics)
+
+    async def _auto_sync_loop(self, initial_delay: float = 0) -> None:
         """Background task that periodically syncs data."""
+        await asyncio.sleep(initial_delay)
         while True:
             try:
                 if self.is_online:
@@ -123,16 +327,28 @@ class SyncManager:
             await asyncio.sleep(self.auto_sync_interval)
 
     async def sync(self) -> Dict[str, Any]:
-        """Perform a full sync operation."""
+        """Perform a full sync operation, waiting for any pass in progress."""
         if not self.is_online:
             return {"status": "offline", "message": "Device is offline"}
 
+        async with self._sync_lock:
+            self._push_dirty = self._pull_dirty = False
+            return await self._sync_pass(push=True, pull=True)
+
+    async def _sync_pass(self, push: bool, pull: bool) -> Dict[str, Any]:
+        """Push and/or pull changes. Callers must hold the sync lock."""
         try:
             # First push local changes to server
-            push_result = await self._push_changes()
+            push_result = None
+            if push:
+                self.sync_metrics["push_passes"] += 1
+                push_result = await self._push_changes()
 
             # Then pull remote changes
-            pull_result = await self._pull_changes()
+            pull_result = None
+            if pull:
+                self.sync_metrics["pull_passes"] += 1
+                pull_result = await self._pull_changes()
 
             return {
                 "status": "success",
@@ -143,261 +359,476 @@ class SyncManager:
             logger.error(f"Sync error: {e}")
             return {"status": "error", "message": str(e)}
 
-    async def _push_changes(self) -> Dict[str, int]:
-        """Push local changes to the server using the sync API."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def _encode_json(self, payload: Any) -> Tuple[bytes, Dict[str, str]]:
+        """Serialize a request body, gzipping it when it is worth compressing.
 
-        # Get all pending changes
-        cursor.execute(
-            "SELECT * FROM sync_outbox WHERE status = ? ORDER BY created_at",
-            (SyncStatus.PENDING.value,),
-        )
-        pending_changes = cursor.fetchall()
+        Returns the body and the headers to send it with.
+        """
+        # Only gzip is advertised since that is what the server compresses
+        # with; httpx inflates compressed responses transparently
+        headers = {
+            "Authorization": f"Bearer {self.auth_token}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip",
+        }
+        content = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.sync_metrics["request_bytes"] += len(content)
+
+        if len(content) >= self.compress_min_bytes:
+            # Level 6 is the usual sweet spot; higher levels cost far more CPU
+            # for a few percent on repetitive JSON
+            content = gzip.compress(content, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+
+        self.sync_metrics["request_wire_bytes"] += len(content)
+        return content, headers
 
+    async def _push_changes(self) -> Dict[str, int]:
+        """Push local changes to the server using the sync API.
+
+        Changes are sent in bounded batches. While one batch is in flight the
+        next one is claimed, and no transaction is held across a request so
+        local writes are never blocked by the network.
+        """
         results = {"success": 0, "error": 0, "conflict": 0}
-        
-        if not pending_changes:
-            conn.close()
+
+        batch = self._claim_push_batch()
+        if not batch:
             return results
-            
-        # Convert pending changes to the format expected by the sync API
-        changes_to_push = []
-        change_ids = []
-        
-        for change in pending_changes:
-            change_dict = dict(change)
-            change_id = change_dict["id"]
-            change_ids.append(change_id)
-            
-            # Mark as syncing
-            cursor.execute(
-                "UPDATE sync_outbox SET status = ?, updated_at = ? WHERE id = ?",
-                (
-                    SyncStatus.SYNCING.value,
-                    datetime.now().isoformat(),
-                    change_id,
-                ),
+
+        client = self.http.async_client
+        while batch:
+            content, headers = self._encode_json({"changes": [change for _, _, change in batch]})
+            request = asyncio.ensure_future(
+                client.post(
+                    f"{self.api_url}/api/v1/sync/push",
+                    content=content,
+                    headers=headers,
+                )
             )
-            
+
+            # Prepare the next batch while this one is in flight
+            await asyncio.sleep(0)
+            next_batch = self._claim_push_batch()
+
+            try:
+                response = await request
+            except Exception as e:
+                logger.error(f"Error pushing changes: {e}")
+                self._record_push_failure(batch, str(e))
+                self._release_push_batch(next_batch)
+                results["error"] += len(batch)
+                break
+
+            for key, count in self._record_push_response(batch, response).items():
+                results[key] += count
+
+            if response.status_code != 200:
+                # The server is unlikely to accept the remaining batches either
+                self._release_push_batch(next_batch)
+                break
+
+            batch = next_batch
+
+        return results
+
+    def _claim_push_batch(self) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """Select the next batch of pending or due-for-retry changes and mark it as syncing.
+
+        Returns (change_id, retry_count, change) tuples. A batch holds at most
+        ``push_batch_size`` changes and ``push_batch_bytes`` of payload, but
+        always at least one change.
+
+        A change waits while an earlier change to the same entity is failed,
+        in flight or in conflict: payloads are full snapshots, so sending it
+        first would let the earlier one overwrite it on the server.
+        """
+        cursor = self.connections.execute(
+            """
+            SELECT id, entity_type, entity_id, operation_type, data, retry_count, status
+            FROM sync_outbox AS change
+            WHERE (status = ? OR (status = ? AND next_attempt_at <= ?))
+              AND NOT EXISTS (
+                  SELECT 1 FROM sync_outbox AS earlier
+                  WHERE earlier.entity_type = change.entity_type
+                    AND earlier.entity_id = change.entity_id
+                    AND earlier.created_at < change.created_at
+                    AND earlier.status IN (?, ?, ?)
+              )
+            ORDER BY created_at LIMIT ?
+            """,
+            (
+                SyncStatus.PENDING.value,
+                SyncStatus.ERROR.value,
+                datetime.now().isoformat(),
+                SyncStatus.ERROR.value,
+                SyncStatus.SYNCING.value,
+                SyncStatus.CONFLICT.value,
+                self.push_batch_size,
+            ),
+        )
+
+        batch = []
+        statuses = {}
+        batch_bytes = 0
+        for row in cursor.fetchall():
+            size = len(row["data"] or "")
+            if batch and batch_bytes + size > self.push_batch_bytes:
+                break
+            batch_bytes += size
+            statuses[row["id"]] = row["status"]
+
             # Prepare change data for API
-            entity_type = change_dict["entity_type"]
-            operation = change_dict["operation_type"]
-            entity_id = change_dict["entity_id"]
-            data = json.loads(change_dict["data"] or "{}")
-            
-            changes_to_push.append({
-                "entity_type": entity_type,
-                "entity_id": entity_id,
-                "operation": operation,
-                "data": data
-            })
-        
-        conn.commit()
-        
-        # Push changes to server using the sync API
-        try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {self.auth_token}",
-                    "Content-Type": "application/json",
+            batch.append((
+                row["id"],
+                row["retry_count"] or 0,
+                {
+                    "entity_type": row["entity_type"],
+                    "entity_id": row["entity_id"],
+                    "operation": row["operation_type"],
+                    "data": json.loads(row["data"] or "{}"),
+                },
+            ))
+
+        if batch:
+            # {change_id: status it was selected with}
+            selected = json.dumps({change_id: statuses[change_id] for change_id, _, _ in batch})
+            with self.connections.transaction() as conn:
+                # One statement for the whole batch. Changes whose status moved
+                # since they were selected (e.g. requeued or deleted) are
+                # skipped, so each is counted exactly once
+                claimed_ids = {
+                    row[0]
+                    for row in conn.execute(
+                        """
+                        UPDATE sync_outbox SET status = ?, updated_at = ?
+                        WHERE id IN (SELECT key FROM json_each(?))
+                          AND status = (SELECT value FROM json_each(?) WHERE key = sync_outbox.id)
+                        RETURNING id
+                        """,
+                        (SyncStatus.SYNCING.value, datetime.now().isoformat(), selected, selected),
+                    )
                 }
-                
-                response = await client.post(
-                    f"{self.api_url}/api/v1/sync/push",
-                    json={"changes": changes_to_push},
-                    headers=headers
+                batch = [item for item in batch if item[0] in claimed_ids]
+                self._record_status_changes(
+                    (change_id, statuses[change_id], SyncStatus.SYNCING.value)
+                    for change_id, _, _ in batch
                 )
-                
-                if response.status_code == 200:
-                    result_data = response.json()
-                    processed_changes = result_data.get("processed", [])
-                    
-                    # Update status for each change based on server response
-                    for i, change_result in enumerate(processed_changes):
-                        if i < len(change_ids):
-                            change_id = change_ids[i]
-                            success = change_result.get("success", False)
-                            error = change_result.get("error")
-                            
-                            if success:
-                                cursor.execute(
-                                    "UPDATE sync_outbox SET status = ?, updated_at = ? WHERE id = ?",
-                                    (
-                                        SyncStatus.SYNCED.value,
-                                        datetime.now().isoformat(),
-                                        change_id,
-                                    ),
-                                )
-                                results["success"] += 1
-                            else:
-                                error_message = error or "Unknown error during sync"
-                                if "conflict" in error_message.lower():
-                                    status = SyncStatus.CONFLICT.value
-                                    results["conflict"] += 1
-                                else:
-                                    status = SyncStatus.ERROR.value
-                                    results["error"] += 1
-                                    
-                                cursor.execute(
-                                    "UPDATE sync_outbox SET status = ?, error_message = ?, updated_at = ?, retry_count = retry_count + 1 WHERE id = ?",
-                                    (
-                                        status,
-                                        error_message,
-                                        datetime.now().isoformat(),
-                                        change_id,
-                                    ),
-                                )
-                else:
-                    # If the entire request failed, mark all as error
-                    for change_id in change_ids:
-                        cursor.execute(
-                            "UPDATE sync_outbox SET status = ?, error_message = ?, updated_at = ?, retry_count = retry_count + 1 WHERE id = ?",
-                            (
-                                SyncStatus.ERROR.value,
-                                f"API Error: {response.status_code} - {response.text}",
-                                datetime.now().isoformat(),
-                                change_id,
-                            ),
-                        )
-                    results["error"] += len(change_ids)
-                    
-        except Exception as e:
-            # If there was an exception, mark all as error
-            for change_id in change_ids:
-                cursor.execute(
-                    "UPDATE sync_outbox SET status = ?, error_message = ?, updated_at = ?, retry_count = retry_count + 1 WHERE id = ?",
-                    (
-                        SyncStatus.ERROR.value,
-                        str(e),
-                        datetime.now().isoformat(),
-                        change_id,
-                    ),
+
+        return batch
+
+    def _release_push_batch(self, batch: List[Tuple[str, int, Dict[str, Any]]]) -> None:
+        """Return a claimed but unsent batch to pending."""
+        if not batch:
+            return
+        now = datetime.now().isoformat()
+        with self.connections.transaction() as conn:
+            conn.executemany(
+                "UPDATE sync_outbox SET status = ?, updated_at = ? WHERE id = ?",
+                [(SyncStatus.PENDING.value, now, change_id) for change_id, _, _ in batch],
+            )
+            self._record_status_changes(
+                (change_id, SyncStatus.SYNCING.value, SyncStatus.PENDING.value)
+                for change_id, _, _ in batch
+            )
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Return the jittered exponential backoff in seconds before retry ``attempt`` (1-based)."""
+        delay = min(
+            self.retry_max_delay,
+            self.retry_base_delay * (self.retry_backoff ** (attempt - 1)),
+        )
+        # Equal jitter: keep half the delay, randomize the rest
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _failure_update(
+        self, change_id: str, retry_count: int, error_message: str, now: datetime
+    ) -> Tuple[str, Optional[str], str, int, Optional[str], str]:
+        """Build the status update for a failed change: retry later or dead-letter it."""
+        attempt = retry_count + 1
+        if attempt >= self.retry_attempts:
+            logger.warning(f"Change {change_id} failed {attempt} times, moving to dead letter")
+            return (SyncStatus.DEAD_LETTER.value, error_message, now.isoformat(), 1, None, change_id)
+
+        next_attempt_at = now + timedelta(seconds=self._retry_delay(attempt))
+        return (
+            SyncStatus.ERROR.value,
+            error_message,
+            now.isoformat(),
+            1,
+            next_attempt_at.isoformat(),
+            change_id,
+        )
+
+    def _record_push_failure(
+        self, batch: List[Tuple[str, int, Dict[str, Any]]], error_message: str
+    ) -> None:
+        """Schedule a retry for every change of a failed batch."""
+        now = datetime.now()
+        self._update_change_statuses(
+            [
+                self._failure_update(change_id, retry_count, error_message, now)
+                for change_id, retry_count, _ in batch
+            ]
+        )
+
+    def _record_push_response(
+        self, batch: List[Tuple[str, int, Dict[str, Any]]], response: httpx.Response
+    ) -> Dict[str, int]:
+        """Update the status of a pushed batch from the server response."""
+        results = {"success": 0, "error": 0, "conflict": 0}
+
+        if response.status_code != 200:
+            # If the entire request failed, retry the whole batch later
+            logger.error(f"Error pushing changes: {response.status_code} - {response.text}")
+            self._record_push_failure(
+                batch, f"API Error: {response.status_code} - {response.text}"
+            )
+            results["error"] += len(batch)
+            return results
+
+        processed_changes = response.json().get("processed", [])
+        now = datetime.now()
+        updates = []
+
+        # Update status for each change based on server response
+        for i, (change_id, retry_count, _) in enumerate(batch):
+            change_result = processed_changes[i] if i < len(processed_changes) else {
+                "success": False,
+                "error": "No result returned by server",
+            }
+
+            if change_result.get("success", False):
+                updates.append((SyncStatus.SYNCED.value, None, now.isoformat(), 0, None, change_id))
+                results["success"] += 1
+                continue
+
+            error_message = change_result.get("error") or "Unknown error during sync"
+            if "conflict" in error_message.lower():
+                updates.append(
+                    (SyncStatus.CONFLICT.value, error_message, now.isoformat(), 1, None, change_id)
                 )
-            results["error"] += len(change_ids)
-            logger.error(f"Error pushing changes: {e}")
+                results["conflict"] += 1
+            else:
+                updates.append(self._failure_update(change_id, retry_count, error_message, now))
+                results["error"] += 1
 
-        conn.commit()
-        conn.close()
+        self._update_change_statuses(updates)
         return results
 
+    def _update_change_statuses(
+        self, updates: List[Tuple[str, Optional[str], str, int, Optional[str], str]]
+    ) -> None:
+        """Apply (status, error_message, updated_at, retry_increment, next_attempt_at, id) updates in one statement.
+
+        The changes must have been claimed for a push, i.e. be syncing.
+        """
+        with self.connections.transaction() as conn:
+            conn.executemany(
+                """
+                UPDATE sync_outbox
+                SET status = ?, error_message = ?, updated_at = ?,
+                    retry_count = retry_count + ?, next_attempt_at = ?
+                WHERE id = ?
+                """,
+                updates,
+            )
+            self._record_status_changes(
+                (update[5], SyncStatus.SYNCING.value, update[0]) for update in updates
+            )
+            self.connections.on_commit(self._bump_data_version)
+
     async def _pull_changes(self) -> Dict[str, int]:
-        """Pull remote changes from the server using the sync API."""
+        """Pull remote changes from the server using the sync API.
+
+        Fetches every change since the last pull from ``GET /sync/pull`` and
+        applies the latest change per entity. The pull cursor is the newest
+        ``updated_at`` the server returned, so it is in server time, and it
+        only advances once every change has been applied; after a failure
+        the same changes are pulled again, which is harmless.
+        """
         if not self.auth_token:
             return {"error": "No authentication token"}
 
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        results = {"users": 0, "patients": 0, "clinical_notes": 0, "appointments": 0, "error": 0}
 
-        # Get last sync times for each entity type
-        cursor.execute("SELECT * FROM sync_metadata")
-        sync_metadata = {row["entity_type"]: row["last_sync_time"] for row in cursor.fetchall()}
+        # The server returns every entity type in one response, so all types
+        # share the oldest cursor
+        since = self.connections.execute(
+            "SELECT MIN(COALESCE(last_sync_time, '')) FROM sync_metadata"
+        ).fetchone()[0] or PULL_EPOCH
 
-        results = {"users": 0, "patients": 0, "clinical_notes": 0, "appointments": 0, "error": 0}
+        try:
+            response = await self.http.async_client.get(
+                f"{self.api_url}/api/v1/sync/pull",
+                params={"since": since},
+                headers={"Authorization": f"Bearer {self.auth_token}", "Accept-Encoding": "gzip"},
+            )
+            if response.status_code != 200:
+                logger.error(f"Error pulling changes: {response.status_code} - {response.text}")
+                results["error"] = 1
+                return results
 
-        # Prepare the sync request payload with last sync times
-        sync_request = {}
-        for entity_type, last_sync_time in sync_metadata.items():
-            if last_sync_time:
-                sync_request[entity_type] = {"updated_after": last_sync_time}
-            else:
-                sync_request[entity_type] = {}
+            changes = response.json().get("changes", [])
+
+            # Changes come oldest first; keep the latest per entity
+            latest: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for change in changes:
+                table = REMOTE_ENTITY_TABLES.get(change.get("entity_type"))
+                if table is None:
+                    logger.warning(f"Received change for unknown entity type {change.get('entity_type')}, skipping")
+                    continue
+                latest.setdefault(table, {})[change["entity_id"]] = change
 
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
-        endpoint = f"{self.api_url}/sync/pull"
+            for table, by_id in latest.items():
+                upserts, deletes = [], []
+                for entity_id, change in by_id.items():
+                    entity_id = _remote_id(entity_id)
+                    if change["operation"] == OperationType.DELETE.value:
+                        deletes.append(entity_id)
+                    else:
+                        upserts.append({**(change.get("payload") or {}), "id": entity_id})
+                results[table] = await self._process_pulled_data(table, upserts)
+                results[table] += self._process_pulled_deletes(table, deletes)
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(endpoint, json=sync_request, headers=headers)
-                
-                if response.status_code == 200:
-                    sync_data = response.json()
-                    
-                    # Process each entity type's data
-                    for entity_type, data in sync_data.items():
-                        if entity_type in results:
-                            count = await self._process_pulled_data(entity_type, data)
-                            results[entity_type] = count
-                            
-                            # Update last sync time
-                            cursor.execute(
-                                "UPDATE sync_metadata SET last_sync_time = ? WHERE entity_type = ?",
-                                (datetime.now().isoformat(), entity_type),
-                            )
-                    
-                    conn.commit()
-                else:
-                    logger.error(f"Error pulling changes: {response.status_code} - {response.text}")
-                    results["error"] = 1
+            newest = max((c["updated_at"] for c in changes if c.get("updated_at")), default=None)
+            if newest:
+                self.connections.execute("UPDATE sync_metadata SET last_sync_time = ?", (newest,))
         except Exception as e:
             logger.error(f"Error pulling changes: {e}")
             results["error"] = 1
 
-        conn.close()
         return results
 
     async def _process_pulled_data(self, entity_type: str, data: List[Dict[str, Any]]) -> int:
-        """Process pulled data and update local database."""
+        """Process pulled data and update local database.
+
+        Items are upserted with ``INSERT ... ON CONFLICT(id) DO UPDATE`` in
+        pages of ``pull_page_size``, one transaction and one executemany per
+        page, yielding to the event loop between pages. A page that fails to
+        apply is rolled back and the error raised.
+        """
         if not data:
             return 0
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+
+        if entity_type not in SYNCED_TABLES:
+            logger.warning(f"Received data for unknown entity type {entity_type}, skipping")
+            return 0
+
+        columns = self._get_table_columns(entity_type)
         count = 0
-        
-        try:
-            # Get the table name from entity_type (remove trailing 's' if present)
-            table_name = entity_type[:-1] if entity_type.endswith('s') else entity_type
-            
-            for item in data:
-                item_id = item.get('id')
+        start = time.perf_counter()
+
+        for page_start in range(0, len(data), self.pull_page_size):
+            page = data[page_start:page_start + self.pull_page_size]
+            now = datetime.now().isoformat()
+
+            # Items may carry different field subsets; upsert each shape separately
+            rows_by_columns: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+            page_ids = []
+            for item in page:
+                item_id = item.get("id")
                 if not item_id:
                     logger.warning(f"Received {entity_type} item without ID, skipping")
                     continue
-                    
-                # Check if the item already exists
-                cursor.execute(f"SELECT id FROM {table_name} WHERE id = ?", (item_id,))
-                exists = cursor.fetchone() is not None
-                
-                # Get the columns for this table
-                cursor.execute(f"PRAGMA table_info({table_name})")
-                columns = [row[1] for row in cursor.fetchall() if row[1] != 'id']
-                
-                # Filter the item data to only include columns that exist in the table
-                filtered_data = {k: v for k, v in item.items() if k in columns}
-                
-                if exists:
-                    # Update existing item
-                    set_clause = ", ".join([f"{col} = ?" for col in filtered_data.keys()])
-                    values = list(filtered_data.values())
-                    
-                    if set_clause:  # Only update if there are fields to update
-                        query = f"UPDATE {table_name} SET {set_clause}, last_synced_at = ? WHERE id = ?"
-                        values.append(datetime.now().isoformat())
-                        values.append(item_id)
-                        cursor.execute(query, values)
-                else:
-                    # Insert new item
-                    columns_str = ", ".join(['id'] + list(filtered_data.keys()) + ['last_synced_at'])
-                    placeholders = ", ".join(['?'] * (len(filtered_data) + 2))  # +2 for id and last_synced_at
-                    
-                    query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
-                    values = [item_id] + list(filtered_data.values()) + [datetime.now().isoformat()]
-                    cursor.execute(query, values)
-                
-                count += 1
-                
-            conn.commit()
-        except Exception as e:
-            logger.error(f"Error processing pulled data for {entity_type}: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
-            
+
+                # Only include fields that exist in the table
+                present = tuple(col for col in columns if col in item)
+                rows_by_columns.setdefault(present, []).append(
+                    (item_id, *(_to_sql_value(item[col]) for col in present), now)
+                )
+                page_ids.append(item_id)
+
+            try:
+                with self.connections.transaction() as conn:
+                    # Which rows already exist decides create vs. update events
+                    existing = {
+                        row[0]
+                        for row in conn.execute(
+                            f"SELECT id FROM {entity_type} WHERE id IN (SELECT value FROM json_each(?))",
+                            (json.dumps(page_ids),),
+                        )
+                    }
+                    for present, rows in rows_by_columns.items():
+                        conn.executemany(self._upsert_sql(entity_type, present), rows)
+                        count += len(rows)
+                    self.connections.on_commit(self._bump_data_version)
+                    self.connections.on_commit(
+                        partial(self._publish_pulled, entity_type, page_ids, existing)
+                    )
+            except Exception as e:
+                logger.error(f"Error processing pulled data for {entity_type}: {e}")
+                raise
+
+            # Let the UI and other tasks run between pages
+            await asyncio.sleep(0)
+
+        elapsed = time.perf_counter() - start
+        if count:
+            logger.info(
+                f"Applied {count} pulled {entity_type} in {elapsed:.2f}s "
+                f"({count / max(elapsed, 1e-9):.0f} rows/s)"
+            )
         return count
 
+    def _process_pulled_deletes(self, entity_type: str, ids: List[Any]) -> int:
+        """Delete rows deleted on the server and publish the deletion once committed."""
+        if not ids:
+            return 0
+
+        with self.connections.transaction() as conn:
+            deleted = [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT id FROM {entity_type} WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(ids),),
+                )
+            ]
+            if deleted:
+                conn.execute(
+                    f"DELETE FROM {entity_type} WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(deleted),),
+                )
+                self.connections.on_commit(self._bump_data_version)
+                self.connections.on_commit(
+                    partial(
+                        self.events.publish, entity_type, deleted, OperationType.DELETE.value, source="remote"
+                    )
+                )
+        return len(deleted)
+
+    def _publish_pulled(self, entity_type: str, ids: List[Any], existing: set) -> None:
+        """Publish create and update events for a committed page of pulled rows."""
+        created = [item_id for item_id in ids if item_id not in existing]
+        updated = [item_id for item_id in ids if item_id in existing]
+        if created:
+            self.events.publish(entity_type, created, OperationType.CREATE.value, source="remote")
+        if updated:
+            self.events.publish(entity_type, updated, OperationType.UPDATE.value, source="remote")
+
+    def _get_table_columns(self, table_name: str) -> List[str]:
+        """Get a synced table's writable columns (excluding id and last_synced_at), cached."""
+        if table_name not in self._table_columns:
+            cursor = self.connections.execute(f"PRAGMA table_info({table_name})")
+            self._table_columns[table_name] = [
+                row["name"] for row in cursor.fetchall()
+                if row["name"] not in ("id", "last_synced_at")
+            ]
+        return self._table_columns[table_name]
+
+    @staticmethod
+    def _upsert_sql(table_name: str, columns: Tuple[str, ...]) -> str:
+        """Build the upsert statement for a table and column set."""
+        insert_columns = ["id", *columns, "last_synced_at"]
+        placeholders = ", ".join(["?"] * len(insert_columns))
+        assignments = ", ".join(
+            f"{col} = excluded.{col}" for col in (*columns, "last_synced_at")
+        )
+        return (
+            f"INSERT INTO {table_name} ({', '.join(insert_columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(id) DO UPDATE SET {assignments}"
+        )
+
     def queue_change(
         self,
         entity_type: str,
@@ -405,133 +836,254 @@ class SyncManager:
         entity_id: Optional[int] = None,
         data: Optional[Dict[str, Any]] = None,
     ) -> str:
-        """Queue a local change for synchronization."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Queue a local change for synchronization.
 
+        A change to an entity that still has an unsent pending change is
+        merged into that row (see ``_coalesce_change``). Joins the caller's
+        transaction when called inside ``transaction()``; listeners are
+        notified and a push requested only once that transaction commits.
+        """
         change_id = str(uuid.uuid4())
         idempotency_key = str(uuid.uuid4())
         now = datetime.now().isoformat()
 
-        # For create operations, entity_id might be None (server will assign)
-        # In this case, use a temporary negative ID
-        if operation_type == OperationType.CREATE and entity_id is None:
-            # Get the next negative ID to use as a temporary ID
-            cursor.execute(
-                "SELECT MIN(entity_id) FROM sync_outbox WHERE entity_type = ? AND entity_id < 0",
-                (entity_type,),
-            )
-            result = cursor.fetchone()
-            entity_id = -1 if result[0] is None else result[0] - 1
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+
+            # For create operations, entity_id might be None (server will assign)
+            # In this case, use a temporary negative ID
+            merged_id = None
+            if operation_type == OperationType.CREATE and entity_id is None:
+                entity_id = self._allocate_temp_id(cursor, entity_type)
+            else:
+                merged_id = self._coalesce_change(
+                    cursor, entity_type, entity_id, operation_type, data, now
+                )
+
+            if merged_id:
+                change_id = merged_id
+            else:
+                cursor.execute(
+                    """
+                    INSERT INTO sync_outbox (
+                        id, entity_type, entity_id, operation_type, data, status,
+                        created_at, updated_at, idempotency_key
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        change_id,
+                        entity_type,
+                        entity_id,
+                        operation_type.value,
+                        json.dumps(data) if data else None,
+                        SyncStatus.PENDING.value,
+                        now,
+                        now,
+                        idempotency_key,
+                    ),
+                )
+                self._record_status_changes([(change_id, None, SyncStatus.PENDING.value)])
+
+            def committed() -> None:
+                self._bump_data_version()
+                self.events.publish(entity_type, [entity_id], operation_type.value)
+                # If we're online, push the change soon
+                if self.is_online:
+                    self.request_sync(push=True, pull=False)
+
+            # Joined transactions may still roll back, taking the change with them
+            self.connections.on_commit(committed)
+
+        return change_id
+
+    def _coalesce_change(
+        self,
+        cursor: sqlite3.Cursor,
+        entity_type: str,
+        entity_id: int,
+        operation_type: OperationType,
+        data: Optional[Dict[str, Any]],
+        now: str,
+    ) -> Optional[str]:
+        """Merge a change into the entity's latest unsent change where that is safe.
 
+        Only a latest change that is still pending (not in flight, failed or
+        in conflict) is merged into, so the row keeps its idempotency key:
+
+        - update after update: one update with the merged payload
+        - update after create: the create with the merged payload
+        - delete after create: both dropped, the server never sees the entity
+        - delete after update: the update replaced by the delete
+
+        Returns the ID of the row the change was merged into, or None if the
+        change must be queued as a new row.
+        """
         cursor.execute(
             """
-            INSERT INTO sync_outbox (
-                id, entity_type, entity_id, operation_type, data, status,
-                created_at, updated_at, idempotency_key
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            SELECT id, operation_type, data, status FROM sync_outbox
+            WHERE entity_type = ? AND entity_id = ? AND status IN (?, ?, ?, ?)
+            ORDER BY created_at DESC LIMIT 1
             """,
             (
-                change_id,
                 entity_type,
                 entity_id,
-                operation_type.value,
-                json.dumps(data) if data else None,
                 SyncStatus.PENDING.value,
-                now,
-                now,
-                idempotency_key,
+                SyncStatus.SYNCING.value,
+                SyncStatus.ERROR.value,
+                SyncStatus.CONFLICT.value,
             ),
         )
+        latest = cursor.fetchone()
+        if not latest or latest["status"] != SyncStatus.PENDING.value:
+            return None
 
-        conn.commit()
-        conn.close()
+        latest_operation = latest["operation_type"]
 
-        # If we're online, trigger a sync
-        if self.is_online:
-            asyncio.create_task(self.sync())
+        if operation_type == OperationType.UPDATE and latest_operation in (
+            OperationType.CREATE.value,
+            OperationType.UPDATE.value,
+        ):
+            merged = {**json.loads(latest["data"] or "{}"), **(data or {})}
+            cursor.execute(
+                "UPDATE sync_outbox SET data = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(merged), now, latest["id"]),
+            )
+            return latest["id"]
 
-        return change_id
+        if operation_type == OperationType.DELETE:
+            if latest_operation == OperationType.CREATE.value:
+                cursor.execute("DELETE FROM sync_outbox WHERE id = ?", (latest["id"],))
+                self._record_status_changes([(latest["id"], SyncStatus.PENDING.value, None)])
+                return latest["id"]
+            if latest_operation == OperationType.UPDATE.value:
+                cursor.execute(
+                    "UPDATE sync_outbox SET operation_type = ?, data = ?, updated_at = ? WHERE id = ?",
+                    (OperationType.DELETE.value, json.dumps(data) if data else None, now, latest["id"]),
+                )
+                return latest["id"]
 
-    def get_pending_changes(self) -> List[Dict[str, Any]]:
-        """Get all pending changes that haven't been synced."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        return None
 
+    def _allocate_temp_id(self, cursor: sqlite3.Cursor, entity_type: str) -> int:
+        """Allocate the next temporary negative ID for an entity type."""
+        cursor.execute(
+            "INSERT OR IGNORE INTO sync_temp_ids (entity_type, next_id) VALUES (?, -1)",
+            (entity_type,),
+        )
+        cursor.execute(
+            "SELECT next_id FROM sync_temp_ids WHERE entity_type = ?", (entity_type,)
+        )
+        temp_id = cursor.fetchone()[0]
         cursor.execute(
+            "UPDATE sync_temp_ids SET next_id = next_id - 1 WHERE entity_type = ?",
+            (entity_type,),
+        )
+        return temp_id
+
+    def get_pending_changes(self) -> List[Dict[str, Any]]:
+        """Get all pending changes that haven't been synced."""
+        cursor = self.connections.execute(
             "SELECT * FROM sync_outbox WHERE status IN (?, ?) ORDER BY created_at",
             (SyncStatus.PENDING.value, SyncStatus.ERROR.value),
         )
-        changes = [dict(row) for row in cursor.fetchall()]
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_dead_letter_changes(self) -> List[Dict[str, Any]]:
+        """Get all changes that exhausted their retry attempts."""
+        cursor = self.connections.execute(
+            "SELECT * FROM sync_outbox WHERE status = ? ORDER BY created_at",
+            (SyncStatus.DEAD_LETTER.value,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
 
-        conn.close()
-        return changes
+    def requeue_change(self, change_id: str) -> None:
+        """Give a dead-lettered or failed change a fresh set of retry attempts."""
+        with self.connections.transaction() as conn:
+            row = conn.execute(
+                "SELECT status FROM sync_outbox WHERE id = ? AND status IN (?, ?)",
+                (change_id, SyncStatus.ERROR.value, SyncStatus.DEAD_LETTER.value),
+            ).fetchone()
+            if row is None:
+                return
+            conn.execute(
+                """
+                UPDATE sync_outbox
+                SET status = ?, retry_count = 0, next_attempt_at = NULL, updated_at = ?
+                WHERE id = ?
+                """,
+                (SyncStatus.PENDING.value, datetime.now().isoformat(), change_id),
+            )
+            self._record_status_changes([(change_id, row["status"], SyncStatus.PENDING.value)])
+            self.connections.on_commit(self._bump_data_version)
+
+        # If we're online, push the change soon
+        if self.is_online:
+            self.request_sync(push=True, pull=False)
 
     def get_conflicts(self) -> List[Dict[str, Any]]:
         """Get all changes that resulted in conflicts."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute(
+        cursor = self.connections.execute(
             "SELECT * FROM sync_outbox WHERE status = ? ORDER BY created_at",
             (SyncStatus.CONFLICT.value,),
         )
-        conflicts = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
-        return conflicts
+        return [dict(row) for row in cursor.fetchall()]
 
     def resolve_conflict(
         self, change_id: str, resolution: str, updated_data: Optional[Dict[str, Any]] = None
     ) -> None:
         """Resolve a conflict with the given resolution strategy."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if resolution == "merge" and not updated_data:
+            raise ValueError("Merged data must be provided for merge resolution")
 
-        if resolution == "local_wins":
-            # Keep local changes and retry
-            cursor.execute(
-                "UPDATE sync_outbox SET status = ?, updated_at = ?, data = ? WHERE id = ?",
-                (
-                    SyncStatus.PENDING.value,
-                    datetime.now().isoformat(),
-                    json.dumps(updated_data) if updated_data else None,
-                    change_id,
-                ),
-            )
-        elif resolution == "server_wins":
-            # Accept server version and discard local changes
-            cursor.execute(
-                "UPDATE sync_outbox SET status = ?, updated_at = ? WHERE id = ?",
-                (SyncStatus.SYNCED.value, datetime.now().isoformat(), change_id),
-            )
-        elif resolution == "merge":
-            # Apply merged data
-            if not updated_data:
-                raise ValueError("Merged data must be provided for merge resolution")
-            cursor.execute(
-                "UPDATE sync_outbox SET status = ?, updated_at = ?, data = ? WHERE id = ?",
-                (
-                    SyncStatus.PENDING.value,
-                    datetime.now().isoformat(),
-                    json.dumps(updated_data),
-                    change_id,
-                ),
-            )
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            row = cursor.execute(
+                "SELECT status FROM sync_outbox WHERE id = ?", (change_id,)
+            ).fetchone()
+            new_status = None
 
-        conn.commit()
-        conn.close()
+            if resolution == "local_wins":
+                # Keep local changes and retry
+                new_status = SyncStatus.PENDING.value
+                cursor.execute(
+                    "UPDATE sync_outbox SET status = ?, updated_at = ?, data = ? WHERE id = ?",
+                    (
+                        new_status,
+                        datetime.now().isoformat(),
+                        json.dumps(updated_data) if updated_data else None,
+                        change_id,
+                    ),
+                )
+            elif resolution == "server_wins":
+                # Accept server version and discard local changes
+                new_status = SyncStatus.SYNCED.value
+                cursor.execute(
+                    "UPDATE sync_outbox SET status = ?, updated_at = ? WHERE id = ?",
+                    (new_status, datetime.now().isoformat(), change_id),
+                )
+            elif resolution == "merge":
+                # Apply merged data
+                new_status = SyncStatus.PENDING.value
+                cursor.execute(
+                    "UPDATE sync_outbox SET status = ?, updated_at = ?, data = ? WHERE id = ?",
+                    (
+                        new_status,
+                        datetime.now().isoformat(),
+                        json.dumps(updated_data),
+                        change_id,
+                    ),
+                )
 
-        # If we're online, trigger a sync
+            if row is not None and new_status is not None:
+                self._record_status_changes([(change_id, row["status"], new_status)])
+            self.connections.on_commit(self._bump_data_version)
+
+        # If we're online, push the change soon
         if self.is_online:
-            asyncio.create_task(self.sync())
+            self.request_sync(push=True, pull=False)
 
     def clear_synced_changes(self, older_than_days: int = 7) -> int:
         """Clear successfully synced changes older than the specified days."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
 
         # Calculate cutoff date
         cutoff_date = (
@@ -542,25 +1094,23 @@ class SyncManager:
         )
         cutoff_date_str = datetime.fromtimestamp(cutoff_date).isoformat()
 
-        cursor.execute(
+        cursor = self.connections.execute(
             "DELETE FROM sync_outbox WHERE status = ? AND updated_at < ?",
             (SyncStatus.SYNCED.value, cutoff_date_str),
         )
-        deleted_count = cursor.rowcount
-
-        conn.commit()
-        conn.close()
-
-        return deleted_count
+        return cursor.rowcount
 
     def reset_sync_state(self) -> None:
         """Reset the sync state (for testing or recovery)."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Clear all sync data
-        cursor.execute("DELETE FROM sync_outbox")
-        cursor.execute("UPDATE sync_metadata SET last_sync_time = NULL")
+        with self.connections.transaction() as conn:
+            # Clear all sync data
+            conn.execute("DELETE FROM sync_outbox")
+            conn.execute("DELETE FROM sync_temp_ids")
+            conn.execute("UPDATE sync_metadata SET last_sync_time = NULL")
+            self.connections.on_commit(self._reset_outbox_counts)
+            self.connections.on_commit(self._bump_data_version)
 
-        conn.commit()
-        conn.close()
\ No newline at end of file
+    def _reset_outbox_counts(self) -> None:
+        with self._outbox_counts_lock:
+            self._outbox_counts = dict.fromkeys(COUNTED_STATUSES, 0)
+        self.events.publish("sync_outbox", [], "status")
\ No newline at end of file
@@ -0,0 +1,73 @@
+import logging
+import queue
+from typing import Callable, Iterable, List, Optional
+
+from app.sync.events import ChangeEvent, EventBus
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeDispatcher:
+    """Delivers change events from the event bus to widgets on the Tk thread.
+
+    Events can be published from sync and worker threads, where Tk must not
+    be touched, so the dispatcher queues them and drains the queue from an
+    ``after()`` callback. Each subscriber receives the events of one drain
+    as a single batch, so a sync pass that pulls several pages patches a
+    view once rather than once per page.
+    """
+
+    def __init__(self, widget, bus: EventBus, interval: int = 100):
+        self.widget = widget
+        self.interval = interval
+        self._events: "queue.Queue[ChangeEvent]" = queue.Queue()
+        self._subscribers: List[tuple] = []
+        self._unsubscribe = bus.subscribe(self._events.put)
+        self._poll_id = self.widget.after(self.interval, self._poll)
+
+    def subscribe(
+        self,
+        widget,
+        callback: Callable[[List[ChangeEvent]], None],
+        entity_types: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Call ``callback`` with batches of events until ``widget`` is destroyed."""
+        self._subscribers.append(
+            (widget, callback, frozenset(entity_types) if entity_types is not None else None)
+        )
+
+    def close(self) -> None:
+        """Stop receiving events from the bus."""
+        self._unsubscribe()
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+
+    def _poll(self) -> None:
+        self._poll_id = None
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+
+        if events:
+            self._dispatch(events)
+        self._poll_id = self.widget.after(self.interval, self._poll)
+
+    def _dispatch(self, events: List[ChangeEvent]) -> None:
+        # Forget subscribers whose widgets have been destroyed
+        self._subscribers = [s for s in self._subscribers if s[0].winfo_exists()]
+
+        for _, callback, entity_types in self._subscribers:
+            batch = [
+                event for event in events
+                if entity_types is None or event["entity_type"] in entity_types
+            ]
+            if not batch:
+                continue
+            try:
+                callback(batch)
+            except Exception as e:
+                logger.error(f"Error handling change events: {e}")
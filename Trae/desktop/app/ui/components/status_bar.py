@@ -2,11 +2,13 @@ import asyncio
 import logging
 import tkinter as tk
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 import customtkinter as ctk
 
 from app.app import EiraApp
+from app.sync.sync_manager import SyncStatus
+from app.ui.change_dispatcher import ChangeDispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +16,7 @@ logger = logging.getLogger(__name__)
 class StatusBar(ctk.CTkFrame):
     """Status bar for the Eira desktop application."""
 
-    def __init__(self, master, app: EiraApp):
+    def __init__(self, master, app: EiraApp, changes: Optional[ChangeDispatcher] = None):
         super().__init__(master, height=30)
         self.master = master
         self.app = app
@@ -75,26 +77,41 @@ class StatusBar(ctk.CTkFrame):
         self.update_network_status(self.app.network_manager.get_status())
         self.last_sync_time = None
 
-        # Set up periodic status updates
+        # Update when outbox changes move status or connectivity changes,
+        # rather than polling
         self.update_status()
+        if changes is not None:
+            changes.subscribe(self, self._on_status_events, ["sync_outbox", "network"])
+
+    def _on_status_events(self, events: List[Dict[str, Any]]):
+        if any(event["entity_type"] == "network" for event in events):
+            self.update_network_status(self.app.network_manager.get_status())
+        if any(event["entity_type"] == "sync_outbox" for event in events):
+            self.update_sync_message()
 
     def update_status(self):
-        """Update status periodically."""
-        # Update network status
+        """Update the network indicator and the outbox summary."""
         self.update_network_status(self.app.network_manager.get_status())
-
-        # Update pending changes count
-        pending_changes = self.app.db.get_pending_changes()
-        conflicts = self.app.db.get_conflicts()
+        self.update_sync_message()
+
+    def update_sync_message(self):
+        """Summarize unsynced changes; the counts are kept in memory by the sync manager."""
+        counts = self.app.db.get_outbox_counts()
+        conflicts = counts[SyncStatus.CONFLICT.value]
+        pending_changes = (
+            counts[SyncStatus.PENDING.value]
+            + counts[SyncStatus.SYNCING.value]
+            + counts[SyncStatus.ERROR.value]
+        )
 
         if conflicts:
             self.status_message.configure(
-                text=f"{len(conflicts)} sync conflicts need resolution",
+                text=f"{conflicts} sync conflicts need resolution",
                 text_color="red",
             )
         elif pending_changes:
             self.status_message.configure(
-                text=f"{len(pending_changes)} changes pending sync",
+                text=f"{pending_changes} changes pending sync",
                 text_color="orange",
             )
         else:
@@ -103,9 +120,6 @@ class StatusBar(ctk.CTkFrame):
                 text_color="green",
             )
 
-        # Schedule next update
-        self.after(5000, self.update_status)  # Update every 5 seconds
-
     def update_network_status(self, is_online: bool):
         """Update network status indicator."""
         if is_online:
@@ -0,0 +1,406 @@
+import logging
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import customtkinter as ctk
+
+from app.ui.data_loader import DataLoader
+
+logger = logging.getLogger(__name__)
+
+# Returned by VirtualTable._row while a row's page is being fetched
+LOADING: Dict[str, Any] = {}
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Table that only creates widgets for the rows that are on screen.
+
+    Building a frame, labels and buttons for every row of a large list takes
+    seconds and holds every widget in memory. This table keeps a pool of row
+    widgets just big enough to fill its height and, on scroll, rebinds them to
+    the rows that have come into view. Rows are fetched from ``fetch_page`` in
+    pages of ``page_size`` as they are needed, and the last few pages are
+    kept in memory. With a ``loader`` the count and pages are queried on a
+    worker thread and "Loading..." placeholders are shown until they arrive.
+
+    ``columns`` are dicts with ``title``, ``width`` and a ``text`` callable
+    mapping a row to its cell text, plus an optional ``color`` callable for
+    the text colour. ``actions`` are dicts with ``text``, ``width`` and a
+    ``command`` called with the row, plus optional ``fg_color``.
+    """
+
+    def __init__(
+        self,
+        master,
+        columns: List[Dict[str, Any]],
+        fetch_page: Callable[[int, int], List[Dict[str, Any]]],
+        count: Callable[[], int],
+        actions: Optional[List[Dict[str, Any]]] = None,
+        empty_text: str = "No rows found",
+        row_height: int = 34,
+        page_size: int = 100,
+        cached_pages: int = 8,
+        loader: Optional[DataLoader] = None,
+    ):
+        super().__init__(master, fg_color="transparent")
+        self.columns = columns
+        self.actions = actions or []
+        self.fetch_page = fetch_page
+        self.count = count
+        self.row_height = row_height
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        self.loader = loader
+        self.empty_text = empty_text
+
+        self.total = 0
+        self.first_index = 0
+        self.visible_rows = 0
+        self._pages: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._row_widgets: List[Dict[str, Any]] = []
+        # Bumped by refresh so pages loaded for an older query are dropped
+        self._generation = 0
+        self._loading_pages = set()
+
+        # Configure grid layout
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        self._create_header()
+
+        # Rows are laid out in the body; the scrollbar is virtual and tracks
+        # first_index rather than a scrolled canvas
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=2, column=0, sticky="nsew")
+        self.body.grid_columnconfigure(0, weight=1)
+        # Size the body from the table, never from the rows it holds
+        self.body.grid_propagate(False)
+        self.body.bind("<Configure>", self._on_body_configure)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=2, column=1, sticky="ns")
+
+        self.empty_label = ctk.CTkLabel(
+            self.body,
+            text="Loading..." if loader else empty_text,
+            font=ctk.CTkFont(size=14),
+            text_color="gray",
+        )
+
+        # Route the mouse wheel to the table while the pointer is over it
+        self.bind("<Enter>", self._bind_mousewheel)
+        self.bind("<Leave>", self._unbind_mousewheel)
+
+    def _create_header(self):
+        """Create the header row and separator."""
+        header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        header_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=(5, 10))
+
+        titles = [(column["title"], column["width"]) for column in self.columns]
+        if self.actions:
+            titles.append(("Actions", sum(action["width"] + 5 for action in self.actions)))
+
+        for title, width in titles:
+            header_label = ctk.CTkLabel(
+                header_frame,
+                text=title,
+                font=ctk.CTkFont(size=14, weight="bold"),
+                width=width,
+                anchor="w",
+            )
+            header_label.pack(side="left", padx=5)
+
+        separator = ctk.CTkFrame(self, height=1, fg_color="gray")
+        separator.grid(row=1, column=0, columnspan=2, sticky="ew", padx=10, pady=5)
+
+    def _create_row_widgets(self, index: int) -> Dict[str, Any]:
+        """Create one pooled row."""
+        frame = ctk.CTkFrame(self.body, fg_color="transparent", height=self.row_height)
+        frame.grid(row=index, column=0, sticky="ew", padx=10)
+        frame.pack_propagate(False)
+
+        labels = []
+        for column in self.columns:
+            label = ctk.CTkLabel(
+                frame,
+                text="",
+                font=ctk.CTkFont(size=14),
+                width=column["width"],
+                anchor="w",
+            )
+            label.pack(side="left", padx=5)
+            labels.append(label)
+
+        buttons = []
+        for action in self.actions:
+            button = ctk.CTkButton(
+                frame,
+                text=action["text"],
+                width=action["width"],
+                height=24,
+                font=ctk.CTkFont(size=12),
+                fg_color=action.get("fg_color"),
+            )
+            button.pack(side="left", padx=(5, 0))
+            buttons.append(button)
+
+        return {"frame": frame, "labels": labels, "buttons": buttons}
+
+    def refresh(self):
+        """Re-count the rows, drop cached pages and redraw from the top."""
+        self._generation += 1
+        self._pages.clear()
+        self._loading_pages.clear()
+        self.first_index = 0
+
+        if self.loader is None:
+            try:
+                self.total = self.count()
+            except Exception as e:
+                logger.error(f"Error counting table rows: {e}")
+                self.total = 0
+            self.show_message(self.empty_text)
+            self._render()
+            return
+
+        # Count and fetch the first page together, showing a placeholder meanwhile
+        self.total = 0
+        self.show_message("Loading...")
+        self._render()
+
+        count, fetch_page, page_size = self.count, self.fetch_page, self.page_size
+        generation = self._generation
+        self.loader.load(
+            "table",
+            lambda: (count(), fetch_page(0, page_size)),
+            lambda result: self._on_refreshed(generation, *result),
+            self._on_load_error,
+        )
+
+    def _on_refreshed(self, generation: int, total: int, first_page: List[Dict[str, Any]]):
+        if generation != self._generation:
+            return
+        self.total = total
+        self._pages[0] = first_page
+        self.show_message(self.empty_text)
+        self._render()
+
+    def _on_load_error(self, error: Exception):
+        logger.error(f"Error loading table rows: {error}")
+        self.show_message(f"Error loading data: {error}", "red")
+
+    def show_message(self, text: str, text_color: str = "gray"):
+        """Set the text shown in place of rows while the table is empty."""
+        self.empty_label.configure(text=text, text_color=text_color)
+
+    def set_rows(self, rows: List[Dict[str, Any]]):
+        """Show an in-memory list of rows instead of paging from ``fetch_page``."""
+        self.fetch_page = lambda offset, limit: rows[offset : offset + limit]
+        self.count = lambda: len(rows)
+        self.refresh()
+
+    def invalidate(self):
+        """Re-count and reload the rows in view, keeping the scroll position.
+
+        With a loader the current rows stay on screen until the reloaded
+        ones arrive, so rows added or removed elsewhere don't cause a flash
+        of placeholders.
+        """
+        if self.loader is not None:
+            self._generation += 1
+            self._loading_pages.clear()
+            generation = self._generation
+
+            count, fetch_page, page_size = self.count, self.fetch_page, self.page_size
+            last_index = self.first_index + max(self.visible_rows, 1) - 1
+            page_indexes = range(self.first_index // page_size, last_index // page_size + 1)
+
+            def load():
+                return count(), [(i, fetch_page(i * page_size, page_size)) for i in page_indexes]
+
+            def on_done(result):
+                if generation != self._generation:
+                    return
+                self.total, pages = result
+                self._pages = OrderedDict(pages)
+                self.show_message(self.empty_text)
+                self._render()
+
+            self.loader.load("table", load, on_done, self._on_load_error)
+            return
+
+        self._pages.clear()
+        try:
+            self.total = self.count()
+        except Exception as e:
+            logger.error(f"Error counting table rows: {e}")
+        self._render()
+
+    def cached_rows(self, key: str = "id") -> Dict[Any, Dict[str, Any]]:
+        """Get the rows held in cached pages, by ``key``."""
+        return {row[key]: row for page in self._pages.values() for row in page}
+
+    def update_rows(self, rows: List[Dict[str, Any]], key: str = "id"):
+        """Replace cached rows with fresh copies matched by ``key`` and redraw.
+
+        Only rows in cached pages are touched; use ``invalidate`` when rows
+        were added, removed or moved in the sort order.
+        """
+        fresh = {row[key]: row for row in rows}
+        for page in self._pages.values():
+            for i, row in enumerate(page):
+                if row[key] in fresh:
+                    page[i] = fresh[row[key]]
+        self._render()
+
+    def _row(self, index: int) -> Optional[Dict[str, Any]]:
+        """Get a row by index, fetching its page if it is not cached."""
+        page_index = index // self.page_size
+        page = self._pages.get(page_index)
+        if page is None and self.loader is not None:
+            self._load_page(page_index)
+            return LOADING
+        if page is None:
+            try:
+                page = self.fetch_page(page_index * self.page_size, self.page_size)
+            except Exception as e:
+                logger.error(f"Error loading table page {page_index}: {e}")
+                page = []
+            self._pages[page_index] = page
+            while len(self._pages) > self.cached_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_index)
+
+        offset = index - page_index * self.page_size
+        return page[offset] if offset < len(page) else None
+
+    def _load_page(self, page_index: int):
+        """Fetch a page on a worker thread and redraw when it arrives."""
+        if page_index in self._loading_pages:
+            return
+        self._loading_pages.add(page_index)
+
+        fetch_page, page_size = self.fetch_page, self.page_size
+        generation = self._generation
+
+        def on_done(page: List[Dict[str, Any]]):
+            if generation != self._generation:
+                return
+            self._loading_pages.discard(page_index)
+            self._pages[page_index] = page
+            while len(self._pages) > self.cached_pages:
+                self._pages.popitem(last=False)
+            self._render()
+
+        def on_error(error: Exception):
+            logger.error(f"Error loading table page {page_index}: {error}")
+            on_done([])
+
+        self.loader.load(
+            ("page", generation, page_index),
+            lambda: fetch_page(page_index * page_size, page_size),
+            on_done,
+            on_error,
+        )
+
+    def _render(self):
+        """Bind the pooled rows to the rows currently in view."""
+        self.first_index = max(0, min(self.first_index, self.total - self.visible_rows))
+
+        if not self.total:
+            self.empty_label.grid(row=0, column=0, pady=20)
+        else:
+            self.empty_label.grid_remove()
+
+        for position, widgets in enumerate(self._row_widgets):
+            index = self.first_index + position
+            if position >= self.visible_rows or index >= self.total:
+                widgets["frame"].grid_remove()
+                continue
+
+            row = self._row(index)
+            if row is LOADING:
+                self._render_placeholder(widgets)
+                continue
+            if row is None:
+                widgets["frame"].grid_remove()
+                continue
+
+            for column, label in zip(self.columns, widgets["labels"]):
+                text_color = column["color"](row) if "color" in column else None
+                label.configure(
+                    text=column["text"](row),
+                    text_color=text_color or ("gray10", "gray90"),
+                )
+            for action, button in zip(self.actions, widgets["buttons"]):
+                button.configure(state="normal", command=lambda r=row, a=action: a["command"](r))
+            widgets["frame"].grid()
+
+        self._update_scrollbar()
+
+    def _render_placeholder(self, widgets: Dict[str, Any]):
+        """Show a row whose page is still loading."""
+        for position, label in enumerate(widgets["labels"]):
+            label.configure(text="Loading..." if position == 0 else "", text_color="gray")
+        for button in widgets["buttons"]:
+            button.configure(state="disabled")
+        widgets["frame"].grid()
+
+    def _update_scrollbar(self):
+        if not self.total:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self.first_index / self.total
+        last = min(1.0, (self.first_index + self.visible_rows) / self.total)
+        self.scrollbar.set(first, last)
+
+    def scroll_to(self, index: int):
+        """Scroll so that row ``index`` is the first visible row."""
+        first_index = max(0, min(index, self.total - self.visible_rows))
+        if first_index != self.first_index:
+            self.first_index = first_index
+            self._render()
+
+    def _on_body_configure(self, event):
+        """Grow the row pool to fill the table's height."""
+        visible_rows = max(1, event.height // self.row_height)
+        if visible_rows == self.visible_rows:
+            return
+
+        self.visible_rows = visible_rows
+        while len(self._row_widgets) < visible_rows:
+            self._row_widgets.append(self._create_row_widgets(len(self._row_widgets)))
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        """Handle scrollbar drags ("moveto") and steps ("scroll")."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            step = self.visible_rows if len(args) > 2 and args[2] == "pages" else 1
+            self.scroll_to(self.first_index + int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -3
+        elif event.num == 5:
+            delta = 3
+        elif sys.platform == "darwin":
+            delta = -event.delta
+        else:
+            delta = -3 * (event.delta // 120)
+        self.scroll_to(self.first_index + delta)
+
+    def _bind_mousewheel(self, event=None):
+        self.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.bind_all("<Button-4>", self._on_mousewheel)
+        self.bind_all("<Button-5>", self._on_mousewheel)
+
+    def _unbind_mousewheel(self, event=None):
+        self.unbind_all("<MouseWheel>")
+        self.unbind_all("<Button-4>")
+        self.unbind_all("<Button-5>")
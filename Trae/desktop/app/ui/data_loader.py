@@ -0,0 +1,153 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, ContextManager, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    """A submitted load and the callbacks waiting for its result."""
+
+    def __init__(
+        self,
+        func: Callable[[], Any],
+        on_done: Callable[[Any], None],
+        on_error: Optional[Callable[[Exception], None]],
+    ):
+        self.func = func
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future: Optional[Future] = None
+        # Set when the load is replaced or cancelled, to abort its query
+        self.cancelled = threading.Event()
+
+
+class DataLoader:
+    """Runs a view's database queries off the Tk main loop.
+
+    ``load`` submits a query to the shared executor and returns immediately.
+    The result comes back on the Tk thread: workers put it on a queue, and
+    the loader drains that queue from ``after()`` callbacks while loads are
+    in flight. Tk is not thread-safe, so callbacks must never run on a worker
+    thread.
+
+    Each load has a key, such as "statistics" or ``("page", 3)``. Loading a key again
+    replaces the earlier load, and a result that arrives after its load was
+    replaced or cancelled is dropped. ``cancel`` is called when the user
+    navigates away from the view. ``resume`` re-submits the loads it
+    interrupted when the view is shown again.
+
+    With a ``cancel_scope`` (``Database.cancellable``), each load runs inside
+    it, so a replaced or cancelled load also aborts its running query
+    rather than finishing unobserved.
+    """
+
+    def __init__(
+        self,
+        widget,
+        executor: Executor,
+        poll_interval: int = 20,
+        cancel_scope: Optional[Callable[[threading.Event], ContextManager]] = None,
+    ):
+        self.widget = widget
+        self.executor = executor
+        self.poll_interval = poll_interval
+        self.cancel_scope = cancel_scope
+        self._jobs: Dict[Hashable, _Job] = {}
+        self._interrupted: Dict[Hashable, _Job] = {}
+        self._results: "queue.Queue" = queue.Queue()
+        self._poll_id: Optional[str] = None
+
+    def load(
+        self,
+        key: Hashable,
+        func: Callable[[], Any],
+        on_done: Callable[[Any], None],
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """Run ``func`` on a worker thread and pass its result to ``on_done`` on the Tk thread."""
+        self._discard(key)
+        self._interrupted.pop(key, None)
+
+        job = _Job(func, on_done, on_error)
+        self._jobs[key] = job
+        job.future = self.executor.submit(self._run, job)
+        job.future.add_done_callback(lambda future: self._results.put((key, job, future)))
+        self._schedule_poll()
+
+    def cancel(self, key: Optional[Hashable] = None) -> None:
+        """Cancel one load, or all of them, keeping them to be resumed later."""
+        keys = [key] if key is not None else list(self._jobs)
+        for k in keys:
+            job = self._discard(k)
+            if job is not None:
+                self._interrupted[k] = job
+
+    def clear(self) -> None:
+        """Drop every load, in flight or interrupted, without delivering it."""
+        for key in list(self._jobs):
+            self._discard(key)
+        self._interrupted.clear()
+
+    def resume(self) -> None:
+        """Re-submit loads interrupted by ``cancel``."""
+        interrupted, self._interrupted = self._interrupted, {}
+        for key, job in interrupted.items():
+            self.load(key, job.func, job.on_done, job.on_error)
+
+    def is_loading(self, key: Optional[Hashable] = None) -> bool:
+        """Check whether a load (or any load) is in flight."""
+        return key in self._jobs if key is not None else bool(self._jobs)
+
+    def _run(self, job: _Job) -> Any:
+        """Run a load on a worker thread."""
+        if self.cancel_scope is None:
+            return job.func()
+        with self.cancel_scope(job.cancelled):
+            return job.func()
+
+    def _discard(self, key: Hashable) -> Optional[_Job]:
+        """Forget the load for ``key``, aborting its query if a worker already started it."""
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job.cancelled.set()
+            if job.future is not None:
+                job.future.cancel()
+        return job
+
+    def _schedule_poll(self) -> None:
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self) -> None:
+        """Deliver finished loads on the Tk thread."""
+        self._poll_id = None
+        if not self.widget.winfo_exists():
+            return
+
+        while True:
+            try:
+                key, job, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            # Replaced or cancelled while running
+            if self._jobs.get(key) is not job or future.cancelled():
+                continue
+            del self._jobs[key]
+
+            error = future.exception()
+            try:
+                if error is None:
+                    job.on_done(future.result())
+                elif job.on_error is not None:
+                    job.on_error(error)
+                else:
+                    logger.error(f"Error loading {key}: {error}")
+            except Exception as e:
+                logger.error(f"Error handling loaded {key}: {e}")
+
+        if self._jobs:
+            self._schedule_poll()
@@ -8,13 +8,9 @@ import customtkinter as ctk
 
 from app.app import EiraApp
 from app.core.config import settings
+from app.ui.change_dispatcher import ChangeDispatcher
 from app.ui.components.navigation import Navigation
 from app.ui.components.status_bar import StatusBar
-from app.ui.views.appointments_view import AppointmentsView
-from app.ui.views.dashboard_view import DashboardView
-from app.ui.views.patients_view import PatientsView
-from app.ui.views.reports_view import ReportsView
-from app.ui.views.settings_view import SettingsView
 
 logger = logging.getLogger(__name__)
 
@@ -77,34 +73,42 @@ class MainWindow(ctk.CTkFrame):
         self.content_frame.grid_rowconfigure(0, weight=1)
         self.content_frame.grid_columnconfigure(0, weight=1)
 
+        # Change events from local writes and syncs, delivered on the Tk thread
+        self.changes = ChangeDispatcher(self, self.app.db.events)
+
         # Create status bar
-        self.status_bar = StatusBar(self, self.app)
+        self.status_bar = StatusBar(self, self.app, self.changes)
         self.status_bar.grid(row=2, column=0, columnspan=2, sticky="ew")
 
-        # Initialize views dictionary
+        # Views are created on first navigation
         self.views = {}
-        self._create_views()
 
         # Show default view
         self.current_view = "dashboard"
         self.show_view("dashboard")
 
-    def _create_views(self):
-        """Create all the application views."""
-        # Dashboard view
-        self.views["dashboard"] = DashboardView(self.content_frame, self.app)
-
-        # Patients view
-        self.views["patients"] = PatientsView(self.content_frame, self.app)
-
-        # Appointments view
-        self.views["appointments"] = AppointmentsView(self.content_frame, self.app)
-
-        # Reports view
-        self.views["reports"] = ReportsView(self.content_frame, self.app)
-
-        # Settings view
-        self.views["settings"] = SettingsView(self.content_frame, self.app)
+    def _create_view(self, view_name: str) -> Optional[ctk.CTkFrame]:
+        """Create a view the first time it is shown.
+
+        View modules are imported here rather than at the top of the file,
+        so startup only loads the dashboard.
+        """
+        if view_name == "dashboard":
+            from app.ui.views.dashboard_view import DashboardView
+            return DashboardView(self.content_frame, self.app, self.changes)
+        if view_name == "patients":
+            from app.ui.views.patients_view import PatientsView
+            return PatientsView(self.content_frame, self.app, self.changes)
+        if view_name == "appointments":
+            from app.ui.views.appointments_view import AppointmentsView
+            return AppointmentsView(self.content_frame, self.app, self.changes)
+        if view_name == "reports":
+            from app.ui.views.reports_view import ReportsView
+            return ReportsView(self.content_frame, self.app)
+        if view_name == "settings":
+            from app.ui.views.settings_view import SettingsView
+            return SettingsView(self.content_frame, self.app)
+        return None
 
     def show_view(self, view_name: str):
         """Show the specified view and hide others."""
@@ -118,15 +122,30 @@ class MainWindow(ctk.CTkFrame):
         }
         self.title_label.configure(text=title_map.get(view_name, "Dashboard"))
 
-        # Hide all views
+        # Hide all views, cancelling loads whose results nobody will see
         for name, view in self.views.items():
             view.grid_forget()
+            if name != view_name and hasattr(view, "loader"):
+                view.loader.cancel()
+
+        if view_name not in self.views:
+            view = self._create_view(view_name)
+            if view is not None:
+                self.views[view_name] = view
 
-        # Show selected view
+        # Show selected view, finishing any loads cancelled when it was hidden
         if view_name in self.views:
-            self.views[view_name].grid(row=0, column=0, sticky="nsew")
+            view = self.views[view_name]
+            view.grid(row=0, column=0, sticky="nsew")
+            if hasattr(view, "loader"):
+                view.loader.resume()
             self.current_view = view_name
 
+    def destroy(self):
+        """Stop receiving change events before the window goes away."""
+        self.changes.close()
+        super().destroy()
+
     def on_navigation_change(self, view_name: str):
         """Handle navigation change."""
         self.show_view(view_name)
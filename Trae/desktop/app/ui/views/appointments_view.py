@@ -7,6 +7,9 @@ import tkinter as tk
 from tkinter import messagebox
 
 from app.app import EiraApp
+from app.ui.change_dispatcher import ChangeDispatcher
+from app.ui.components.virtual_table import VirtualTable
+from app.ui.data_loader import DataLoader
 
 logger = logging.getLogger(__name__)
 
@@ -398,12 +401,14 @@ class AppointmentForm(ctk.CTkFrame):
 class AppointmentsView(ctk.CTkFrame):
     """Appointments view for the Eira desktop application."""
 
-    def __init__(self, master, app: EiraApp):
+    def __init__(self, master, app: EiraApp, changes: Optional[ChangeDispatcher] = None):
         super().__init__(master)
         self.master = master
         self.app = app
         self.current_form = None
         self.current_date = datetime.now().date()
+        self.date_range = None
+        self.loader = DataLoader(self, app.ui_executor, cancel_scope=app.db.cancellable)
 
         # Configure grid layout
         self.grid_columnconfigure(0, weight=1)
@@ -418,6 +423,10 @@ class AppointmentsView(ctk.CTkFrame):
         # Load appointments for current date
         self.refresh_appointments()
 
+        # Patch rows as appointments, or the patients named in them, change
+        if changes is not None:
+            changes.subscribe(self, self._on_changes, ["appointments", "patients"])
+
     def _create_top_bar(self):
         """Create top bar with date navigation and add button."""
         top_bar = ctk.CTkFrame(self, fg_color="transparent")
@@ -492,224 +501,142 @@ class AppointmentsView(ctk.CTkFrame):
         self.content_frame.grid_columnconfigure(0, weight=1)
         self.content_frame.grid_rowconfigure(0, weight=1)
 
-        # Appointments list frame
-        self.appointments_list_frame = ctk.CTkScrollableFrame(self.content_frame)
-        self.appointments_list_frame.grid(row=0, column=0, sticky="nsew")
+        # Appointments table, created by refresh_appointments for the current view
+        self.appointments_table = None
+        self.table_view = None
+
+    def _create_appointments_table(self, show_date: bool):
+        """Create the appointments table, with a leading date column for week and month views."""
+        if self.appointments_table is not None:
+            # Drop loads whose results would go to the table being replaced
+            self.loader.clear()
+            self.appointments_table.destroy()
+
+        columns = [
+            {"title": "Time", "width": 80, "text": lambda a: a.get("time") or "N/A"},
+            {
+                "title": "Patient",
+                "width": 200,
+                # Patient name is joined in by the summary query
+                "text": lambda a: a.get("patient_name") or "Unknown Patient",
+            },
+            {"title": "Type", "width": 150, "text": lambda a: a.get("type") or "N/A"},
+            {"title": "Duration", "width": 80, "text": lambda a: f"{a.get('duration', 'N/A')} min"},
+            {
+                "title": "Status",
+                "width": 100,
+                "text": lambda a: a.get("status") or "Scheduled",
+                "color": lambda a: self._status_color(a.get("status") or "Scheduled"),
+            },
+        ]
+        if show_date:
+            columns.insert(0, {"title": "Date", "width": 120, "text": self._format_row_date})
+
+        self.appointments_table = VirtualTable(
+            self.content_frame,
+            columns=columns,
+            actions=[
+                {"text": "Edit", "width": 60, "command": self._on_edit_appointment},
+                {
+                    "text": "Cancel",
+                    "width": 60,
+                    "fg_color": "red",
+                    "command": self._on_cancel_appointment,
+                },
+            ],
+            fetch_page=self._fetch_appointments_page,
+            count=self._count_appointments,
+            loader=self.loader,
+        )
+        if self.current_form is None:
+            self.appointments_table.grid(row=0, column=0, sticky="nsew")
 
     def refresh_appointments(self):
         """Refresh appointments list for the current date/view."""
-        # Clear existing list
-        for widget in self.appointments_list_frame.winfo_children():
-            widget.destroy()
-
-        try:
-            # Get date range based on current view
-            date_range = self._get_date_range()
-            start_date, end_date = date_range
-
-            # Get appointments from database
-            filters = {
-                "date_gte": start_date.isoformat(),
-                "date_lt": end_date.isoformat(),
-            }
-
-            appointments = self.app.db.get_appointments(
-                filters=filters, order_by="date,time"
-            )
-
-            if not appointments:
-                no_data_label = ctk.CTkLabel(
-                    self.appointments_list_frame,
-                    text=f"No appointments found for {self._get_view_description()}",
-                    font=ctk.CTkFont(size=14),
-                    text_color="gray",
-                )
-                no_data_label.pack(pady=20)
-                return
-
-            # Group appointments by date if in week or month view
-            current_view = self.view_var.get()
-            if current_view in ["Week", "Month"]:
-                self._display_grouped_appointments(appointments)
-            else:
-                self._display_day_appointments(appointments)
-
-        except Exception as e:
-            logger.error(f"Error loading appointments: {e}")
-            error_label = ctk.CTkLabel(
-                self.appointments_list_frame,
-                text=f"Error loading appointments: {str(e)}",
-                font=ctk.CTkFont(size=14),
-                text_color="red",
-            )
-            error_label.pack(pady=20)
-
-    def _display_day_appointments(self, appointments: List[Dict[str, Any]]):
-        """Display appointments for a single day."""
-        # Create header row
-        header_frame = ctk.CTkFrame(self.appointments_list_frame, fg_color="transparent")
-        header_frame.pack(fill="x", padx=10, pady=(5, 10))
-
-        headers = ["Time", "Patient", "Type", "Duration", "Status", "Actions"]
-        widths = [80, 200, 150, 80, 100, 150]
-
-        for i, header_text in enumerate(headers):
-            header_label = ctk.CTkLabel(
-                header_frame,
-                text=header_text,
-                font=ctk.CTkFont(size=14, weight="bold"),
-                width=widths[i],
-                anchor="w",
-            )
-            header_label.pack(side="left", padx=5)
-
-        # Add separator
-        separator = ctk.CTkFrame(self.appointments_list_frame, height=1, fg_color="gray")
-        separator.pack(fill="x", padx=10, pady=5)
+        current_view = self.view_var.get()
+        if current_view != self.table_view:
+            self._create_appointments_table(show_date=current_view in ["Week", "Month"])
+            self.table_view = current_view
+
+        # Tk variables can only be read here, not from the loader's worker thread
+        self.date_range = self._get_date_range()
+        self.appointments_table.empty_text = f"No appointments found for {self._get_view_description()}"
+        self.appointments_table.refresh()
+
+    def _fetch_appointments_page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Get one page of appointments, with patient names, for the current date range."""
+        start_date, end_date = self.date_range
+        return self.app.db.get_appointments(
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+            skip=offset,
+            limit=limit,
+            summary=True,
+        )
+
+    def _count_appointments(self) -> int:
+        """Count appointments in the current date range."""
+        start_date, end_date = self.date_range
+        return self.app.db.count_appointments(
+            start_date=start_date.isoformat(), end_date=end_date.isoformat()
+        )
+
+    def _on_changes(self, events: List[Dict[str, Any]]):
+        """Patch the rows affected by changed appointments and patients."""
+        cached = self.appointments_table.cached_rows()
+        ids = set()
+
+        for event in events:
+            if event["entity_type"] == "appointments":
+                if event["operation"] != "update":
+                    # Appointments added or removed; reload the rows in view
+                    self.appointments_table.invalidate()
+                    return
+                ids.update(i for i in event["ids"] if i in cached)
+            elif event["operation"] != "create":
+                # Patient names are joined into the rows
+                patient_ids = set(event["ids"])
+                ids.update(a["id"] for a in cached.values() if a["patient_id"] in patient_ids)
+
+        if not ids:
+            return
 
-        # Add appointment rows
-        for appointment in appointments:
-            self._add_appointment_row(appointment)
+        db = self.app.db
+        ids = list(ids)
+        self.loader.load(
+            ("changed", tuple(ids)),
+            lambda: db.get_appointments_by_ids(ids, summary=True),
+            self._patch_appointments,
+        )
 
-    def _display_grouped_appointments(self, appointments: List[Dict[str, Any]]):
-        """Display appointments grouped by date for week or month view."""
-        # Group appointments by date
-        grouped = {}
+    def _patch_appointments(self, appointments: List[Dict[str, Any]]):
+        """Replace changed rows in place, or reload if a reschedule moved them."""
+        cached = self.appointments_table.cached_rows()
         for appointment in appointments:
-            date_str = appointment.get("date", "")
-            if date_str not in grouped:
-                grouped[date_str] = []
-            grouped[date_str].append(appointment)
-
-        # Display each date group
-        for date_str in sorted(grouped.keys()):
-            try:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-                date_display = self._format_date(date_obj)
-
-                # Date header
-                date_header = ctk.CTkFrame(self.appointments_list_frame, fg_color="transparent")
-                date_header.pack(fill="x", padx=10, pady=(15, 5))
-
-                date_label = ctk.CTkLabel(
-                    date_header,
-                    text=date_display,
-                    font=ctk.CTkFont(size=16, weight="bold"),
-                    anchor="w",
-                )
-                date_label.pack(side="left")
-
-                # Add separator
-                separator = ctk.CTkFrame(self.appointments_list_frame, height=1, fg_color="gray")
-                separator.pack(fill="x", padx=10, pady=5)
-
-                # Add appointments for this date
-                for appointment in grouped[date_str]:
-                    self._add_appointment_row(appointment)
-
-            except Exception as e:
-                logger.error(f"Error displaying date group {date_str}: {e}")
-
-    def _add_appointment_row(self, appointment: Dict[str, Any]):
-        """Add an appointment row to the list."""
-        row_frame = ctk.CTkFrame(self.appointments_list_frame, fg_color="transparent")
-        row_frame.pack(fill="x", padx=10, pady=5)
-
-        # Time
-        time_label = ctk.CTkLabel(
-            row_frame,
-            text=appointment.get("time", "N/A"),
-            font=ctk.CTkFont(size=14),
-            width=80,
-            anchor="w",
-        )
-        time_label.pack(side="left", padx=5)
+            old = cached.get(appointment["id"])
+            if old and (old["start_time"], old["end_time"]) != (
+                appointment["start_time"], appointment["end_time"]
+            ):
+                self.appointments_table.invalidate()
+                return
+        self.appointments_table.update_rows(appointments)
 
-        # Get patient info
-        patient_id = appointment.get("patient_id")
-        patient_name = "Unknown Patient"
+    def _format_row_date(self, appointment: Dict[str, Any]) -> str:
+        """Format an appointment's date for the date column."""
         try:
-            if patient_id:
-                patient = self.app.db.get_patient(patient_id)
-                if patient:
-                    patient_name = f"{patient.get('first_name', '')} {patient.get('last_name', '')}"
-        except Exception as e:
-            logger.error(f"Error getting patient for appointment: {e}")
-
-        # Patient name
-        patient_label = ctk.CTkLabel(
-            row_frame,
-            text=patient_name,
-            font=ctk.CTkFont(size=14),
-            width=200,
-            anchor="w",
-        )
-        patient_label.pack(side="left", padx=5)
-
-        # Type
-        type_label = ctk.CTkLabel(
-            row_frame,
-            text=appointment.get("type", "N/A"),
-            font=ctk.CTkFont(size=14),
-            width=150,
-            anchor="w",
-        )
-        type_label.pack(side="left", padx=5)
-
-        # Duration
-        duration_label = ctk.CTkLabel(
-            row_frame,
-            text=f"{appointment.get('duration', 'N/A')} min",
-            font=ctk.CTkFont(size=14),
-            width=80,
-            anchor="w",
-        )
-        duration_label.pack(side="left", padx=5)
+            return datetime.strptime(appointment.get("date", ""), "%Y-%m-%d").strftime("%a, %b %d")
+        except (TypeError, ValueError):
+            return "N/A"
 
-        # Status
-        status = appointment.get("status", "Scheduled")
-        status_color = "gray"
+    def _status_color(self, status: str) -> str:
+        """Get the text color for an appointment status."""
         if status == "Confirmed":
-            status_color = "blue"
+            return "blue"
         elif status == "Completed":
-            status_color = "green"
+            return "green"
         elif status == "Cancelled" or status == "No-show":
-            status_color = "red"
-
-        status_label = ctk.CTkLabel(
-            row_frame,
-            text=status,
-            font=ctk.CTkFont(size=14),
-            text_color=status_color,
-            width=100,
-            anchor="w",
-        )
-        status_label.pack(side="left", padx=5)
-
-        # Actions
-        actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent", width=150)
-        actions_frame.pack(side="left", padx=5)
-
-        edit_button = ctk.CTkButton(
-            actions_frame,
-            text="Edit",
-            width=60,
-            height=24,
-            font=ctk.CTkFont(size=12),
-            command=lambda a=appointment: self._on_edit_appointment(a),
-        )
-        edit_button.pack(side="left", padx=(0, 5))
-
-        cancel_button = ctk.CTkButton(
-            actions_frame,
-            text="Cancel",
-            width=60,
-            height=24,
-            font=ctk.CTkFont(size=12),
-            fg_color="red",
-            command=lambda a=appointment: self._on_cancel_appointment(a),
-        )
-        cancel_button.pack(side="left")
+            return "red"
+        return "gray"
 
     def _format_date(self, date_obj: datetime.date) -> str:
         """Format date for display."""
@@ -800,7 +727,7 @@ class AppointmentsView(ctk.CTkFrame):
     def _on_add_appointment(self):
         """Handle add appointment button click."""
         # Hide appointments list
-        self.appointments_list_frame.grid_forget()
+        self.appointments_table.grid_forget()
 
         # Create and show appointment form
         self.current_form = AppointmentForm(
@@ -814,7 +741,7 @@ class AppointmentsView(ctk.CTkFrame):
     def _on_edit_appointment(self, appointment: Dict[str, Any]):
         """Handle edit appointment button click."""
         # Hide appointments list
-        self.appointments_list_frame.grid_forget()
+        self.appointments_table.grid_forget()
 
         # Create and show appointment form with appointment data
         self.current_form = AppointmentForm(
@@ -881,4 +808,4 @@ class AppointmentsView(ctk.CTkFrame):
             self.current_form = None
 
         # Show appointments list again
-        self.appointments_list_frame.grid(row=0, column=0, sticky="nsew")
\ No newline at end of file
+        self.appointments_table.grid(row=0, column=0, sticky="nsew")
\ No newline at end of file
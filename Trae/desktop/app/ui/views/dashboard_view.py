@@ -1,11 +1,13 @@
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 
 import customtkinter as ctk
 import tkinter as tk
 
 from app.app import EiraApp
+from app.ui.change_dispatcher import ChangeDispatcher
+from app.ui.data_loader import DataLoader
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +15,13 @@ logger = logging.getLogger(__name__)
 class DashboardView(ctk.CTkFrame):
     """Dashboard view for the Eira desktop application."""
 
-    def __init__(self, master, app: EiraApp):
+    def __init__(self, master, app: EiraApp, changes: Optional[ChangeDispatcher] = None):
         super().__init__(master)
         self.master = master
         self.app = app
+        self.loader = DataLoader(self, app.ui_executor, cancel_scope=app.db.cancellable)
+        # What the appointment list shows, to tell which patient changes affect it
+        self.upcoming_appointments = []
 
         # Configure grid layout
         self.grid_columnconfigure(0, weight=1)
@@ -31,6 +36,10 @@ class DashboardView(ctk.CTkFrame):
         # Load data
         self.refresh_data()
 
+        # Reload only the sections that changes affect
+        if changes is not None:
+            changes.subscribe(self, self._on_changes)
+
     def _create_stats_cards(self):
         """Create statistics cards."""
         self.stats_frame = ctk.CTkFrame(self)
@@ -137,83 +146,111 @@ class DashboardView(ctk.CTkFrame):
         view_all_appointments.pack(padx=15, pady=(0, 15), fill="x")
 
     def refresh_data(self):
-        """Refresh all dashboard data."""
-        try:
-            # Update statistics
-            self._update_statistics()
+        """Refresh all dashboard data.
+
+        Each section is queried on a worker thread and shows a placeholder
+        until its data arrives.
+        """
+        for card in (self.patients_card, self.appointments_card, self.notes_card, self.sync_card):
+            card["value"].configure(text="...")
+        self._show_list_message(self.patients_list, "Loading...")
+        self._show_list_message(self.appointments_list, "Loading...")
+
+        self._load_statistics()
+        self._load_recent_patients()
+        self._load_upcoming_appointments()
+
+    def _on_changes(self, events: List[Dict[str, Any]]):
+        """Reload the sections affected by changed entities."""
+        # Counts can change with any entity; it is one aggregate query
+        self._load_statistics()
+
+        reload_patients = reload_appointments = False
+        appointment_patient_ids = {a.get("patient_id") for a in self.upcoming_appointments}
+        for event in events:
+            ids = set(event["ids"])
+            if event["entity_type"] == "patients":
+                # The list is ordered by last update, so any change can reorder it
+                reload_patients = True
+                # Patient names are joined into the appointment list
+                if ids & appointment_patient_ids:
+                    reload_appointments = True
+            elif event["entity_type"] == "appointments":
+                reload_appointments = True
+
+        if reload_patients:
+            self._load_recent_patients()
+        if reload_appointments:
+            self._load_upcoming_appointments()
+
+    def _load_statistics(self):
+        db = self.app.db
+        # One cached aggregate query for all cards (notes: last 7 days)
+        self.loader.load(
+            "statistics",
+            lambda: db.get_dashboard_stats(recent_days=7),
+            self._update_statistics,
+            lambda e: logger.error(f"Error updating statistics: {e}"),
+        )
 
-            # Update recent patients
-            self._update_recent_patients()
+    def _load_recent_patients(self):
+        db = self.app.db
+        # Get recent patients (limit to 10)
+        self.loader.load(
+            "recent_patients",
+            lambda: db.get_patients(limit=10, order_by="-updated_at"),
+            self._update_recent_patients,
+            lambda e: self._show_load_error(self.patients_list, "patients", e),
+        )
 
-            # Update upcoming appointments
-            self._update_upcoming_appointments()
+    def _load_upcoming_appointments(self):
+        db = self.app.db
+        # Get upcoming appointments (limit to 10)
+        today = datetime.now().date().isoformat()
+        self.loader.load(
+            "upcoming_appointments",
+            lambda: db.get_appointments(start_date=today, limit=10, summary=True),
+            self._update_upcoming_appointments,
+            lambda e: self._show_load_error(self.appointments_list, "appointments", e),
+        )
 
-        except Exception as e:
-            logger.error(f"Error refreshing dashboard data: {e}")
+    def _show_list_message(self, list_frame, text: str, text_color: str = "gray"):
+        """Replace a list's contents with a single message."""
+        for widget in list_frame.winfo_children():
+            widget.destroy()
+
+        message_label = ctk.CTkLabel(
+            list_frame,
+            text=text,
+            font=ctk.CTkFont(size=12),
+            text_color=text_color,
+        )
+        message_label.pack(pady=10)
 
-    def _update_statistics(self):
+    def _show_load_error(self, list_frame, what: str, error: Exception):
+        logger.error(f"Error updating {what}: {error}")
+        self._show_list_message(list_frame, f"Error loading {what}: {str(error)}", "red")
+
+    def _update_statistics(self, stats: Dict[str, int]):
         """Update statistics cards with current data."""
-        try:
-            # Get total patients count
-            patients_count = len(self.app.db.get_patients())
-            self.patients_card["value"].configure(text=str(patients_count))
-
-            # Get today's appointments count
-            today = datetime.now().date()
-            today_str = today.isoformat()
-            tomorrow_str = (today + timedelta(days=1)).isoformat()
-            appointments = self.app.db.get_appointments(
-                filters={"date_gte": today_str, "date_lt": tomorrow_str}
-            )
-            self.appointments_card["value"].configure(text=str(len(appointments)))
-
-            # Get recent notes count (last 7 days)
-            week_ago_str = (today - timedelta(days=7)).isoformat()
-            notes = self.app.db.get_clinical_notes(
-                filters={"created_at_gte": week_ago_str}
-            )
-            self.notes_card["value"].configure(text=str(len(notes)))
-
-            # Get pending sync count
-            pending_changes = self.app.db.get_pending_changes()
-            self.sync_card["value"].configure(text=str(len(pending_changes)))
-
-        except Exception as e:
-            logger.error(f"Error updating statistics: {e}")
-
-    def _update_recent_patients(self):
+        self.patients_card["value"].configure(text=str(stats["total_patients"]))
+        self.appointments_card["value"].configure(text=str(stats["todays_appointments"]))
+        self.notes_card["value"].configure(text=str(stats["recent_notes"]))
+        self.sync_card["value"].configure(text=str(stats["pending_changes"]))
+
+    def _update_recent_patients(self, patients: List[Dict[str, Any]]):
         """Update recent patients list."""
-        try:
-            # Clear existing items
-            for widget in self.patients_list.winfo_children():
-                widget.destroy()
-
-            # Get recent patients (limit to 10)
-            patients = self.app.db.get_patients(limit=10, order_by="-updated_at")
-
-            if not patients:
-                no_data_label = ctk.CTkLabel(
-                    self.patients_list,
-                    text="No patients found",
-                    font=ctk.CTkFont(size=12),
-                    text_color="gray",
-                )
-                no_data_label.pack(pady=10)
-                return
-
-            # Add patient items
-            for patient in patients:
-                self._add_patient_item(patient)
-
-        except Exception as e:
-            logger.error(f"Error updating recent patients: {e}")
-            error_label = ctk.CTkLabel(
-                self.patients_list,
-                text=f"Error loading patients: {str(e)}",
-                font=ctk.CTkFont(size=12),
-                text_color="red",
-            )
-            error_label.pack(pady=10)
+        if not patients:
+            self._show_list_message(self.patients_list, "No patients found")
+            return
+
+        # Clear existing items
+        for widget in self.patients_list.winfo_children():
+            widget.destroy()
+
+        # Add patient items
+        for patient in patients:
+            self._add_patient_item(patient)
 
     def _add_patient_item(self, patient: Dict[str, Any]):
         """Add a patient item to the recent patients list."""
@@ -250,60 +287,28 @@ class DashboardView(ctk.CTkFrame):
         )
         view_button.pack(side="right", padx=5)
 
-    def _update_upcoming_appointments(self):
+    def _update_upcoming_appointments(self, appointments: List[Dict[str, Any]]):
         """Update upcoming appointments list."""
-        try:
-            # Clear existing items
-            for widget in self.appointments_list.winfo_children():
-                widget.destroy()
-
-            # Get upcoming appointments (limit to 10)
-            today = datetime.now().date().isoformat()
-            appointments = self.app.db.get_appointments(
-                filters={"date_gte": today},
-                limit=10,
-                order_by="date",
-            )
-
-            if not appointments:
-                no_data_label = ctk.CTkLabel(
-                    self.appointments_list,
-                    text="No upcoming appointments",
-                    font=ctk.CTkFont(size=12),
-                    text_color="gray",
-                )
-                no_data_label.pack(pady=10)
-                return
-
-            # Add appointment items
-            for appointment in appointments:
-                self._add_appointment_item(appointment)
-
-        except Exception as e:
-            logger.error(f"Error updating upcoming appointments: {e}")
-            error_label = ctk.CTkLabel(
-                self.appointments_list,
-                text=f"Error loading appointments: {str(e)}",
-                font=ctk.CTkFont(size=12),
-                text_color="red",
-            )
-            error_label.pack(pady=10)
+        self.upcoming_appointments = appointments
+        if not appointments:
+            self._show_list_message(self.appointments_list, "No upcoming appointments")
+            return
+
+        # Clear existing items
+        for widget in self.appointments_list.winfo_children():
+            widget.destroy()
+
+        # Add appointment items
+        for appointment in appointments:
+            self._add_appointment_item(appointment)
 
     def _add_appointment_item(self, appointment: Dict[str, Any]):
         """Add an appointment item to the upcoming appointments list."""
         item_frame = ctk.CTkFrame(self.appointments_list, fg_color="transparent")
         item_frame.pack(fill="x", pady=5)
 
-        # Get patient info
-        patient_id = appointment.get("patient_id")
-        patient_name = "Unknown Patient"
-        try:
-            if patient_id:
-                patient = self.app.db.get_patient(patient_id)
-                if patient:
-                    patient_name = f"{patient.get('first_name', '')} {patient.get('last_name', '')}"
-        except Exception as e:
-            logger.error(f"Error getting patient for appointment: {e}")
+        # Patient name is joined in by the summary query
+        patient_name = appointment.get("patient_name") or "Unknown Patient"
 
         # Date and time
         date_str = appointment.get("date", "")
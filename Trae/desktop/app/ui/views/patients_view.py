@@ -6,6 +6,10 @@ import tkinter as tk
 from tkinter import messagebox
 
 from app.app import EiraApp
+from app.core.config import settings
+from app.ui.change_dispatcher import ChangeDispatcher
+from app.ui.components.virtual_table import VirtualTable
+from app.ui.data_loader import DataLoader
 
 logger = logging.getLogger(__name__)
 
@@ -235,11 +239,14 @@ class PatientForm(ctk.CTkFrame):
 class PatientsView(ctk.CTkFrame):
     """Patients view for the Eira desktop application."""
 
-    def __init__(self, master, app: EiraApp):
+    def __init__(self, master, app: EiraApp, changes: Optional[ChangeDispatcher] = None):
         super().__init__(master)
         self.master = master
         self.app = app
         self.current_form = None
+        self.loader = DataLoader(self, app.ui_executor, cancel_scope=app.db.cancellable)
+        # Pending as-you-type search
+        self._search_after_id = None
 
         # Configure grid layout
         self.grid_columnconfigure(0, weight=1)
@@ -254,6 +261,10 @@ class PatientsView(ctk.CTkFrame):
         # Load patients
         self.refresh_patients()
 
+        # Patch rows as local edits and syncs change patients
+        if changes is not None:
+            changes.subscribe(self, self._on_patient_changes, ["patients"])
+
     def _create_top_bar(self):
         """Create top bar with search and add button."""
         top_bar = ctk.CTkFrame(self, fg_color="transparent")
@@ -271,6 +282,7 @@ class PatientsView(ctk.CTkFrame):
         )
         self.search_entry.pack(side="left", padx=(0, 10))
         self.search_entry.bind("<Return>", lambda event: self._on_search())
+        self.search_entry.bind("<KeyRelease>", self._on_search_typed)
 
         search_button = ctk.CTkButton(
             search_frame,
@@ -297,148 +309,98 @@ class PatientsView(ctk.CTkFrame):
         self.content_frame.grid_columnconfigure(0, weight=1)
         self.content_frame.grid_rowconfigure(0, weight=1)
 
-        # Patients list frame
-        self.patients_list_frame = ctk.CTkScrollableFrame(self.content_frame)
-        self.patients_list_frame.grid(row=0, column=0, sticky="nsew")
+        # Patients table; rows are paged from the database as they scroll into view
+        self.search_query = ""
+        self.patients_table = VirtualTable(
+            self.content_frame,
+            columns=[
+                {
+                    "title": "Name",
+                    "width": 250,
+                    "text": lambda p: f"{p.get('first_name', '')} {p.get('last_name', '')}",
+                },
+                {"title": "DOB", "width": 100, "text": lambda p: p.get("date_of_birth") or "N/A"},
+                {"title": "Gender", "width": 100, "text": lambda p: p.get("gender") or "N/A"},
+                {"title": "Phone", "width": 150, "text": lambda p: p.get("phone") or "N/A"},
+            ],
+            actions=[
+                {"text": "View", "width": 60, "command": self._on_view_patient},
+                {"text": "Edit", "width": 60, "command": self._on_edit_patient},
+            ],
+            fetch_page=lambda offset, limit: self.app.db.get_patients(
+                skip=offset, limit=limit, search=self.search_query or None
+            ),
+            count=lambda: self.app.db.count_patients(search=self.search_query or None),
+            empty_text="No patients found",
+            loader=self.loader,
+        )
+        self.patients_table.grid(row=0, column=0, sticky="nsew")
 
     def refresh_patients(self, search_query: str = ""):
         """Refresh patients list, optionally filtering by search query."""
-        # Clear existing list
-        for widget in self.patients_list_frame.winfo_children():
-            widget.destroy()
-
-        try:
-            # Get patients from database
-            filters = {}
-            if search_query:
-                filters["search"] = search_query
-
-            patients = self.app.db.get_patients(filters=filters)
-
-            if not patients:
-                no_data_label = ctk.CTkLabel(
-                    self.patients_list_frame,
-                    text="No patients found",
-                    font=ctk.CTkFont(size=14),
-                    text_color="gray",
-                )
-                no_data_label.pack(pady=20)
-                return
-
-            # Create header row
-            header_frame = ctk.CTkFrame(self.patients_list_frame, fg_color="transparent")
-            header_frame.pack(fill="x", padx=10, pady=(5, 10))
-
-            headers = ["Name", "DOB", "Gender", "Phone", "Actions"]
-            widths = [250, 100, 100, 150, 150]
-
-            for i, header_text in enumerate(headers):
-                header_label = ctk.CTkLabel(
-                    header_frame,
-                    text=header_text,
-                    font=ctk.CTkFont(size=14, weight="bold"),
-                    width=widths[i],
-                    anchor="w",
-                )
-                header_label.pack(side="left", padx=5)
-
-            # Add separator
-            separator = ctk.CTkFrame(self.patients_list_frame, height=1, fg_color="gray")
-            separator.pack(fill="x", padx=10, pady=5)
-
-            # Add patient rows
-            for patient in patients:
-                self._add_patient_row(patient)
-
-        except Exception as e:
-            logger.error(f"Error loading patients: {e}")
-            error_label = ctk.CTkLabel(
-                self.patients_list_frame,
-                text=f"Error loading patients: {str(e)}",
-                font=ctk.CTkFont(size=14),
-                text_color="red",
-            )
-            error_label.pack(pady=20)
-
-    def _add_patient_row(self, patient: Dict[str, Any]):
-        """Add a patient row to the list."""
-        row_frame = ctk.CTkFrame(self.patients_list_frame, fg_color="transparent")
-        row_frame.pack(fill="x", padx=10, pady=5)
-
-        # Name
-        name = f"{patient.get('first_name', '')} {patient.get('last_name', '')}"
-        name_label = ctk.CTkLabel(
-            row_frame,
-            text=name,
-            font=ctk.CTkFont(size=14),
-            width=250,
-            anchor="w",
-        )
-        name_label.pack(side="left", padx=5)
+        self.search_query = search_query
+        self.patients_table.refresh()
+
+    def _on_patient_changes(self, events: List[Dict[str, Any]]):
+        """Patch the rows affected by changed patients."""
+        if self.search_query or any(event["operation"] != "update" for event in events):
+            # Rows may have been added, removed or filtered out; reload the rows in view
+            self.patients_table.invalidate()
+            return
 
-        # DOB
-        dob_label = ctk.CTkLabel(
-            row_frame,
-            text=patient.get("date_of_birth", "N/A"),
-            font=ctk.CTkFont(size=14),
-            width=100,
-            anchor="w",
-        )
-        dob_label.pack(side="left", padx=5)
+        cached = self.patients_table.cached_rows()
+        ids = [i for event in events for i in event["ids"] if i in cached]
+        if not ids:
+            return
 
-        # Gender
-        gender_label = ctk.CTkLabel(
-            row_frame,
-            text=patient.get("gender", "N/A"),
-            font=ctk.CTkFont(size=14),
-            width=100,
-            anchor="w",
+        db = self.app.db
+        self.loader.load(
+            ("changed", tuple(ids)),
+            lambda: db.get_patients_by_ids(ids),
+            self._patch_patients,
         )
-        gender_label.pack(side="left", padx=5)
 
-        # Phone
-        phone_label = ctk.CTkLabel(
-            row_frame,
-            text=patient.get("phone", "N/A"),
-            font=ctk.CTkFont(size=14),
-            width=150,
-            anchor="w",
-        )
-        phone_label.pack(side="left", padx=5)
-
-        # Actions
-        actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent", width=150)
-        actions_frame.pack(side="left", padx=5)
-
-        view_button = ctk.CTkButton(
-            actions_frame,
-            text="View",
-            width=60,
-            height=24,
-            font=ctk.CTkFont(size=12),
-            command=lambda p=patient: self._on_view_patient(p),
-        )
-        view_button.pack(side="left", padx=(0, 5))
-
-        edit_button = ctk.CTkButton(
-            actions_frame,
-            text="Edit",
-            width=60,
-            height=24,
-            font=ctk.CTkFont(size=12),
-            command=lambda p=patient: self._on_edit_patient(p),
-        )
-        edit_button.pack(side="left")
+    def _patch_patients(self, patients: List[Dict[str, Any]]):
+        """Replace changed rows in place, or reload if a rename moved them."""
+        cached = self.patients_table.cached_rows()
+        for patient in patients:
+            old = cached.get(patient["id"])
+            if old and (old["last_name"], old["first_name"]) != (patient["last_name"], patient["first_name"]):
+                self.patients_table.invalidate()
+                return
+        self.patients_table.update_rows(patients)
 
     def _on_search(self):
         """Handle search button click."""
+        self._cancel_typed_search()
         search_query = self.search_entry.get()
         self.refresh_patients(search_query)
 
+    def _on_search_typed(self, event=None):
+        """Search as the user types, once typing pauses.
+
+        Each search replaces the table's load in flight, which aborts its
+        query, so only the latest search text is ever shown.
+        """
+        self._cancel_typed_search()
+        self._search_after_id = self.after(settings.SEARCH_DEBOUNCE_MS, self._run_typed_search)
+
+    def _run_typed_search(self):
+        self._search_after_id = None
+        search_query = self.search_entry.get()
+        # Keys like arrows and Shift don't change the text
+        if search_query != self.search_query:
+            self.refresh_patients(search_query)
+
+    def _cancel_typed_search(self):
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+
     def _on_add_patient(self):
         """Handle add patient button click."""
         # Hide patients list
-        self.patients_list_frame.grid_forget()
+        self.patients_table.grid_forget()
 
         # Create and show patient form
         self.current_form = PatientForm(
@@ -452,7 +414,7 @@ class PatientsView(ctk.CTkFrame):
     def _on_edit_patient(self, patient: Dict[str, Any]):
         """Handle edit patient button click."""
         # Hide patients list
-        self.patients_list_frame.grid_forget()
+        self.patients_table.grid_forget()
 
         # Create and show patient form with patient data
         self.current_form = PatientForm(
@@ -510,4 +472,4 @@ class PatientsView(ctk.CTkFrame):
             self.current_form = None
 
         # Show patients list again
-        self.patients_list_frame.grid(row=0, column=0, sticky="nsew")
\ No newline at end of file
+        self.patients_table.grid(row=0, column=0, sticky="nsew")
\ No newline at end of file
@@ -7,6 +7,8 @@ import tkinter as tk
 from tkinter import messagebox
 
 from app.app import EiraApp
+from app.ui.components.virtual_table import VirtualTable
+from app.ui.data_loader import DataLoader
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,8 @@ class ReportForm(ctk.CTkFrame):
         self.report_type = report_type
         self.patients = []
         self.clinical_notes = []
+        self.data_loaded = False
+        self.loader = DataLoader(self, app.ui_executor, cancel_scope=app.db.cancellable)
 
         # Configure grid layout
         self.grid_columnconfigure(0, weight=1)
@@ -44,12 +48,12 @@ class ReportForm(ctk.CTkFrame):
         )
         self.title_label.grid(row=0, column=0, columnspan=2, padx=20, pady=(20, 10), sticky="w")
 
+        # Create form fields based on report type; dropdowns fill in once loaded
+        self._create_form_fields()
+
         # Load data for dropdowns
         self._load_data()
 
-        # Create form fields based on report type
-        self._create_form_fields()
-
     def _get_title_for_report_type(self) -> str:
         """Get title based on report type."""
         titles = {
@@ -61,16 +65,31 @@ class ReportForm(ctk.CTkFrame):
         return titles.get(self.report_type, "Generate Report")
 
     def _load_data(self):
-        """Load data for dropdowns."""
-        try:
-            # Load patients
-            self.patients = self.app.db.get_patients()
+        """Load data for dropdowns on a worker thread."""
+        db = self.app.db
+        load_notes = self.report_type == "clinical_note"
 
-            # Load clinical notes if needed
-            if self.report_type == "clinical_note":
-                self.clinical_notes = self.app.db.get_clinical_notes(limit=100)
-        except Exception as e:
+        def load():
+            # Load patients, and clinical notes if needed
+            patients = db.get_patients()
+            notes = db.get_clinical_notes(limit=100, summary=True) if load_notes else []
+            return patients, notes
+
+        def on_error(e: Exception):
             logger.error(f"Error loading data for report form: {e}")
+            self._on_data_loaded(([], []))
+
+        self.loader.load("form_data", load, self._on_data_loaded, on_error)
+
+    def _on_data_loaded(self, data):
+        """Fill the dropdowns with the loaded patients and notes."""
+        self.patients, self.clinical_notes = data
+        self.data_loaded = True
+
+        if "patient" in self.fields:
+            self.fields["patient"].configure(values=self._get_patient_display_names())
+        if "note" in self.fields:
+            self.fields["note"].configure(values=self._get_note_display_names())
 
     def _create_form_fields(self):
         """Create form fields based on report type."""
@@ -680,6 +699,8 @@ class ReportForm(ctk.CTkFrame):
 
     def _get_patient_display_names(self) -> List[str]:
         """Get patient display names for dropdown."""
+        if not self.data_loaded:
+            return ["Loading..."]
         if not self.patients:
             return ["No patients available"]
 
@@ -690,19 +711,15 @@ class ReportForm(ctk.CTkFrame):
 
     def _get_note_display_names(self) -> List[str]:
         """Get clinical note display names for dropdown."""
+        if not self.data_loaded:
+            return ["Loading..."]
         if not self.clinical_notes:
             return ["No clinical notes available"]
 
         result = []
         for note in self.clinical_notes:
-            # Try to get patient name
-            patient_name = "Unknown Patient"
-            patient_id = note.get("patient_id")
-            if patient_id:
-                for patient in self.patients:
-                    if patient.get("id") == patient_id:
-                        patient_name = f"{patient.get('first_name', '')} {patient.get('last_name', '')}"
-                        break
+            # Patient name is joined in by the summary query
+            patient_name = note.get("patient_name") or "Unknown Patient"
 
             # Format date if available
             date_str = note.get("created_at", "")
@@ -716,7 +733,7 @@ class ReportForm(ctk.CTkFrame):
                 date_display = "Unknown date"
 
             # Create display name
-            display_name = f"{date_display} - {patient_name} - {note.get('title', 'No title')} (ID: {note.get('id', '')})" 
+            display_name = f"{date_display} - {patient_name} - {note.get('chief_complaint') or 'No title'} (ID: {note.get('id', '')})" 
             result.append(display_name)
 
         return result
@@ -884,6 +901,7 @@ class ReportsView(ctk.CTkFrame):
         self.app = app
         self.current_form = None
         self.current_report_type = "clinical_note"
+        self.loader = DataLoader(self, app.ui_executor, cancel_scope=app.db.cancellable)
 
         # Configure grid layout
         self.grid_columnconfigure(0, weight=1)
@@ -949,161 +967,71 @@ class ReportsView(ctk.CTkFrame):
         self.content_frame.grid_columnconfigure(0, weight=1)
         self.content_frame.grid_rowconfigure(0, weight=1)
 
-        # Reports list frame
-        self.reports_list_frame = ctk.CTkScrollableFrame(self.content_frame)
-        self.reports_list_frame.grid(row=0, column=0, sticky="nsew")
+        # Reports table
+        self.reports_table = VirtualTable(
+            self.content_frame,
+            columns=[
+                {"title": "Date", "width": 150, "text": self._format_report_date},
+                {"title": "Title", "width": 300, "text": lambda r: r.get("title") or "Untitled Report"},
+                {"title": "Format", "width": 80, "text": lambda r: (r.get("format") or "PDF").upper()},
+                {
+                    "title": "Status",
+                    "width": 100,
+                    "text": lambda r: (r.get("status") or "completed").capitalize(),
+                    "color": lambda r: "green" if (r.get("status") or "completed") == "completed" else "orange",
+                },
+            ],
+            actions=[
+                {"text": "Download", "width": 80, "command": self._on_download_report},
+                {"text": "Delete", "width": 60, "fg_color": "red", "command": self._on_delete_report},
+            ],
+            fetch_page=lambda offset, limit: [],
+            count=lambda: 0,
+        )
+        self.reports_table.grid(row=0, column=0, sticky="nsew")
 
     def refresh_reports(self):
         """Refresh reports list."""
-        # Clear existing list
-        for widget in self.reports_list_frame.winfo_children():
-            widget.destroy()
-
-        try:
-            # Map report type selection to API filter
-            report_type_map = {
-                "Clinical Note": "clinical_note",
-                "Patient Summary": "patient_summary",
-                "Appointment Schedule": "appointment_schedule",
-                "Custom Report": "custom",
-            }
-            report_type = report_type_map.get(self.report_type_var.get(), "")
-            self.current_report_type = report_type
-
-            # Get reports from database
-            filters = {}
-            if report_type:
-                filters["type"] = report_type
-
-            reports = self.app.db.get_reports(filters=filters, order_by="-created_at")
-
-            if not reports:
-                no_data_label = ctk.CTkLabel(
-                    self.reports_list_frame,
-                    text=f"No {self.report_type_var.get()} reports found",
-                    font=ctk.CTkFont(size=14),
-                    text_color="gray",
-                )
-                no_data_label.pack(pady=20)
-                return
-
-            # Create header row
-            header_frame = ctk.CTkFrame(self.reports_list_frame, fg_color="transparent")
-            header_frame.pack(fill="x", padx=10, pady=(5, 10))
-
-            headers = ["Date", "Title", "Format", "Status", "Actions"]
-            widths = [150, 300, 80, 100, 150]
-
-            for i, header_text in enumerate(headers):
-                header_label = ctk.CTkLabel(
-                    header_frame,
-                    text=header_text,
-                    font=ctk.CTkFont(size=14, weight="bold"),
-                    width=widths[i],
-                    anchor="w",
-                )
-                header_label.pack(side="left", padx=5)
-
-            # Add separator
-            separator = ctk.CTkFrame(self.reports_list_frame, height=1, fg_color="gray")
-            separator.pack(fill="x", padx=10, pady=5)
+        # Map report type selection to API filter
+        report_type_map = {
+            "Clinical Note": "clinical_note",
+            "Patient Summary": "patient_summary",
+            "Appointment Schedule": "appointment_schedule",
+            "Custom Report": "custom",
+        }
+        report_type = report_type_map.get(self.report_type_var.get(), "")
+        self.current_report_type = report_type
 
-            # Add report rows
-            for report in reports:
-                self._add_report_row(report)
+        # Get reports from database
+        filters = {}
+        if report_type:
+            filters["type"] = report_type
 
-        except Exception as e:
+        def on_error(e: Exception):
             logger.error(f"Error loading reports: {e}")
-            error_label = ctk.CTkLabel(
-                self.reports_list_frame,
-                text=f"Error loading reports: {str(e)}",
-                font=ctk.CTkFont(size=14),
-                text_color="red",
-            )
-            error_label.pack(pady=20)
-
-    def _add_report_row(self, report: Dict[str, Any]):
-        """Add a report row to the list."""
-        row_frame = ctk.CTkFrame(self.reports_list_frame, fg_color="transparent")
-        row_frame.pack(fill="x", padx=10, pady=5)
-
-        # Date
-        date_str = report.get("created_at", "")
-        date_display = "Unknown"
-        if date_str:
-            try:
-                date_obj = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-                date_display = date_obj.strftime("%Y-%m-%d %H:%M")
-            except ValueError:
-                date_display = date_str
-
-        date_label = ctk.CTkLabel(
-            row_frame,
-            text=date_display,
-            font=ctk.CTkFont(size=14),
-            width=150,
-            anchor="w",
-        )
-        date_label.pack(side="left", padx=5)
-
-        # Title
-        title = report.get("title", "Untitled Report")
-        title_label = ctk.CTkLabel(
-            row_frame,
-            text=title,
-            font=ctk.CTkFont(size=14),
-            width=300,
-            anchor="w",
+            self.reports_table.show_message(f"Error loading reports: {str(e)}", "red")
+
+        db = self.app.db
+        self.reports_table.empty_text = f"No {self.report_type_var.get()} reports found"
+        self.reports_table.set_rows([])
+        self.reports_table.show_message("Loading...")
+        self.loader.load(
+            "reports",
+            lambda: db.get_reports(filters=filters, order_by="-created_at") or [],
+            self.reports_table.set_rows,
+            on_error,
         )
-        title_label.pack(side="left", padx=5)
 
-        # Format
-        format_label = ctk.CTkLabel(
-            row_frame,
-            text=report.get("format", "PDF").upper(),
-            font=ctk.CTkFont(size=14),
-            width=80,
-            anchor="w",
-        )
-        format_label.pack(side="left", padx=5)
-
-        # Status
-        status = report.get("status", "completed")
-        status_color = "green" if status == "completed" else "orange"
-        status_label = ctk.CTkLabel(
-            row_frame,
-            text=status.capitalize(),
-            font=ctk.CTkFont(size=14),
-            text_color=status_color,
-            width=100,
-            anchor="w",
-        )
-        status_label.pack(side="left", padx=5)
-
-        # Actions
-        actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent", width=150)
-        actions_frame.pack(side="left", padx=5)
-
-        download_button = ctk.CTkButton(
-            actions_frame,
-            text="Download",
-            width=80,
-            height=24,
-            font=ctk.CTkFont(size=12),
-            command=lambda r=report: self._on_download_report(r),
-        )
-        download_button.pack(side="left", padx=(0, 5))
-
-        delete_button = ctk.CTkButton(
-            actions_frame,
-            text="Delete",
-            width=60,
-            height=24,
-            font=ctk.CTkFont(size=12),
-            fg_color="red",
-            command=lambda r=report: self._on_delete_report(r),
-        )
-        delete_button.pack(side="left")
+    def _format_report_date(self, report: Dict[str, Any]) -> str:
+        """Format a report's creation time for the date column."""
+        date_str = report.get("created_at", "")
+        if not date_str:
+            return "Unknown"
+        try:
+            date_obj = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+            return date_obj.strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            return date_str
 
     def _on_report_type_change(self, value):
         """Handle report type change."""
@@ -1112,7 +1040,7 @@ class ReportsView(ctk.CTkFrame):
     def _on_generate_report(self):
         """Handle generate report button click."""
         # Hide reports list
-        self.reports_list_frame.grid_forget()
+        self.reports_table.grid_forget()
 
         # Map report type selection to API filter
         report_type_map = {
@@ -1211,7 +1139,7 @@ class ReportsView(ctk.CTkFrame):
             self.current_form = None
 
         # Show reports list again
-        self.reports_list_frame.grid(row=0, column=0, sticky="nsew")
+        self.reports_table.grid(row=0, column=0, sticky="nsew")
 
 
 from datetime import timedelta  # Import needed for date calculations
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""Per-call latency of connection-per-call vs. persistent SQLite connections.
+
+Run from the desktop directory:
+
+    python -m benchmarks.bench_db_connection [--rows 10000] [--calls 5000]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from app.db.connection import ConnectionManager
+
+
+def _setup(db_path: str, rows: int) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE patients (id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, updated_at TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO patients (first_name, last_name, updated_at) VALUES (?, ?, ?)",
+        ((f"First{i}", f"Last{i}", "2024-01-01") for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _per_call_read(db_path: str, patient_id: int) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("SELECT * FROM patients WHERE id = ?", (patient_id,)).fetchone()
+    conn.close()
+
+
+def _per_call_write(db_path: str, patient_id: int) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE patients SET updated_at = ? WHERE id = ?", ("2024-01-02", patient_id))
+    conn.commit()
+    conn.close()
+
+
+def _timed(fn, calls: int, rows: int) -> list:
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        fn(i % rows + 1)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _report(label: str, samples: list) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<32} median {statistics.median(samples):8.1f} us   p95 {p95:8.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _setup(db_path, args.rows)
+
+        _report("read, connection per call", _timed(lambda i: _per_call_read(db_path, i), args.calls, args.rows))
+        _report("write, connection per call", _timed(lambda i: _per_call_write(db_path, i), args.calls, args.rows))
+
+        manager = ConnectionManager(db_path)
+
+        def managed_read(i):
+            manager.execute("SELECT * FROM patients WHERE id = ?", (i,)).fetchone()
+
+        def managed_write(i):
+            with manager.transaction() as conn:
+                conn.execute("UPDATE patients SET updated_at = ? WHERE id = ?", ("2024-01-03", i))
+
+        _report("read, persistent connection", _timed(managed_read, args.calls, args.rows))
+        _report("write, persistent connection", _timed(managed_write, args.calls, args.rows))
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Request latency with a client per request vs. the shared connection pool.
+
+Starts a local HTTP/1.1 keep-alive server with an artificial handshake cost
+(``--connect-ms``, standing in for TCP + TLS setup on a slow link) and issues
+``--requests`` sequential requests each way.
+
+Run from the desktop directory:
+
+    python -m benchmarks.bench_http_pool [--requests 200] [--connect-ms 50]
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from app.network.http_transport import HTTPTransport
+
+
+def _server(connect_ms: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self) -> None:
+            time.sleep(connect_ms / 1000)
+            super().setup()
+
+        def do_GET(self) -> None:
+            body = b'{"status":"healthy"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _client_per_request(url: str, requests: int) -> None:
+    for _ in range(requests):
+        async with httpx.AsyncClient() as client:
+            (await client.get(url)).raise_for_status()
+
+
+async def _shared(http: HTTPTransport, url: str, requests: int) -> None:
+    for _ in range(requests):
+        (await http.async_client.get(url)).raise_for_status()
+    await http.aclose()
+
+
+def _report(label: str, requests: int, elapsed: float, connections: str) -> None:
+    print(f"{label:<22} {elapsed:7.2f} s   {elapsed / requests * 1000:7.2f} ms/request   {connections}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--connect-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    server = _server(args.connect_ms)
+    url = f"http://127.0.0.1:{server.server_address[1]}/health"
+
+    start = time.perf_counter()
+    asyncio.run(_client_per_request(url, args.requests))
+    _report("client per request", args.requests, time.perf_counter() - start, f"{args.requests} connections")
+
+    http = HTTPTransport()
+    start = time.perf_counter()
+    asyncio.run(_shared(http, url, args.requests))
+    metrics = http.get_metrics()
+    _report(
+        "shared pool",
+        args.requests,
+        time.perf_counter() - start,
+        f"{metrics['connections_opened']} connections, reuse ratio {metrics['reuse_ratio']:.3f}",
+    )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Outbox query latency at scale, before and after the local schema migrations.
+
+Run from the desktop directory:
+
+    python -m benchmarks.bench_outbox [--rows 100000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app.db.connection import ConnectionManager
+from app.db.migrations import migrate
+from app.sync.sync_manager import SyncManager, SyncStatus
+
+QUERIES = {
+    "claim push batch": (
+        "SELECT id, entity_type, entity_id, operation_type, data, retry_count FROM sync_outbox "
+        "WHERE status = ? OR (status = ? AND next_attempt_at <= ?) ORDER BY created_at LIMIT 100",
+        lambda: (SyncStatus.PENDING.value, SyncStatus.ERROR.value, datetime.now().isoformat()),
+    ),
+    "get_pending_changes": (
+        "SELECT * FROM sync_outbox WHERE status IN (?, ?) ORDER BY created_at",
+        lambda: (SyncStatus.PENDING.value, SyncStatus.ERROR.value),
+    ),
+    "get_conflicts": (
+        "SELECT * FROM sync_outbox WHERE status = ? ORDER BY created_at",
+        lambda: (SyncStatus.CONFLICT.value,),
+    ),
+    "temp id (MIN scan)": (
+        "SELECT MIN(entity_id) FROM sync_outbox WHERE entity_type = ? AND entity_id < 0",
+        lambda: ("patients",),
+    ),
+}
+
+
+def _fill(connections: ConnectionManager, rows: int) -> None:
+    statuses = (
+        [SyncStatus.SYNCED.value] * 97
+        + [SyncStatus.PENDING.value, SyncStatus.ERROR.value, SyncStatus.CONFLICT.value]
+    )
+    start = datetime(2024, 1, 1)
+    with connections.transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO sync_outbox (
+                id, entity_type, entity_id, operation_type, data, status,
+                created_at, updated_at, idempotency_key, next_attempt_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    str(uuid.uuid4()),
+                    random.choice(["patients", "appointments", "clinical_notes"]),
+                    -i if i % 10 == 0 else i,
+                    "update",
+                    '{"first_name": "Test"}',
+                    random.choice(statuses),
+                    (start + timedelta(seconds=i)).isoformat(),
+                    (start + timedelta(seconds=i)).isoformat(),
+                    str(uuid.uuid4()),
+                    (start + timedelta(seconds=i)).isoformat(),
+                )
+                for i in range(1, rows + 1)
+            ),
+        )
+
+
+def _time_queries(connections: ConnectionManager, repeat: int = 20) -> dict:
+    timings = {}
+    for label, (sql, params) in QUERIES.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            connections.execute(sql, params()).fetchall()
+        timings[label] = (time.perf_counter() - start) / repeat * 1000
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connections = ConnectionManager(os.path.join(tmp, "bench.db"))
+        manager = SyncManager(os.path.join(tmp, "bench.db"), "http://localhost", connections=connections)
+        _fill(connections, args.rows)
+        connections.execute("ANALYZE")
+
+        before = _time_queries(connections)
+        migrate(connections)
+        connections.execute("ANALYZE")
+        after = _time_queries(connections)
+
+        # Temp IDs now come from the counter table
+        cursor = connections.connection().cursor()
+        start = time.perf_counter()
+        with connections.transaction():
+            for _ in range(1000):
+                manager._allocate_temp_id(cursor, "patients")
+        # Seconds for 1000 calls is milliseconds per call
+        after["temp id (counter table)"] = time.perf_counter() - start
+
+        print(f"{args.rows} outbox rows, ms per call")
+        print(f"{'query':<26}{'before':>10}{'after':>10}")
+        for label in after:
+            print(f"{label:<26}{before.get(label, float('nan')):>10.3f}{after[label]:>10.3f}")
+        connections.close()
+
+
+if __name__ == "__main__":
+    main()
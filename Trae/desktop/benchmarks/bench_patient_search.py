@@ -0,0 +1,103 @@
+"""Patient search latency at 100k patients, full-text index vs. LIKE.
+
+Seeds a temporary database with ``--rows`` patients, then times what the
+patients view runs per keystroke: the match count and the first page of
+results. Each query is timed through ``Database`` with the search index, and
+again with the index switched off so the old ``LIKE '%q%'`` scan runs.
+
+Run from the desktop directory:
+
+    python -m benchmarks.bench_patient_search [--rows 100000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.db.database import Database
+
+FIRST_NAMES = ["James", "Mary", "Thandi", "Sipho", "Anna", "José", "Li", "Fatima", "Pieter", "Noah",
+               "Olivia", "Lerato", "Ahmed", "Chen", "Grace", "Johan", "Zanele", "Liam", "Emma", "Ravi"]
+LAST_NAMES = ["Smith", "Nkosi", "van der Merwe", "García", "Wang", "Naidoo", "Botha", "Dlamini", "Khan",
+              "Müller", "Brown", "Mokoena", "Pillay", "Jones", "Ndlovu", "Patel", "Williams", "Zulu"]
+
+# (label, query) pairs: common and rare names, prefixes, phone, email and insurance ID
+QUERIES = [
+    ("common name", "smith"),
+    ("first + last", "mary nkosi"),
+    ("short prefix", "jo"),
+    ("rare last name", "Last09990"),
+    ("phone prefix", "0821"),
+    ("email", "thandi.dlamini"),
+    ("insurance id", "MED-0004242"),
+    ("no match", "xyzzy"),
+]
+
+
+def _seed(db: Database, rows: int) -> None:
+    rng = random.Random(42)
+    patients = []
+    for i in range(rows):
+        first = rng.choice(FIRST_NAMES)
+        # Every tenth patient gets a unique surname to search for
+        last = f"Last{i:05d}" if i % 10 == 0 else rng.choice(LAST_NAMES)
+        patients.append(
+            (
+                first,
+                last,
+                f"08{rng.randrange(10**8):08d}",
+                f"{first.lower()}.{last.lower().replace(' ', '')}{i}@example.com",
+                f"MED-{i:07d}",
+            )
+        )
+    with db.transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO patients (first_name, last_name, date_of_birth, gender, phone, email,
+                                  insurance_id, created_at, updated_at)
+            VALUES (?, ?, '1980-01-01', 'Female', ?, ?, ?, '2024-01-01', '2024-01-01')
+            """,
+            patients,
+        )
+
+
+def _time(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def _search(db: Database, query: str) -> int:
+    count = db.count_patients(search=query)
+    db.get_patients(limit=100, search=query)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(db_path=os.path.join(tmp, "bench.db"))
+        _seed(db, args.rows)
+
+        print(f"{'query':<16} {'matches':>8} {'indexed':>10} {'LIKE':>10}")
+        for label, query in QUERIES:
+            db._patient_search_indexed = True
+            matches = _search(db, query)
+            indexed = _time(lambda: _search(db, query), args.repeat)
+            db._patient_search_indexed = False
+            like = _time(lambda: _search(db, query), args.repeat)
+            print(f"{label:<16} {matches:8d} {indexed:8.2f}ms {like:8.2f}ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Throughput of applying pulled patients: per-row statements vs. bulk upsert.
+
+Run from the desktop directory:
+
+    python -m benchmarks.bench_pull_apply [--patients 50000]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from app.db.database import Database
+
+
+def _patients(count: int, offset: int = 0) -> list:
+    return [
+        {
+            "id": offset + i,
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "date_of_birth": "1980-01-01",
+            "gender": "female",
+            "phone": f"555-{i:07d}",
+            "email": f"patient{i}@example.com",
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-01T00:00:00",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _apply_per_row(db_path: str, data: list) -> None:
+    """The previous implementation: existence check and PRAGMA per item."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for item in data:
+        cursor.execute("SELECT id FROM patients WHERE id = ?", (item["id"],))
+        exists = cursor.fetchone() is not None
+        cursor.execute("PRAGMA table_info(patients)")
+        columns = [row[1] for row in cursor.fetchall() if row[1] != "id"]
+        filtered = {k: v for k, v in item.items() if k in columns}
+        if exists:
+            set_clause = ", ".join(f"{col} = ?" for col in filtered)
+            cursor.execute(
+                f"UPDATE patients SET {set_clause}, last_synced_at = ? WHERE id = ?",
+                [*filtered.values(), datetime.now().isoformat(), item["id"]],
+            )
+        else:
+            columns_str = ", ".join(["id", *filtered, "last_synced_at"])
+            placeholders = ", ".join(["?"] * (len(filtered) + 2))
+            cursor.execute(
+                f"INSERT INTO patients ({columns_str}) VALUES ({placeholders})",
+                [item["id"], *filtered.values(), datetime.now().isoformat()],
+            )
+    conn.commit()
+    conn.close()
+
+
+def _report(label: str, rows: int, elapsed: float) -> None:
+    print(f"{label:<28} {elapsed:8.2f} s   {rows / elapsed:10.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = _patients(args.patients)
+
+        legacy_path = os.path.join(tmp, "legacy.db")
+        Database(db_path=legacy_path, api_url="http://localhost").close()
+        start = time.perf_counter()
+        _apply_per_row(legacy_path, data)
+        _report("per-row, initial sync", len(data), time.perf_counter() - start)
+        start = time.perf_counter()
+        _apply_per_row(legacy_path, data)
+        _report("per-row, re-sync", len(data), time.perf_counter() - start)
+
+        db = Database(db_path=os.path.join(tmp, "bulk.db"), api_url="http://localhost")
+        start = time.perf_counter()
+        asyncio.run(db.sync_manager._process_pulled_data("patients", data))
+        _report("bulk upsert, initial sync", len(data), time.perf_counter() - start)
+        start = time.perf_counter()
+        asyncio.run(db.sync_manager._process_pulled_data("patients", data))
+        _report("bulk upsert, re-sync", len(data), time.perf_counter() - start)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Desktop startup time: module import cost and time to first frame.
+
+Runs the client in fresh interpreters against a temporary data directory:
+
+* ``python -X importtime -c "import main"``, reporting total import time
+  and the slowest modules by cumulative time. Importing ``app.app`` includes
+  constructing the global ``EiraApp``, which opens and migrates the database.
+* Time to first frame: from interpreter start until the first window has
+  been built and ``update()`` has drawn it, median over ``--repeat`` runs.
+  ``--signed-in`` starts with a session, so the main window and dashboard
+  are drawn instead of the login window.
+
+The API URL points at a closed port, so no sync runs. Needs a display; on a
+headless machine run it under ``xvfb-run``.
+
+Run from the desktop directory:
+
+    python -m benchmarks.bench_startup [--repeat 5] [--top 15] [--signed-in]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DESKTOP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in the child: build the window, draw it once, then shut down cleanly
+FIRST_FRAME_SCRIPT = """
+import sys, time
+import main
+
+if sys.argv[2] == "signed-in":
+    async def signed_in():
+        main.app.auth_token = "benchmark"
+        main.app.current_user = {"full_name": "Benchmark User", "role": "clinician"}
+    main.app._load_auth_token = signed_in
+
+window = main.EiraDesktopApp()
+window.update()
+print(time.time() - float(sys.argv[1]))
+window.on_closing()
+"""
+
+
+def _environment(data_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        DB_PATH=os.path.join(data_dir, "eira.db"),
+        LOG_DIR=os.path.join(data_dir, "logs"),
+        CACHE_DIR=os.path.join(data_dir, "cache"),
+        API_URL="http://127.0.0.1:9",
+        TOKEN_STORAGE="memory",
+    )
+    return env
+
+
+def _import_times(env: dict):
+    """(cumulative microseconds, module) pairs from ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=DESKTOP_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level
+        times.append((int(cumulative), module[1:].rstrip()))
+    return times
+
+
+def _first_frame(env: dict, mode: str) -> float:
+    # Wall-clock time from spawning the interpreter, so its startup counts too
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_FRAME_SCRIPT, repr(time.time()), mode],
+        cwd=DESKTOP_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--signed-in", action="store_true")
+    args = parser.parse_args()
+    mode = "signed-in" if args.signed_in else "login"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _environment(tmp)
+        # A first run creates the database, so later runs measure a warm start
+        _first_frame(env, mode)
+
+        times = _import_times(env)
+        top_level = sum(cumulative for cumulative, module in times if not module.startswith(" "))
+        main_import = next(cumulative for cumulative, module in times if module == "main")
+        print(f"import main: {main_import / 1000:.1f}ms "
+              f"({top_level / 1000:.1f}ms including interpreter startup imports)")
+        print(f"{'module':<50} {'cumulative':>12}")
+        for cumulative, module in sorted(times, reverse=True)[: args.top]:
+            print(f"{module.strip():<50} {cumulative / 1000:10.1f}ms")
+
+        samples = [_first_frame(env, mode) for _ in range(args.repeat)]
+        print(f"\nfirst frame ({mode}): {statistics.median(samples) * 1000:.0f}ms median, "
+              f"{min(samples) * 1000:.0f}ms best of {args.repeat}")
+
+
+if __name__ == "__main__":
+    main()
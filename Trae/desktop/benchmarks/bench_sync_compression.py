@@ -0,0 +1,169 @@
+"""Bytes on the wire and wall time of a 10k-change sync, with and without gzip.
+
+The server is simulated in-process and every request and response is delayed
+by its size on the wire over a link of ``--kbps`` kilobits per second, which
+is what dominates sync time on a slow hotspot.
+
+Run from the desktop directory:
+
+    python -m benchmarks.bench_sync_compression [--changes 10000] [--kbps 2000]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from app.db.database import Database
+from app.network.http_transport import HTTPTransport
+from app.sync.sync_manager import OperationType
+
+COMPLAINTS = ["Headache", "Lower back pain", "Persistent cough", "Follow-up", "Fatigue"]
+PHRASES = [
+    "Patient reports symptoms for the past {n} days.",
+    "No known drug allergies.",
+    "Vital signs within normal limits.",
+    "Advised rest, fluids and review in {n} weeks.",
+    "Blood pressure {n}0/80 mmHg, pulse {n}2 bpm.",
+    "Denies fever, chills or night sweats.",
+]
+
+
+def _text(rng: random.Random, sentences: int) -> str:
+    return " ".join(rng.choice(PHRASES).format(n=rng.randint(1, 9)) for _ in range(sentences))
+
+
+def _patient(rng: random.Random, i: int) -> dict:
+    return {
+        "id": i,
+        "first_name": f"First{i}",
+        "last_name": f"Last{rng.randint(1, 5000)}",
+        "date_of_birth": f"19{rng.randint(40, 99)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        "gender": rng.choice(["female", "male"]),
+        "phone": f"555-{rng.randint(0, 9999999):07d}",
+        "email": f"patient{i}@example.com",
+        "address": f"{rng.randint(1, 999)} Main Street",
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-06-01T12:00:00",
+    }
+
+
+def _note(rng: random.Random, i: int) -> dict:
+    return {
+        "id": i,
+        "patient_id": rng.randint(1, 5000),
+        "user_id": 1,
+        "visit_date": "2024-06-01T09:30:00",
+        "chief_complaint": rng.choice(COMPLAINTS),
+        "history_of_present_illness": _text(rng, 4),
+        "physical_examination": _text(rng, 3),
+        "assessment": _text(rng, 2),
+        "plan": _text(rng, 2),
+        "created_at": "2024-06-01T09:30:00",
+        "updated_at": "2024-06-01T10:00:00",
+    }
+
+
+def _changes(count: int) -> list:
+    rng = random.Random(42)
+    return [
+        ("patients", i, _patient(rng, i)) if i % 2 else ("clinical_notes", i, _note(rng, i))
+        for i in range(1, count + 1)
+    ]
+
+
+class SimulatedServer:
+    """Answers push and pull requests, charging each body's size against the link."""
+
+    def __init__(self, kbps: int, pull_data: dict, gzip_responses: bool):
+        self.gzip_responses = gzip_responses
+        self.bytes_per_second = kbps * 1000 / 8
+        self.pull_body = json.dumps(pull_data, separators=(",", ":")).encode("utf-8")
+        self.pull_body_gzip = gzip.compress(self.pull_body, compresslevel=6)
+        self.wire_bytes = {"sent": 0, "received": 0}
+
+    async def _transfer(self, size: int) -> None:
+        await asyncio.sleep(size / self.bytes_per_second)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        body = request.read()
+        self.wire_bytes["sent"] += len(body)
+        await self._transfer(len(body))
+        if request.headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        payload = json.loads(body)
+
+        if request.url.path.endswith("/sync/push"):
+            content = json.dumps(
+                {"processed": [{"success": True}] * len(payload["changes"])}
+            ).encode("utf-8")
+        else:
+            content = self.pull_body
+
+        headers = {"Content-Type": "application/json"}
+        accepts_gzip = "gzip" in request.headers.get("accept-encoding", "")
+        if self.gzip_responses and accepts_gzip and len(content) >= 1024:
+            content = self.pull_body_gzip if content is self.pull_body else gzip.compress(content)
+            headers["Content-Encoding"] = "gzip"
+
+        self.wire_bytes["received"] += len(content)
+        await self._transfer(len(content))
+        return httpx.Response(200, headers=headers, stream=httpx.ByteStream(content))
+
+
+async def _sync(tmp: str, label: str, changes: list, kbps: int, compress: bool) -> None:
+    pull_data = {
+        "patients": [data for entity_type, _, data in changes if entity_type == "patients"],
+        "clinical_notes": [data for entity_type, _, data in changes if entity_type == "clinical_notes"],
+    }
+    server = SimulatedServer(kbps, pull_data, gzip_responses=compress)
+    http = HTTPTransport(transport=httpx.MockTransport(server.handle))
+
+    db = Database(db_path=os.path.join(tmp, f"{label}.db"), api_url="http://server", http=http)
+    manager = db.sync_manager
+    manager.auth_token = "token"
+    if not compress:
+        # Never reach the gzip threshold
+        manager.compress_min_bytes = float("inf")
+
+    for entity_type, entity_id, data in changes:
+        manager.queue_change(entity_type, OperationType.UPDATE, entity_id, data)
+
+    start = time.perf_counter()
+    await manager._push_changes()
+    push_time = time.perf_counter() - start
+    push_received = server.wire_bytes["received"]
+    start = time.perf_counter()
+    await manager._pull_changes()
+    pull_time = time.perf_counter() - start
+
+    metrics = manager.get_sync_metrics()
+    print(
+        f"{label:<12} push {metrics['request_bytes'] / 1e6:7.2f} MB json -> "
+        f"{server.wire_bytes['sent'] / 1e6:6.2f} MB sent {push_time:7.2f} s   "
+        f"pull {len(server.pull_body) / 1e6:6.2f} MB json -> "
+        f"{(server.wire_bytes['received'] - push_received) / 1e6:6.2f} MB received {pull_time:7.2f} s"
+    )
+    db.close()
+    await http.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--changes", type=int, default=10000)
+    parser.add_argument("--kbps", type=int, default=2000, help="simulated link speed")
+    args = parser.parse_args()
+
+    changes = _changes(args.changes)
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_sync(tmp, "plain", changes, args.kbps, compress=False))
+        asyncio.run(_sync(tmp, "gzip", changes, args.kbps, compress=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""First-paint time of a 10k-row patient list, frame-per-row vs. VirtualTable.
+
+Seeds a temporary database with ``--rows`` patients, then times building the
+list until Tk has laid it out and drawn it, once the way the views used to
+(a frame, four labels and two buttons per row inside a ``CTkScrollableFrame``)
+and once with the virtualized table. Needs a display.
+
+Run from the desktop directory:
+
+    python -m benchmarks.bench_virtual_table [--rows 10000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import customtkinter as ctk
+
+from app.db.database import Database
+from app.ui.components.virtual_table import VirtualTable
+
+COLUMNS = [
+    {"title": "Name", "width": 250, "text": lambda p: f"{p['first_name']} {p['last_name']}"},
+    {"title": "DOB", "width": 100, "text": lambda p: p["date_of_birth"]},
+    {"title": "Gender", "width": 100, "text": lambda p: p["gender"]},
+    {"title": "Phone", "width": 150, "text": lambda p: p["phone"]},
+]
+ACTIONS = [
+    {"text": "View", "width": 60, "command": lambda p: None},
+    {"text": "Edit", "width": 60, "command": lambda p: None},
+]
+
+
+def _seed(db: Database, rows: int) -> None:
+    with db.transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO patients (first_name, last_name, date_of_birth, gender, phone,
+                                  created_at, updated_at)
+            VALUES (?, ?, '1980-01-01', 'Female', ?, '2024-01-01', '2024-01-01')
+            """,
+            [(f"First{i}", f"Last{i:05d}", f"555-{i:07d}") for i in range(rows)],
+        )
+
+
+def _frame_per_row(root: ctk.CTk, db: Database, rows: int) -> ctk.CTkFrame:
+    frame = ctk.CTkScrollableFrame(root)
+    frame.pack(fill="both", expand=True)
+    for patient in db.get_patients(limit=rows):
+        row_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        row_frame.pack(fill="x", padx=10, pady=5)
+        for column in COLUMNS:
+            ctk.CTkLabel(row_frame, text=column["text"](patient), width=column["width"], anchor="w").pack(
+                side="left", padx=5
+            )
+        for action in ACTIONS:
+            ctk.CTkButton(row_frame, text=action["text"], width=action["width"], height=24).pack(side="left")
+    return frame
+
+
+def _virtual(root: ctk.CTk, db: Database, rows: int) -> ctk.CTkFrame:
+    table = VirtualTable(
+        root,
+        columns=COLUMNS,
+        actions=ACTIONS,
+        fetch_page=lambda offset, limit: db.get_patients(skip=offset, limit=limit),
+        count=db.count_patients,
+    )
+    table.pack(fill="both", expand=True)
+    table.refresh()
+    return table
+
+
+def _first_paint(label: str, build, db: Database, rows: int) -> None:
+    root = ctk.CTk()
+    root.geometry("1000x700")
+    root.update()
+
+    start = time.perf_counter()
+    widget = build(root, db, rows)
+    root.update()
+    elapsed = time.perf_counter() - start
+
+    widgets = sum(1 for _ in _descendants(widget))
+    print(f"{label:<16} {elapsed * 1000:9.1f} ms first paint   {widgets:7d} widgets")
+    root.destroy()
+
+
+def _descendants(widget):
+    for child in widget.winfo_children():
+        yield child
+        yield from _descendants(child)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(db_path=os.path.join(tmp, "bench.db"))
+        _seed(db, args.rows)
+        _first_paint("frame per row", _frame_per_row, db, args.rows)
+        _first_paint("virtual table", _virtual, db, args.rows)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
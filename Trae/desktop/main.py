@@ -11,28 +11,32 @@ import customtkinter as ctk
 
 from app.app import app
 from app.core.config import settings
-from app.ui.login_window import LoginWindow
-from app.ui.main_window import MainWindow
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler(
-            os.path.join(settings.LOG_DIR, "eira.log"),
-            encoding="utf-8",
-        ),
-    ],
-)
 
 logger = logging.getLogger(__name__)
 
 
+def configure_logging():
+    """Log to stdout and to eira.log in LOG_DIR."""
+    Path(settings.LOG_DIR).mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler(
+                os.path.join(settings.LOG_DIR, "eira.log"),
+                encoding="utf-8",
+            ),
+        ],
+    )
+
+
 class EiraDesktopApp(ctk.CTk):
     """Main desktop application class."""
 
+    # How often asyncio tasks (sync, uploads) get a turn between Tk events
+    ASYNC_POLL_MS = 20
+
     def __init__(self):
         super().__init__()
 
@@ -60,11 +64,24 @@ class EiraDesktopApp(ctk.CTk):
         else:
             self.show_main_window()
 
+        # Run the event loop's tasks alongside the Tk main loop, and start
+        # syncing once the first frame has been drawn
+        self._async_poll_id = self.after(self.ASYNC_POLL_MS, self._run_async_tasks)
+        self.after_idle(lambda: self.loop.call_soon(app.start_background_sync))
+
         # Set up clean shutdown
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    def _run_async_tasks(self):
+        """Run the asyncio callbacks that are ready, then reschedule."""
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self._async_poll_id = self.after(self.ASYNC_POLL_MS, self._run_async_tasks)
+
     def show_login_window(self):
         """Show the login window."""
+        from app.ui.login_window import LoginWindow
+
         # Clear any existing frames
         for widget in self.winfo_children():
             widget.destroy()
@@ -75,6 +92,8 @@ class EiraDesktopApp(ctk.CTk):
 
     def show_main_window(self):
         """Show the main application window."""
+        from app.ui.main_window import MainWindow
+
         # Clear any existing frames
         for widget in self.winfo_children():
             widget.destroy()
@@ -90,6 +109,7 @@ class EiraDesktopApp(ctk.CTk):
     def on_closing(self):
         """Handle application closing."""
         logger.info("Application closing")
+        self.after_cancel(self._async_poll_id)
         # Run shutdown tasks
         self.loop.run_until_complete(app.shutdown())
         self.destroy()
@@ -97,6 +117,7 @@ class EiraDesktopApp(ctk.CTk):
 
 def main():
     """Main entry point for the application."""
+    configure_logging()
     app_instance = EiraDesktopApp()
     app_instance.mainloop()
 
@@ -0,0 +1,134 @@
+"""API client response cache: LRU eviction, per-user scoping and revalidation.
+
+Run from the desktop directory:
+
+    python -m unittest discover tests
+"""
+import asyncio
+import itertools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+
+from app.api.client import APIClient, APIError
+from app.api.response_cache import ResponseCache
+from app.network.http_transport import HTTPTransport
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.tmp.name, "cache.db"), ttl=60, max_bytes=10)
+        # A distinct time per call, so access order is unambiguous
+        clock = itertools.count(1000)
+        patcher = mock.patch("app.api.response_cache.time.time", lambda: next(clock))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_least_recently_used_entries_go_first_over_the_size_cap(self):
+        self.cache.put("a", b"aaaa")
+        self.cache.put("b", b"bbbb")
+        self.cache.get("a")
+        self.cache.put("c", b"cccc")
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a")["body"], b"aaaa")
+        self.assertEqual(self.cache.get("c")["body"], b"cccc")
+
+    def test_body_larger_than_the_cache_is_not_stored(self):
+        self.cache.put("a", b"aaaa")
+        self.cache.put("big", b"x" * 11)
+
+        self.assertIsNone(self.cache.get("big"))
+        self.assertIsNotNone(self.cache.get("a"))
+
+    def test_retain_keeps_only_one_scope(self):
+        self.cache.put("alice /patients", b"a")
+        self.cache.put("bob /patients", b"b")
+
+        self.cache.retain("alice ")
+
+        self.assertIsNotNone(self.cache.get("alice /patients"))
+        self.assertIsNone(self.cache.get("bob /patients"))
+
+
+class CachedClientTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.requests = []
+        self.offline = False
+        self.version = "1"
+        cache = ResponseCache(os.path.join(self.tmp.name, "cache.db"), ttl=60, max_bytes=1 << 20)
+        http = HTTPTransport(transport=httpx.MockTransport(self._handle))
+        self.api = APIClient(base_url="http://api", token="alice", http=http, cache=cache)
+
+    def tearDown(self):
+        self.api.cache.close()
+        self.tmp.cleanup()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        if self.offline:
+            raise httpx.ConnectError("offline", request=request)
+        self.requests.append((request.url.path, request.headers.get("If-None-Match")))
+        etag = f'W/"{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        owner = request.headers["Authorization"].split()[-1]
+        return httpx.Response(200, json={"owner": owner, "version": self.version}, headers={"ETag": etag})
+
+    def _get(self, endpoint="api/v1/patients/1", **kwargs):
+        return asyncio.run(self.api._request("get", endpoint, **kwargs))
+
+    def test_unchanged_response_is_revalidated_and_reused(self):
+        self.assertEqual(self._get()["version"], "1")
+        self.assertEqual(self._get()["version"], "1")
+        self.version = "2"
+        self.assertEqual(self._get()["version"], "2")
+
+        self.assertEqual(
+            [validator for _, validator in self.requests],
+            [None, 'W/"1"', 'W/"1"'],
+        )
+
+    def test_fresh_entry_is_served_without_a_request(self):
+        self._get(cache_ttl=60)
+        self._get(cache_ttl=60)
+
+        self.assertEqual(len(self.requests), 1)
+
+    def test_cached_response_is_served_offline(self):
+        self._get()
+        self.offline = True
+
+        self.assertEqual(self._get()["owner"], "alice")
+
+    def test_responses_are_not_shared_between_users(self):
+        self._get()
+        self.api.set_token("bob")
+
+        self.assertEqual(self._get()["owner"], "bob")
+        self.assertEqual(self.requests[-1], ("/api/v1/patients/1", None))
+
+        # Signing in as someone else dropped the other user's responses
+        self.api.set_token("alice")
+        self.offline = True
+        with self.assertRaises(APIError):
+            self._get()
+
+    def test_current_user_is_never_cached(self):
+        asyncio.run(self.api.get_current_user())
+        self.offline = True
+
+        with self.assertRaises(APIError):
+            asyncio.run(self.api.get_current_user())
+
+
+if __name__ == "__main__":
+    unittest.main()
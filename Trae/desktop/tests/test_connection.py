@@ -0,0 +1,94 @@
+"""SQLite connection manager: per-thread connections, transactions and commit hooks.
+
+Run from the desktop directory:
+
+    python -m unittest discover tests
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from app.db.connection import ConnectionManager
+
+
+class ConnectionManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.connections = ConnectionManager(os.path.join(self.tmp.name, "eira.db"))
+        self.connections.execute("CREATE TABLE items (name TEXT)")
+
+    def tearDown(self):
+        self.connections.close()
+        self.tmp.cleanup()
+
+    def _names(self):
+        return [row["name"] for row in self.connections.execute("SELECT name FROM items ORDER BY rowid")]
+
+    def test_connection_is_reused_per_thread(self):
+        conn = self.connections.connection()
+        self.assertIs(self.connections.connection(), conn)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.connections.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_nested_transaction_joins_the_outer_one(self):
+        with self.assertRaises(RuntimeError):
+            with self.connections.transaction():
+                self.connections.execute("INSERT INTO items VALUES ('outer')")
+                with self.connections.transaction():
+                    self.connections.execute("INSERT INTO items VALUES ('inner')")
+                # Leaving the inner block does not commit
+                self.assertTrue(self.connections.connection().in_transaction)
+                raise RuntimeError("rolled back")
+
+        self.assertEqual(self._names(), [])
+
+        with self.connections.transaction():
+            self.connections.execute("INSERT INTO items VALUES ('outer')")
+            with self.connections.transaction():
+                self.connections.execute("INSERT INTO items VALUES ('inner')")
+        self.assertEqual(self._names(), ["outer", "inner"])
+
+    def test_on_commit_runs_after_the_outermost_commit(self):
+        calls = []
+        with self.connections.transaction():
+            with self.connections.transaction():
+                self.connections.on_commit(lambda: calls.append("inner"))
+            self.connections.on_commit(lambda: calls.append("outer"))
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ["inner", "outer"])
+
+        # Outside a transaction the write has committed already
+        self.connections.on_commit(lambda: calls.append("now"))
+        self.assertEqual(calls, ["inner", "outer", "now"])
+
+    def test_on_commit_callbacks_are_dropped_on_rollback(self):
+        calls = []
+        with self.assertRaises(RuntimeError):
+            with self.connections.transaction():
+                self.connections.on_commit(lambda: calls.append("rolled back"))
+                raise RuntimeError("rolled back")
+
+        with self.connections.transaction():
+            self.connections.on_commit(lambda: calls.append("committed"))
+        self.assertEqual(calls, ["committed"])
+
+    def test_cancellable_aborts_only_queries_inside_the_block(self):
+        cancelled = threading.Event()
+        cancelled.set()
+        slow = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n LIMIT 1000000) SELECT COUNT(*) FROM n"
+
+        with self.connections.cancellable(cancelled):
+            with self.assertRaises(sqlite3.OperationalError):
+                self.connections.execute(slow).fetchone()
+        self.assertEqual(self.connections.execute(slow).fetchone()[0], 1000000)
+
+
+if __name__ == "__main__":
+    unittest.main()
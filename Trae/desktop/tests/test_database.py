@@ -0,0 +1,132 @@
+"""Local database: dashboard counts and patient search.
+
+Run from the desktop directory:
+
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from app.db.database import Database
+
+
+class DatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(db_path=os.path.join(self.tmp.name, "eira.db"), api_url="http://api")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _create_patient(self, first_name="Ann", last_name="Lee"):
+        return self.db.create_patient(
+            {"first_name": first_name, "last_name": last_name, "date_of_birth": "1980-01-01", "gender": "Female"}
+        )
+
+    def _in_thread(self, func):
+        """Run ``func`` on another thread, with its own connection, and return its result."""
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func()))
+        thread.start()
+        thread.join()
+        return result[0]
+
+
+class DashboardStatsTest(DatabaseTestCase):
+    def test_counts(self):
+        patient = self._create_patient()
+        self._create_patient("Bob")
+        now = datetime.now()
+        for start in (now.replace(hour=9), now.replace(hour=11), now + timedelta(days=2)):
+            self.db.create_appointment({
+                "patient_id": patient["id"],
+                "user_id": 1,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+                "appointment_type": "follow-up",
+                "status": "scheduled",
+            })
+        self.db.create_clinical_note({"patient_id": patient["id"], "user_id": 1, "visit_date": now.isoformat()})
+
+        self.assertEqual(
+            self.db.get_dashboard_stats(),
+            {
+                "total_patients": 2,
+                "todays_appointments": 2,
+                "recent_notes": 1,
+                "pending_changes": 6,
+                "conflicts": 0,
+                "dead_letter": 0,
+            },
+        )
+
+    def test_cached_counts_follow_committed_writes(self):
+        self._create_patient()
+        self.assertEqual(self.db.get_dashboard_stats()["total_patients"], 1)
+
+        with self.db.connections.transaction():
+            self._create_patient("Bob")
+            # Another thread does not see the uncommitted patient yet
+            self.assertEqual(self._in_thread(self.db.get_dashboard_stats)["total_patients"], 1)
+
+        self.assertEqual(self.db.get_dashboard_stats()["total_patients"], 2)
+
+    def test_rolled_back_write_keeps_the_cache(self):
+        self._create_patient()
+        version = self.db.sync_manager.data_version
+
+        with self.assertRaises(RuntimeError):
+            with self.db.connections.transaction():
+                self._create_patient("Bob")
+                raise RuntimeError("rolled back")
+
+        self.assertEqual(self.db.sync_manager.data_version, version)
+        self.assertEqual(self.db.get_dashboard_stats()["total_patients"], 1)
+
+
+class PatientSearchTest(DatabaseTestCase):
+    def _search(self, search):
+        ids = [patient["id"] for patient in self.db.get_patients(search=search)]
+        self.assertEqual(self.db.count_patients(search=search), len(ids))
+        return ids
+
+    def test_search_matches_word_prefixes_of_indexed_fields(self):
+        ann = self.db.create_patient({
+            "first_name": "Ann", "last_name": "O'Neil", "date_of_birth": "1980-01-01", "gender": "Female",
+            "phone": "(555) 123-4567", "email": "ann@example.com", "insurance_id": "INS-42",
+        })
+        bob = self._create_patient("Bob", "Annan")
+
+        self.assertTrue(self.db._patient_search_indexed)
+        self.assertEqual(sorted(self._search("ann")), sorted([ann["id"], bob["id"]]))
+        self.assertEqual(self._search("ann o'ne"), [ann["id"]])
+        self.assertEqual(self._search("5551234"), [ann["id"]])
+        self.assertEqual(self._search("example"), [ann["id"]])
+        self.assertEqual(self._search("ins 42"), [ann["id"]])
+        # FTS5 syntax in user input is matched literally
+        self.assertEqual(self._search('ann" OR "bob'), [])
+        self.assertEqual(self._search("nn"), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        patient = self._create_patient("Ann")
+
+        self.db.update_patient(patient["id"], {"first_name": "Joan"})
+        self.assertEqual(self._search("ann"), [])
+        self.assertEqual(self._search("joan"), [patient["id"]])
+
+        self.db.delete_patient(patient["id"])
+        self.assertEqual(self._search("joan"), [])
+
+    def test_search_falls_back_to_like_without_the_index(self):
+        patient = self._create_patient("Ann")
+        self.db._patient_search_indexed = False
+
+        self.assertEqual(self._search("nn"), [patient["id"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Background attachment uploads.
+
+Run from the desktop directory:
+
+    python -m unittest discover tests
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+
+from app.db.database import Database
+from app.sync.file_uploader import FileUploadWorker
+
+
+class FakeAPIClient:
+    def __init__(self):
+        self.uploads = []
+
+    async def upload_file(self, entity_id, file_path, file_type):
+        self.uploads.append((entity_id, os.path.basename(file_path), file_type))
+        return {"file_path": f"blobs/{os.path.basename(file_path)}"}
+
+
+class FileUploadWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(db_path=os.path.join(self.tmp.name, "eira.db"), api_url="http://api")
+        self.api = FakeAPIClient()
+        # Without a wake-up, a new file would wait an hour for the next poll
+        self.worker = FileUploadWorker(self.db, self.api, poll_interval=3600)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _attachment(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4")
+        return path
+
+    def test_registered_file_wakes_the_worker(self):
+        path = self._attachment("scan.pdf")
+
+        async def run():
+            self.worker.start()
+            await asyncio.sleep(0.05)  # the first pass finds nothing and waits
+
+            # Registered off the event loop, as from a Tk callback
+            await asyncio.to_thread(self.db.register_file, path, "document", "clinical_notes", 7)
+            for _ in range(200):
+                if self.api.uploads:
+                    break
+                await asyncio.sleep(0.01)
+            self.worker.stop()
+
+        asyncio.run(run())
+        self.assertEqual(self.api.uploads, [(7, "scan.pdf", "document")])
+        self.assertEqual(self.db.get_pending_uploads(), [])
+
+    def test_stopped_worker_ignores_new_files(self):
+        async def run():
+            self.worker.start()
+            self.worker.stop()
+            self.db.register_file(self._attachment("late.pdf"), "document", "clinical_notes", 7)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        self.assertEqual(self.api.uploads, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""Local schema migrations.
+
+Run from the desktop directory:
+
+    python -m unittest discover tests
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from app.db import migrations
+from app.db.database import Database
+from app.db.migrations import MIGRATIONS, get_schema_version, migrate
+from app.sync.sync_manager import OperationType
+
+# Undo migrations 1-7, leaving the schema as it was before versioning
+DOWNGRADE = """
+DROP TRIGGER patients_fts_insert;
+DROP TRIGGER patients_fts_delete;
+DROP TRIGGER patients_fts_update;
+DROP TABLE patients_fts;
+DROP INDEX ix_patients_name;
+DROP INDEX ix_clinical_notes_patient_visit;
+DROP INDEX ix_appointments_patient_start;
+DROP INDEX ix_appointments_start_time;
+DROP INDEX ix_clinical_notes_created_at;
+DROP INDEX ix_files_uploaded_created;
+ALTER TABLE files DROP COLUMN upload_attempts;
+ALTER TABLE files DROP COLUMN upload_error;
+DROP TABLE sync_temp_ids;
+DROP INDEX ix_sync_outbox_status_created;
+DROP INDEX ix_sync_outbox_entity;
+DROP INDEX ix_sync_outbox_status_next_attempt;
+ALTER TABLE sync_outbox DROP COLUMN next_attempt_at;
+PRAGMA user_version = 0;
+"""
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "eira.db")
+        self.db = Database(db_path=self.db_path, api_url="http://api")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _reopen(self):
+        self.db.close()
+        self.db = Database(db_path=self.db_path, api_url="http://api")
+
+    def _names(self, kind):
+        return {
+            row[0] for row in self.db.connections.execute("SELECT name FROM sqlite_master WHERE type = ?", (kind,))
+        }
+
+    def _columns(self, table):
+        return {row["name"] for row in self.db.connections.execute(f"PRAGMA table_info({table})")}
+
+    def test_new_database_is_at_the_latest_version(self):
+        self.assertEqual(get_schema_version(self.db.connections), MIGRATIONS[-1][0])
+        self.assertEqual([version for version, _, _ in MIGRATIONS], list(range(1, len(MIGRATIONS) + 1)))
+
+    def test_unversioned_database_is_upgraded_with_its_data(self):
+        patient = self.db.create_patient(
+            {"first_name": "Ann", "last_name": "Lee", "date_of_birth": "1980-01-01", "gender": "Female",
+             "phone": "555-123-4567"}
+        )
+        self.db.sync_manager.queue_change("patients", OperationType.CREATE, -3, {"first_name": "Temp"})
+        self.db.close()
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(DOWNGRADE)
+        conn.close()
+
+        self._reopen()
+
+        self.assertEqual(get_schema_version(self.db.connections), MIGRATIONS[-1][0])
+        self.assertIn("next_attempt_at", self._columns("sync_outbox"))
+        self.assertTrue({"upload_attempts", "upload_error"} <= self._columns("files"))
+        self.assertTrue({
+            "ix_sync_outbox_status_next_attempt",
+            "ix_sync_outbox_status_created",
+            "ix_sync_outbox_entity",
+            "ix_files_uploaded_created",
+            "ix_appointments_start_time",
+            "ix_clinical_notes_created_at",
+            "ix_clinical_notes_patient_visit",
+            "ix_appointments_patient_start",
+            "ix_patients_name",
+        } <= self._names("index"))
+        # Temporary IDs continue below the ones already in the outbox
+        cursor = self.db.connections.connection().cursor()
+        self.assertEqual(self.db.sync_manager._allocate_temp_id(cursor, "patients"), -4)
+        # Existing patients are backfilled into the search index
+        self.assertEqual([p["id"] for p in self.db.get_patients(search="5551234")], [patient["id"]])
+
+    def test_failed_migration_rolls_back_and_keeps_the_version(self):
+        def broken(conn):
+            conn.execute("CREATE TABLE half_done (id INTEGER)")
+            raise sqlite3.OperationalError("disk I/O error")
+
+        version = get_schema_version(self.db.connections)
+        with mock.patch.object(migrations, "MIGRATIONS", MIGRATIONS + [(version + 1, "broken", broken)]):
+            with self.assertRaises(sqlite3.OperationalError):
+                migrate(self.db.connections)
+
+        self.assertEqual(get_schema_version(self.db.connections), version)
+        self.assertNotIn("half_done", self._names("table"))
+        # Applied migrations are not run again
+        self.assertEqual(migrate(self.db.connections), version)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,339 @@
+"""Outbox push ordering and sync scheduling.
+
+Run from the desktop directory:
+
+    python -m unittest discover tests
+"""
+import asyncio
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import httpx
+
+from app.db.database import Database
+from app.sync.sync_manager import OperationType
+from app.network.http_transport import HTTPTransport
+
+
+class SyncTestCase(unittest.TestCase):
+    """A database whose sync manager talks to an in-process fake server."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fail_pushes = False
+        self.pushed = []
+        self.updates = []
+        self.pulls = []
+        self.pull_response = httpx.Response(200, json={"status": "success", "changes": []})
+        http = HTTPTransport(transport=httpx.MockTransport(self._handle))
+        self.db = Database(db_path=os.path.join(self.tmp.name, "eira.db"), api_url="http://api", http=http)
+        self.sync = self.db.sync_manager
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/v1/sync/pull":
+            self.pulls.append((request.method, request.url.params.get("since")))
+            return self.pull_response
+        if self.fail_pushes:
+            return httpx.Response(502, text="bad gateway")
+        body = request.content
+        if request.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        changes = json.loads(body)["changes"]
+        self.pushed.extend(changes)
+        self.updates.extend(c["data"]["first_name"] for c in changes if c["operation"] == "update")
+        return httpx.Response(200, json={"processed": [{"success": True}] * len(changes)})
+
+    def _push(self):
+        asyncio.run(self.sync._push_changes())
+
+    def _create_patient(self, first_name="A"):
+        return self.db.create_patient(
+            {"first_name": first_name, "last_name": "B", "date_of_birth": "2000-01-01", "gender": "Female"}
+        )
+
+
+class PushOrderTest(SyncTestCase):
+    def test_failed_change_is_resent_before_later_change_to_same_entity(self):
+        patient = self._create_patient()
+        self._push()
+
+        # The first update fails and backs off; the second is queued behind it
+        self.db.update_patient(patient["id"], {"first_name": "OLD"})
+        self.fail_pushes = True
+        self._push()
+        self.fail_pushes = False
+        self.db.update_patient(patient["id"], {"first_name": "NEW"})
+        self._push()
+        self.assertEqual(self.updates, [])
+
+        # Once the backoff has passed, the updates arrive in the order they were made
+        self.db.connections.execute(
+            "UPDATE sync_outbox SET next_attempt_at = '2000-01-01' WHERE status = 'error'"
+        )
+        self._push()
+        self._push()
+        self.assertEqual(self.updates, ["OLD", "NEW"])
+
+
+class ClaimTest(SyncTestCase):
+    def test_claim_marks_the_batch_syncing(self):
+        self.sync.push_batch_size = 3
+        for name in "ABCD":
+            self._create_patient(name)
+
+        batch = self.sync._claim_push_batch()
+
+        self.assertEqual([change["data"]["first_name"] for _, _, change in batch], ["A", "B", "C"])
+        statuses = [row[0] for row in self.db.connections.execute("SELECT status FROM sync_outbox ORDER BY created_at")]
+        self.assertEqual(statuses, ["syncing", "syncing", "syncing", "pending"])
+        self.assertEqual(self.sync.get_outbox_counts()["syncing"], 3)
+        self.assertEqual(self.sync.get_outbox_counts()["pending"], 1)
+
+    def test_claim_skips_changes_that_moved_after_selection(self):
+        first = self._create_patient("A")
+        self._create_patient("B")
+        transaction = self.db.connections.transaction
+
+        def move_first_then_claim():
+            # Deleting the patient drops its pending create from the outbox
+            self.db.connections.transaction = transaction
+            self.db.delete_patient(first["id"])
+            return transaction()
+
+        self.db.connections.transaction = move_first_then_claim
+        batch = self.sync._claim_push_batch()
+
+        self.assertEqual([change["data"]["first_name"] for _, _, change in batch], ["B"])
+        self.assertEqual(self.sync.get_outbox_counts()["syncing"], 1)
+        self.assertEqual(self.sync.get_outbox_counts()["pending"], 0)
+
+
+class CoalesceTest(SyncTestCase):
+    def _outbox(self):
+        return [
+            (row["operation_type"], json.loads(row["data"]) if row["data"] else None)
+            for row in self.db.connections.execute(
+                "SELECT operation_type, data FROM sync_outbox ORDER BY created_at"
+            )
+        ]
+
+    def test_updates_merge_into_the_pending_create(self):
+        patient = self._create_patient()
+        self.db.update_patient(patient["id"], {"first_name": "X"})
+        self.db.update_patient(patient["id"], {"last_name": "Y"})
+
+        [(operation, data)] = self._outbox()
+        self.assertEqual(operation, "create")
+        self.assertEqual((data["first_name"], data["last_name"]), ("X", "Y"))
+
+    def test_delete_after_pending_create_drops_both(self):
+        patient = self._create_patient()
+        self.db.delete_patient(patient["id"])
+
+        self.assertEqual(self._outbox(), [])
+        self.assertEqual(self.sync.get_outbox_counts()["pending"], 0)
+
+    def test_delete_replaces_pending_update(self):
+        patient = self._create_patient()
+        self._push()
+        self.db.update_patient(patient["id"], {"first_name": "X"})
+        self.db.delete_patient(patient["id"])
+
+        self.assertEqual([operation for operation, _ in self._outbox()], ["create", "delete"])
+
+    def test_changes_are_not_merged_into_a_failed_change(self):
+        patient = self._create_patient()
+        self._push()
+        self.db.update_patient(patient["id"], {"first_name": "X"})
+        self.fail_pushes = True
+        self._push()
+        self.db.update_patient(patient["id"], {"first_name": "Y"})
+
+        self.assertEqual([operation for operation, _ in self._outbox()], ["create", "update", "update"])
+
+    def test_change_in_rolled_back_transaction_is_not_announced(self):
+        events = []
+        self.db.events.subscribe(events.append, ["patients"])
+        version = self.sync.data_version
+
+        with self.assertRaises(RuntimeError):
+            with self.db.connections.transaction():
+                self.sync.queue_change("patients", OperationType.UPDATE, 1, {"first_name": "X"})
+                self.assertEqual(events, [])
+                raise RuntimeError("rolled back")
+
+        self.assertEqual(self._outbox(), [])
+        self.assertEqual((events, self.sync.data_version), ([], version))
+        self.assertEqual(self.sync.get_outbox_counts()["pending"], 0)
+
+        with self.db.connections.transaction():
+            self.sync.queue_change("patients", OperationType.UPDATE, 1, {"first_name": "X"})
+            self.assertEqual(events, [])
+        self.assertEqual([(e["entity_type"], e["operation"]) for e in events], [("patients", "update")])
+        self.assertEqual(self.sync.data_version, version + 1)
+
+
+class PullEventsTest(SyncTestCase):
+    def test_pulled_rows_are_announced_once_committed(self):
+        existing = self._create_patient()
+        events = []
+        self.db.events.subscribe(events.append, ["patients"])
+        rows = [
+            {**existing, "first_name": "Remote"},
+            {**existing, "id": 500, "first_name": "New"},
+        ]
+        # Listeners re-query on events, so they must not run before the commit
+        with self.db.connections.transaction():
+            asyncio.run(self.sync._process_pulled_data("patients", rows))
+            self.assertEqual(events, [])
+
+        self.assertEqual(
+            [(e["operation"], e["ids"], e["source"]) for e in events],
+            [("create", [500], "remote"), ("update", [existing["id"]], "remote")],
+        )
+
+
+class BulkApplyTest(SyncTestCase):
+    def _row(self, patient_id, first_name="Ann"):
+        return {
+            "id": patient_id, "first_name": first_name, "last_name": "Lee",
+            "date_of_birth": "1980-01-01", "gender": "Female",
+            "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00",
+        }
+
+    def _apply(self, rows):
+        return asyncio.run(self.sync._process_pulled_data("patients", rows))
+
+    def _patients(self):
+        return [
+            (row["id"], row["first_name"], row["phone"])
+            for row in self.db.connections.execute("SELECT id, first_name, phone FROM patients ORDER BY id")
+        ]
+
+    def test_rows_update_only_the_fields_they_carry(self):
+        self._apply([{**self._row(1), "phone": "555"}, self._row(2)])
+
+        # Rows of different shapes in one page are upserted separately
+        self.assertEqual(self._apply([self._row(1, "Anna"), {**self._row(3, "Cy"), "phone": "777"}]), 2)
+
+        self.assertEqual(self._patients(), [(1, "Anna", "555"), (2, "Ann", None), (3, "Cy", "777")])
+
+    def test_pages_commit_separately(self):
+        self.sync.pull_page_size = 2
+        events = []
+        self.db.events.subscribe(events.append, ["patients"])
+        broken = self._row(5)
+        del broken["last_name"]
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self._apply([self._row(1), self._row(2), self._row(3), self._row(4), broken])
+
+        # The failed page rolled back, earlier pages stayed applied and announced
+        self.assertEqual([patient_id for patient_id, _, _ in self._patients()], [1, 2, 3, 4])
+        self.assertEqual([e["ids"] for e in events], [[1, 2], [3, 4]])
+
+
+class PullTest(SyncTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.set_auth_token("token")
+
+    def _pull(self):
+        return asyncio.run(self.sync._pull_changes())
+
+    def _serve(self, *changes, status_code=200):
+        self.pull_response = httpx.Response(status_code, json={"status": "success", "changes": list(changes)})
+
+    @staticmethod
+    def _change(entity_id, operation, updated_at, **payload):
+        row = {
+            "id": int(entity_id),
+            "first_name": "Ann",
+            "last_name": "Lee",
+            "date_of_birth": "1980-01-01",
+            "gender": "Female",
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": updated_at,
+            **payload,
+        }
+        return {
+            "entity_type": "patient",
+            "entity_id": entity_id,
+            "operation": operation,
+            "payload": row if operation != "delete" else {"id": int(entity_id)},
+            "updated_at": updated_at,
+        }
+
+    def _names(self):
+        return [
+            (row["id"], row["first_name"])
+            for row in self.db.connections.execute("SELECT id, first_name FROM patients ORDER BY id")
+        ]
+
+    def test_pull_applies_the_latest_change_per_entity_and_advances_the_cursor(self):
+        self._serve(
+            self._change("7", "create", "2024-05-01T10:00:00"),
+            self._change("8", "create", "2024-05-01T10:00:01"),
+            self._change("7", "update", "2024-05-01T10:00:02", first_name="Anna"),
+        )
+        self.assertEqual(self._pull()["patients"], 2)
+        self.assertEqual(self._names(), [(7, "Anna"), (8, "Ann")])
+
+        self._serve(self._change("8", "delete", "2024-05-01T11:00:00"))
+        self._pull()
+        self.assertEqual(self._names(), [(7, "Anna")])
+
+        self.assertEqual(
+            self.pulls,
+            [("GET", "1970-01-01T00:00:00"), ("GET", "2024-05-01T10:00:02")],
+        )
+
+    def test_failed_pull_keeps_the_cursor(self):
+        self._serve(self._change("7", "create", "2024-05-01T10:00:00"))
+        self._pull()
+
+        self._serve(status_code=500)
+        self.assertEqual(self._pull()["error"], 1)
+
+        # A change that cannot be applied fails the whole pull
+        broken = self._change("9", "create", "2024-05-02T00:00:00")
+        del broken["payload"]["last_name"]
+        self._serve(self._change("8", "create", "2024-05-01T12:00:00"), broken)
+        self.assertEqual(self._pull()["error"], 1)
+
+        self._pull()
+        self.assertEqual([since for _, since in self.pulls][-1], "2024-05-01T10:00:00")
+
+
+class SyncSchedulingTest(SyncTestCase):
+    def test_change_made_outside_the_loop_starts_a_debounced_pass(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        self.db.set_event_loop(loop)
+        self.db.set_auth_token("token")
+        self.sync.is_online = True
+
+        # As from a Tk callback: the loop exists but is not running
+        self._create_patient()
+        self._create_patient("C")
+
+        # Driving the loop runs the handed-over request, then the pass
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertIsNotNone(self.sync._scheduled_sync)
+        loop.run_until_complete(asyncio.wait_for(self.sync._scheduled_sync, 5))
+
+        self.assertEqual([c["data"]["first_name"] for c in self.pushed], ["A", "C"])
+        self.assertEqual(self.sync.get_sync_metrics()["merged_triggers"], 1)
+        self.assertEqual(self.sync.get_sync_metrics()["push_passes"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()